@@ -3,7 +3,6 @@ import random
 import math
 import warnings
 from sys import maxsize
-import json
 
 
 """
@@ -26,8 +25,17 @@ def are_in_range(loc_1, loc_2, range_):
     return (loc_1[0] - loc2[0])**2 + (loc_1[1] - loc2[1])**2 < range_**2
 def are_in_range_one_to_multi(loc_1, locs_2, range_):
     return any(are_in_range(loc_1, loc, range) for loc in locs_2)
-FRAMEDATA_PLAYER_ID_SELF = 1
-FRAMEDATA_PLAYER_ID_ENEMY = 2
+def contiguous_runs(values):
+    """
+    Splits coordinates into runs of consecutive values, as (first, last) pairs
+    """
+    runs = []
+    for value in sorted(set(values)):
+        if runs and runs[-1][1] == value - 1:
+            runs[-1] = (runs[-1][0], value)
+        else:
+            runs.append((value, value))
+    return runs
 
 class AlgoStrategy(gamelib.AlgoCore):
     def __init__(self):
@@ -53,10 +61,6 @@ class AlgoStrategy(gamelib.AlgoCore):
         SP = 0
         # This is a good place to do initial setup
         self.scored_on_locations = []
-        self.scored_on_last_turn = []
-        self.defences_by_column = [0 for i in range(28)]
-        # (id, loc, type, total_damage, was_destroyed)
-        self.own_structures_attacked = []
 
     def on_turn(self, turn_state):
         """
@@ -74,10 +78,6 @@ class AlgoStrategy(gamelib.AlgoCore):
 
         game_state.submit_turn()
 
-        #reset the variables that track damage on each turn
-        self.own_structures_attacked = []
-        self.scored_on_last_turn = []
-
     def our_strategy(self, game_state):
         #Only on the first turn
         if(game_state.turn_number == 0):
@@ -101,53 +101,23 @@ class AlgoStrategy(gamelib.AlgoCore):
     ///////////////
     '''
     def find_weakest_area(self, game_state):
-        # figuring out how weak the bottom left is
-        location_options = []
-        for x in range(15):
-            for y in range(15, 22):
-                location_options += [x, y]
-        bottom_left_h = detect_area_weakness(game_state, location_options)
-
-        # figuring out how weak the bottom right is
-        location_options = []
-        for x in range(15, 28):
-            for y in range(15, 22):
-                location_options += [x, y]
-        bottom_right_h = detect_area_weakness(game_state, location_options)
-
-        # figuring out how weak the top left is
-        location_options = []
-        for x in range(15):
-            for y in range(22, 28):
-                location_options += [x, y]
-        top_left_h = detect_area_weakness(game_state, location_options)
-
-        # figuring out how weak the top right is
-        location_options = []
-        for x in range(15, 28):
-            for y in range(22, 28):
-                location_options += [x, y]
-        top_right_h = detect_area_weakness(game_state, location_options)
-
+        # figuring out how weak each corner of the enemy's side is
         d = {
-            'tl': top_left_h,
-            'tr': top_right_h,
-            'br': bottom_right_h,
-            'bl': bottom_left_h,
+            'bl': self.detect_area_weakness(game_state, 0, 15, 14, 21),
+            'br': self.detect_area_weakness(game_state, 15, 15, 27, 21),
+            'tl': self.detect_area_weakness(game_state, 0, 22, 14, 27),
+            'tr': self.detect_area_weakness(game_state, 15, 22, 27, 27),
         }
 
         weakest = min(d, key=d.get)
 
         return weakest
 
-    # Helper function for find_weakest_area, given a set of locations returns an indication of how strong that area is
-    def detect_area_weakness(self, game_state, location_options):
-        strength = 0
-        for location in location_options:
-            if game_state.contains_stationary_unit(location):
-                for unit in game_state.game_map[location]:
-                    strength += unit.health
-        return strength
+    # Helper function for find_weakest_area, given a rectangle returns an indication of how strong that area is
+    def detect_area_weakness(self, game_state, x_min, y_min, x_max, y_max):
+        game_map = game_state.game_map
+        return (game_map.region_total("health", 0, x_min, y_min, x_max, y_max)
+                + game_map.region_total("health", 1, x_min, y_min, x_max, y_max))
 
     # Function which finds path to edge and checks for defences on that path
     # The 'area' argument is designed to work with a given outut from find_weakest_area
@@ -187,18 +157,19 @@ class AlgoStrategy(gamelib.AlgoCore):
         damage_in_quarter = [[0, 0], [0, 1], [0, 2], [0, 3]]
         damaged_structures = []
         destroyed_structures = []
-        for struc in self.own_structures_attacked:
-            loc = struc[1]
-            unit_type = struc[2]
-            hp_lost = struc[3]
-            was_killed = struc[4]
+        # last_action_summary is None on the first turn, before any action phase
+        summary = self.last_action_summary or gamelib.ActionPhaseSummary()
+        for struc in summary.damaged_units(0, (WALL, SUPPORT, TURRET)):
+            loc = struc.location
+            unit_type = struc.unit_type
+            hp_lost = struc.damage
+            was_killed = struc.destroyed
             if was_killed:
                 destroyed_structures.append((*loc, unit_type))
-                defences_by_column[loc[0]] -= 1
             else:
                 damaged_structures.append(loc)
             damage_in_quarter[self._x_to_quarter(loc[0])][0] += hp_lost
-        edge_squares_reached = self.scored_on_last_turn
+        edge_squares_reached = summary.breach_locations(1)
         for sq in edge_squares_reached:
             quarter = self._x_to_quarter(sq[0])
             if quarter not in quarters_attacked:
@@ -236,11 +207,6 @@ class AlgoStrategy(gamelib.AlgoCore):
         # upgrade walls so they soak more damage
         game_state.attempt_upgrade(wall_upg_locations)
 
-	#self.defences_by_columns contains the number of walls and turrets in each column
-        #assume that on first turn, any turrets are placed behind walls so only need to look at walls
-        for sq in wall_locations:
-            self.defences_by_column[sq[0]] += 1
-
     """
     //////
     SENDS THE INITIAL INTERCEPTORS
@@ -278,8 +244,8 @@ class AlgoStrategy(gamelib.AlgoCore):
     """
     def send_interceptors(self, game_state, min_quart):
         #List of spawn locations for interceptors
-        friendly_edges = (game_state.game_map.get_edge_locations(game_state.game_map.BOTTOM_LEFT) +
-                          game_state.game_map.get_edge_locations(game_state.game_map.BOTTOM_RIGHT))
+        game_map = game_state.game_map
+        friendly_edges = [[x, y] for edge in (game_map.BOTTOM_LEFT, game_map.BOTTOM_RIGHT) for x, y in game_map.EDGES[edge]]
         deploy_locations = self.filter_blocked_locations(friendly_edges, game_state)
         quarters = [[0,7],[7,14],[14,21],[21,28]]
         #Middle of the quarter
@@ -304,8 +270,7 @@ class AlgoStrategy(gamelib.AlgoCore):
     def rebuild_destroyed(self, game_state, destroyed_structures):
         #Rebuilds the destroyed structures
         for structure in destroyed_structures:
-            if game_state.attempt_spawn(structure[2], (structure[0], structure[1]) ):
-                self.defences_by_column[structure[0]] += 1
+            game_state.attempt_spawn(structure[2], (structure[0], structure[1]))
 
     def upgrade_walls(self, game_state, max_spend=None):
         #work out how many walls we can upgrade based on max spend
@@ -351,7 +316,6 @@ class AlgoStrategy(gamelib.AlgoCore):
         for loc in turret_locs:
             if game_state.attempt_spawn(TURRET, loc):
                 num_to_place -= 1
-                self.defences_by_column[loc[0]] += 1
             if not num_to_place:
                 break
 
@@ -397,7 +361,7 @@ class AlgoStrategy(gamelib.AlgoCore):
             while (plus_in_range or minus_in_range):
                 sq = (x+i,y)
                 if (plus_in_range
-                        and defences_by_column[sq[0]] > 0
+                        and game_state.game_map.structures_in_column(sq[0], 0, (WALL, TURRET)) > 0
                         and sq not in path_squares_on_y[y]
                         and game_state.can_spawn(SUPPORT, sq)):
                     game_state.attempt_spawn(SUPPORT, sq)
@@ -407,7 +371,7 @@ class AlgoStrategy(gamelib.AlgoCore):
                     break
                 sq = (x-i,y)
                 if (minus_in_range
-                        and defences_by_column[sq[0]] > 0
+                        and game_state.game_map.structures_in_column(sq[0], 0, (WALL, TURRET)) > 0
                         and sq not in path_squares_on_y[y]
                         and game_state.can_spawn(SUPPORT, sq)):
                     game_state.attempt_spawn(SUPPORT, sq)
@@ -478,8 +442,8 @@ class AlgoStrategy(gamelib.AlgoCore):
         Send out interceptors at random locations to defend our base from enemy moving units.
         """
         # We can spawn moving units on our edges so a list of all our edge locations
-        friendly_edges = (game_state.game_map.get_edge_locations(game_state.game_map.BOTTOM_LEFT)
-                          + game_state.game_map.get_edge_locations(game_state.game_map.BOTTOM_RIGHT))
+        game_map = game_state.game_map
+        friendly_edges = [[x, y] for edge in (game_map.BOTTOM_LEFT, game_map.BOTTOM_RIGHT) for x, y in game_map.EDGES[edge]]
 
         # Remove locations that are blocked by our own structures
         # since we can't deploy units there.
@@ -539,15 +503,13 @@ class AlgoStrategy(gamelib.AlgoCore):
         return location_options[damages.index(min(damages))]
 
     def detect_enemy_unit(self, game_state, unit_type=None, valid_x = None, valid_y = None):
+        stat = "structures" if unit_type is None else unit_type
+        x_runs = contiguous_runs(valid_x) if valid_x is not None else [(0, 27)]
+        y_runs = contiguous_runs(valid_y) if valid_y is not None else [(0, 27)]
         total_units = 0
-        for location in game_state.game_map:
-            if game_state.contains_stationary_unit(location):
-                for unit in game_state.game_map[location]:
-                    if (unit.player_index == 1
-                        and (unit_type is None or unit.unit_type == unit_type)
-                        and (valid_x is None or location[0] in valid_x)
-                        and (valid_y is None or location[1] in valid_y)):
-                        total_units += 1
+        for x_min, x_max in x_runs:
+            for y_min, y_max in y_runs:
+                total_units += game_state.game_map.region_total(stat, 1, x_min, y_min, x_max, y_max)
         return total_units
 
     def filter_blocked_locations(self, locations, game_state):
@@ -557,60 +519,16 @@ class AlgoStrategy(gamelib.AlgoCore):
                 filtered.append(location)
         return filtered
 
-    def on_action_frame(self, turn_string):
+    def on_breach(self, event):
         """
-        This is the action frame of the game. This function could be called
-        hundreds of times per turn and could slow the algo down so avoid putting slow code here.
-        Processing the action frames is complicated so we only suggest it if you have time and experience.
-        Full doc on format of a game frame at in json-docs.html in the root of the Starterkit.
+        Called for every breach in the action frames. Action frames can arrive
+        hundreds of times per turn, so avoid putting slow code in the event callbacks.
+        Event players are already translated to player_index: 0 is yourself, 1 is your opponent.
         """
         # Let's record at what position we get scored on
-        state = json.loads(turn_string)
-        events = state["events"]
-        for breach in events["breach"]:
-            location = breach[0]
-            owner = breach[4]
-            # When parsing the frame data directly,
-            # 1 is integer for yourself, 2 is opponent (StarterKit code uses 0, 1 as player_index instead)
-            if owner == FRAMEDATA_PLAYER_ID_ENEMY:
-                gamelib.debug_write("Got scored on at: {}".format(location))
-                self.scored_on_locations.append(location)
-                self.scored_on_last_turn.append(location)
-        for damage_evt in events["damage"]:
-            unit_type = damage_evt[2]
-            owner = damage_evt[4]
-            if owner == 1 and is_stationary(unit_type):
-                loc = damage_evt[0]
-                damage_hp = damage_evt[1]
-                unit_id = damage_evt[3]
-                unit_type_str = self.config["unitInformation"][unit_type]["shorthand"]
-                found = False
-                for struc in self.own_structures_attacked:
-                    if struc[0] == unit_id:
-                        struc[3] += damage_hp
-                        found = True
-                        break
-                if not found:
-                    self.own_structures_attacked.append([unit_id, loc, unit_type_str, damage_hp, False])
-        for death_evt in events["death"]:
-            unit_type = death_evt[1]
-            owner = death_evt[3]
-            was_intentional = death_evt[4]
-            if owner == 1 and is_stationary(unit_type) and not was_intentional:
-                loc = death_evt[0]
-                unit_id = death_evt[2]
-                found = False
-                for struc in self.own_structures_attacked:
-                    if struc[0] == unit_id:
-                        struc[4] = True
-                        found = True
-                        break
-                if not found:
-                    #I dont yet know if a damage event is emitted if a structure is shot to death.
-                    #the code assumes so, so leaving this in until testing.
-                    gamelib.debug_write('Structure was maliciously destroyed but not damaged '+
-                                        str(death_evt))
-
+        if event.player_index == 1:
+            gamelib.debug_write("Got scored on at: {}".format(event.location))
+            self.scored_on_locations.append(event.location)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""
+Measures how fast each installed JSON backend decodes engine messages.
+
+Turn frames and action frames are timed separately, since action frames arrive far more often.
+Each backend's output is also checked against the stdlib json module.
+
+Usage:
+    python3 benchmarks/json_decode.py [transcript] [--repeat N]
+
+Without a transcript a late game sized one is generated.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gamelib.util import JSON_BACKENDS, set_json_backend, json_loads
+from transcript import load_transcript, generate_transcript
+
+
+def _time(lines, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            json_loads(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("transcript", nargs="?", help="A replay file or recorded engine transcript")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of times to decode every message")
+    args = parser.parse_args()
+
+    lines = load_transcript(args.transcript) if args.transcript else generate_transcript()
+    frames = {"turn": [], "action": []}
+    for line in lines:
+        if b"turnInfo" in line:
+            frames["action" if json.loads(line)["turnInfo"][0] == 1 else "turn"].append(line)
+
+    print("{:<8} {:>18} {:>18}".format("backend", "turn frames/s", "action frames/s"))
+    for backend in JSON_BACKENDS:
+        try:
+            set_json_backend(backend)
+        except ImportError:
+            print("{:<8} {:>18}".format(backend, "not installed"))
+            continue
+        for line in frames["turn"][:1] + frames["action"][:1]:
+            if json_loads(line) != json.loads(line):
+                print("{} decodes differently from json".format(backend))
+        rates = []
+        for kind in ["turn", "action"]:
+            rates.append(len(frames[kind]) / _time(frames[kind], args.repeat) if frames[kind] else 0)
+        print("{:<8} {:>18.0f} {:>18.0f}".format(backend, *rates))
+
+
+if __name__ == "__main__":
+    main()
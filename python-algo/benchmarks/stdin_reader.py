@@ -0,0 +1,87 @@
+"""
+Measures how many engine messages per second can be read from a pipe.
+
+Replays a transcript through an OS pipe, the way the engine feeds an algo's stdin, and reads it
+back with a text mode readline (the old get_command) and with gamelib.util.BufferedLineReader,
+first only splitting the lines, then also decoding every message with json.loads as AlgoCore does.
+
+Usage:
+    python3 benchmarks/stdin_reader.py [transcript] [--repeat N]
+
+Without a transcript a late game sized one is generated.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gamelib.util import BufferedLineReader
+from transcript import load_transcript, generate_transcript
+
+
+def _feed(write_fd, data):
+    with os.fdopen(write_fd, "wb") as pipe:
+        pipe.write(data)
+
+
+def _replay(data, read_messages):
+    read_fd, write_fd = os.pipe()
+    writer = threading.Thread(target=_feed, args=(write_fd, data))
+    writer.start()
+    with os.fdopen(read_fd, "rb") as pipe:
+        start = time.perf_counter()
+        count = read_messages(pipe)
+        elapsed = time.perf_counter() - start
+    writer.join()
+    return count, elapsed
+
+
+def text_lines(pipe):
+    return iter(io.TextIOWrapper(pipe).readline, "")
+
+
+def buffered_lines(pipe):
+    return BufferedLineReader(pipe)
+
+
+def count_lines(lines):
+    count = 0
+    for _ in lines:
+        count += 1
+    return count
+
+
+def decode_lines(lines):
+    count = 0
+    for line in lines:
+        json.loads(line)
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("transcript", nargs="?", help="A replay file or recorded engine transcript")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of times to replay the transcript")
+    args = parser.parse_args()
+
+    lines = load_transcript(args.transcript) if args.transcript else generate_transcript()
+    data = b"".join(lines)
+    print("{} messages, {:.1f} KB on average".format(len(lines), len(data) / len(lines) / 1024))
+
+    print("{:<20} {:>12} {:>12}".format("messages/s", "read", "read+decode"))
+    for name, split_lines in [("text readline", text_lines), ("BufferedLineReader", buffered_lines)]:
+        rates = []
+        for consume in [count_lines, decode_lines]:
+            best = min(_replay(data, lambda pipe: consume(split_lines(pipe)))[1] for _ in range(args.repeat))
+            rates.append(len(lines) / best)
+        print("{:<20} {:>12.0f} {:>12.0f}".format(name, *rates))
+
+
+if __name__ == "__main__":
+    main()
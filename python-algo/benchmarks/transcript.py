@@ -0,0 +1,81 @@
+"""
+Helpers for the benchmarks: loading a recorded engine transcript, or generating one.
+
+A transcript is what the engine writes to an algo's stdin: the config on the first line,
+then one JSON game state per line. Replay files saved by the engine use the same format.
+"""
+import json
+import os
+import random
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "game-configs.json")
+
+
+def load_transcript(path):
+    """Reads a transcript from a file
+
+    Args:
+        path: The path of a replay or recorded transcript
+
+    Returns:
+        A list of lines, as bytes, each ending with a newline
+
+    """
+    with open(path, "rb") as transcript:
+        return [line if line.endswith(b"\n") else line + b"\n" for line in transcript if line.strip()]
+
+
+def _units(rng, rows, count, mobile):
+    units = [[] for _ in range(8)]
+    for unit_id in range(count):
+        unit_type = rng.choice([3, 4, 5]) if mobile else rng.choice([0, 1, 2])
+        x = rng.randrange(28)
+        y = rng.choice(rows)
+        units[unit_type].append([x, y, float(rng.randrange(1, 90)), str(rng.randrange(1, 10 ** 6))])
+    return units
+
+
+def _frame(rng, turn, frame):
+    mobile = frame >= 0
+    events = {name: [] for name in ["selfDestruct", "breach", "damage", "shield", "move", "spawn", "death", "attack", "melee"]}
+    if mobile:
+        for _ in range(30):
+            location = [rng.randrange(28), rng.randrange(28)]
+            events["move"].append([location, location, [-1, -1], 3, str(rng.randrange(10 ** 6)), rng.choice([1, 2])])
+            events["damage"].append([location, 2.0, rng.randrange(6), str(rng.randrange(10 ** 6)), rng.choice([1, 2])])
+            events["attack"].append([location, location, 2.0, 2, str(rng.randrange(10 ** 6)), str(rng.randrange(10 ** 6)), rng.choice([1, 2])])
+    state = {
+        "p1Units": _units(rng, range(0, 14), 70, False),
+        "p2Units": _units(rng, range(14, 28), 70, False),
+        "turnInfo": [1 if mobile else 0, turn, frame],
+        "p1Stats": [30.0, 12.0, 8.5, 800],
+        "p2Stats": [28.0, 9.0, 11.2, 900],
+        "events": events,
+    }
+    if mobile:
+        for player, rows in [("p1Units", range(0, 14)), ("p2Units", range(14, 28))]:
+            for unit_type, units in enumerate(_units(rng, rows, 20, True)):
+                state[player][unit_type].extend(units)
+    return state
+
+
+def generate_transcript(turns=10, frames_per_turn=100, seed=0):
+    """Generates a transcript with a late game sized board
+
+    Args:
+        turns: The number of turns
+        frames_per_turn: The number of action frames after each turn
+        seed: The random seed
+
+    Returns:
+        A list of lines, as bytes, each ending with a newline
+
+    """
+    rng = random.Random(seed)
+    with open(CONFIG_PATH) as config:
+        lines = [json.dumps(json.load(config)).encode() + b"\n"]
+    for turn in range(turns):
+        lines.append(json.dumps(_frame(rng, turn, -1)).encode() + b"\n")
+        for frame in range(frames_per_turn):
+            lines.append(json.dumps(_frame(rng, turn, frame)).encode() + b"\n")
+    return lines
@@ -10,20 +10,112 @@ Investigating it is useful for any player that wants to access more information
 The GameUnit class in unit.py represetns a single unit. 
 Investigating it is useful for any player that wants to access information about units. \n
 
+The GameContext class in context.py holds the constants derived from a config, such as the unit type shorthands.
+It is shared by GameState, GameMap and GameUnit instead of module level globals, so states built from different configs can coexist. \n
+
+The UnitTypeTable class in unit_types.py holds the stats of every unit type, compiled from the config once per game.
+GameUnit reads its stats from it instead of from the config. \n
+
 The AlgoCore class in algocore.py handles communication with the game engine, and forms the bones of an algo. AlgoStrategy inherits from it. 
 Investigating it is useful for advanced players interested in getting data from the action phase or communicating directly with the game engine. \n
 
 The Navigation class in navigation.py contains functions related to pathfinding, which are used by GameState in pathing related functions. 
 Investigating it is useful for advanced player who want to optimize the slow default pathing algorithm we provide. \n 
 
+The OpponentModel class in opponent_model.py predicts the paths the opponent can attack down and how much damage our defences deal along them.
+It caches its results per board, so it is cheap to use when scoring many candidate defensive placements. \n
+
+The TurnTimer class in timing.py tracks how much of the time limit for a turn has been used.
+AlgoCore starts one for every turn, and it can run a watchdog that submits a fallback turn if on_turn takes too long.
+The AdaptiveBudget class scales the work done in a turn to stay under the time limit.
+The StartupReport class times importing gamelib and on_game_start; AlgoCore prints it with debug_write once the game starts.
+OpponentModel, OpponentHistory and ValueNetwork are imported the first time they are used, to keep startup short. \n
+
+The BackgroundWorker class in background.py runs analysis for the next turn in a background thread while the action phase plays out.
+AlgoCore collects the results when the next turn starts. Tasks that are still running are flagged, and can check task_cancelled() to stop early. \n
+
+The Speculation class in speculation.py predicts the next turn's GameState from the last action frame, so planning can start before the turn message arrives.
+It compares the prediction with the real turn when it arrives. \n
+
+The DebugLog class in debug_log.py writes debug_write output from a background thread once AlgoCore starts.
+Repeated warnings, such as failed spawns, are rate limited and summarized at the end of each turn. \n
+
+The event classes in events.py, such as BreachEvent and DeathEvent, are typed records of the events in an action frame.
+AlgoCore passes them to callbacks such as on_breach, and iter_events() builds them from a decoded frame. \n
+
+The ActionPhaseSummary class in action_summary.py collects the damage, deaths, breaches, spawns and shields of an action phase.
+AlgoCore hands the summary of the last action phase to on_turn as self.last_action_summary. \n
+
+The OpponentHistory class in opponent_history.py records the opponent's resources, spawns and structure changes over the last turns in compact arrays.
+It answers trend queries such as where they attacked from and how much MP they attack with. \n
+
+The ResourceProjector class in resources.py projects both players' MP and SP over future turns, and is shared through GameContext.resources.
+AttackTimingPredictor uses it with an OpponentHistory to predict the turns the opponent is likely to attack in. \n
+
+The PathOutcome class in path_outcome.py describes what happens to mobile units sent down a path: breach damage, self destruct damage and SP gained.
+GameState.evaluate_path_outcome() builds one from tables compiled from the config. \n
+
+The SummedAreaTable class in regions.py totals values over any rectangle of the board in constant time.
+GameMap.region_total() uses it to answer queries such as the health of the opponent's structures in a corner. \n
+
+The BoardFeatures class in features.py encodes a GameState as a fixed-shape float32 NumPy array for learned evaluations, through GameState.to_tensor().
+to_tensor_batch() encodes many states at once. NumPy is only imported when a state is encoded. \n
+
+The ValueNetwork class in value_net.py runs a small convolutional or dense network over GameState tensors with NumPy alone.
+AlgoCore loads its weights from value_net.npz next to algo_strategy.py, and evaluate_states() scores candidate states in batches. \n
+
 util.py contains a small handful of functions that help with communication, including the debug-printing function, debug_write().
+Engine messages are decoded with json_loads, which uses orjson or ujson when installed; set_json_backend() picks one explicitly.
 """
 
+import importlib
+
+from .timing import get_startup_report
+get_startup_report()
+
 from .algocore import AlgoCore
-from .util import debug_write
+from .util import debug_write, json_loads, json_dumps, set_json_backend
 from .game_state import GameState
 from .unit import GameUnit
+from .unit_types import UnitTypeTable
+from .context import GameContext
 from .game_map import GameMap
+from .timing import TurnTimer, AdaptiveBudget, StartupReport
+from .background import BackgroundWorker, task_cancelled
+from .speculation import Speculation
+from .debug_log import DebugLog
+from .events import iter_events
+from .action_summary import ActionPhaseSummary
+from .resources import ResourceProjector, AttackTimingPredictor
+from .path_outcome import PathOutcome
+from .regions import SummedAreaTable
+from .features import BoardFeatures, to_tensor_batch
+
+__all__ = ["action_summary", "algocore", "background", "context", "debug_log", "events", "features", "game_state", "game_map", "navigation", "path_outcome", "regions", "resources", "speculation", "timing", "unit", "unit_types", "util"]
+
+# Imported the first time they are used, to keep startup short for algos that do not use them.
+# Their modules are left out of __all__ so that "from gamelib import *" does not import them.
+_LAZY_ATTRIBUTES = {
+    "OpponentModel": "opponent_model",
+    "OpponentHistory": "opponent_history",
+    "ValueNetwork": "value_net",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module("." + _LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in __all__ or name in _LAZY_ATTRIBUTES.values():
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | set(_LAZY_ATTRIBUTES.values()) | set(__all__))
+
 
-__all__ = ["algocore", "game_state", "game_map", "navigation", "unit", "util"]
+get_startup_report().mark("import gamelib")
  
\ No newline at end of file
@@ -0,0 +1,167 @@
+from collections import Counter
+
+
+class UnitDamage:
+    """The damage one unit took during an action phase
+
+    Attributes :
+        * unit_id (str): The id of the unit
+        * location (list): The [x, y] of the unit when it was last damaged or destroyed
+        * unit_type (str): The type of the unit
+        * player_index (int): The owner of the unit
+        * damage (float): The total damage the unit took
+        * destroyed (bool): Whether the unit was destroyed, not counting removals by its owner
+
+    """
+    __slots__ = ("unit_id", "location", "unit_type", "player_index", "damage", "destroyed")
+
+    def __init__(self, unit_id, location, unit_type, player_index):
+        self.unit_id = unit_id
+        self.location = location
+        self.unit_type = unit_type
+        self.player_index = player_index
+        self.damage = 0
+        self.destroyed = False
+
+    def __repr__(self):
+        return "UnitDamage({}, {} at {}, player {}, damage {}, destroyed {})".format(
+            self.unit_id, self.unit_type, self.location, self.player_index, self.damage, self.destroyed)
+
+
+class ActionPhaseSummary:
+    """Accumulates what happened during one action phase
+
+    AlgoCore adds the events of every action frame to a summary and hands the finished summary to the
+    next on_turn as AlgoCore.last_action_summary. Every event is recorded in constant time,
+    keyed by unit id or location.
+
+    The engine reports removal and upgrade orders as spawn events of the REMOVE and UPGRADE types. They are
+    recorded in removal_locations and upgrade_locations, so spawns and spawn_locations only hold real units.
+
+    Attributes :
+        * turn_number (int): The turn the action phase followed
+        * frames (int): The number of action frames added
+        * units (dict): Maps the id of every unit that took damage or was destroyed to its UnitDamage
+        * breaches (list): For each player, a Counter of the (x, y) locations they scored at
+        * breach_damage (list): For each player, the total health they took from their opponent
+        * spawns (list): For each player, a Counter of the unit types they spawned
+        * spawn_locations (list): For each player, a Counter of the (x, y, unit_type) of the units they spawned
+        * removal_locations (list): For each player, a Counter of the (x, y) of the structures they ordered removed
+        * upgrade_locations (list): For each player, a Counter of the (x, y) of the structures they upgraded
+        * shield_given (list): For each player, the total shield their supports gave
+        * removed (list): For each player, the number of units they removed
+
+    """
+    KEYS = ("spawn", "damage", "shield", "breach", "death")
+
+    def __init__(self, turn_number=None, context=None):
+        """Starts an empty summary
+
+        Args:
+            turn_number: The turn the action phase follows
+            context: The GameContext of the game, used to tell removal and upgrade orders from spawned units.
+                If None, the default shorthands RM and UP are used.
+
+        """
+        self.turn_number = turn_number
+        self.frames = 0
+        self.units = {}
+        self.breaches = [Counter(), Counter()]
+        self.breach_damage = [0, 0]
+        self.spawns = [Counter(), Counter()]
+        self.spawn_locations = [Counter(), Counter()]
+        self.removal_locations = [Counter(), Counter()]
+        self.upgrade_locations = [Counter(), Counter()]
+        self.shield_given = [0, 0]
+        self.removed = [0, 0]
+        self.__orders = {
+            context.REMOVE if context is not None else "RM": self.removal_locations,
+            context.UPGRADE if context is not None else "UP": self.upgrade_locations,
+        }
+        self.__handlers = {
+            "spawn": self.__add_spawn,
+            "damage": self.__add_damage,
+            "shield": self.__add_shield,
+            "breach": self.__add_breach,
+            "death": self.__add_death,
+        }
+
+    def add(self, event):
+        """Records one event. Events of types not in KEYS are ignored.
+
+        Args:
+            event: A FrameEvent
+
+        """
+        handler = self.__handlers.get(event.KEY)
+        if handler is not None:
+            handler(event)
+
+    def add_frame(self, events):
+        """Records the events of one action frame
+
+        Args:
+            events: The FrameEvents of the frame, for example from iter_events(frame, context, ActionPhaseSummary.KEYS)
+
+        """
+        self.frames += 1
+        for event in events:
+            self.add(event)
+
+    def __unit(self, event):
+        unit = self.units.get(event.unit_id)
+        if unit is None:
+            unit = self.units[event.unit_id] = UnitDamage(event.unit_id, event.location, event.unit_type, event.player_index)
+        else:
+            unit.location = event.location
+        return unit
+
+    def __add_spawn(self, event):
+        orders = self.__orders.get(event.unit_type)
+        if orders is not None:
+            orders[event.player_index][event.location[0], event.location[1]] += 1
+            return
+        self.spawns[event.player_index][event.unit_type] += 1
+        self.spawn_locations[event.player_index][(event.location[0], event.location[1], event.unit_type)] += 1
+
+    def __add_damage(self, event):
+        self.__unit(event).damage += event.damage
+
+    def __add_shield(self, event):
+        self.shield_given[event.player_index] += event.amount
+
+    def __add_breach(self, event):
+        self.breaches[event.player_index][tuple(event.location)] += 1
+        self.breach_damage[event.player_index] += event.damage
+
+    def __add_death(self, event):
+        if event.intentional:
+            self.removed[event.player_index] += 1
+        else:
+            self.__unit(event).destroyed = True
+
+    def damaged_units(self, player_index, unit_types=None):
+        """Gets the units of a player that took damage or were destroyed
+
+        Args:
+            player_index: The owner of the units, 0 for yourself and 1 for your opponent
+            unit_types: The unit types to include, such as STRUCTURE_TYPES. All types if None.
+
+        Returns:
+            A list of UnitDamage
+
+        """
+        return [unit for unit in self.units.values()
+                if unit.player_index == player_index and (unit_types is None or unit.unit_type in unit_types)]
+
+    def breach_locations(self, player_index):
+        """Gets the locations a player scored at
+
+        Args:
+            player_index: The player who scored. Use 1 for the locations you were scored on at.
+
+        Returns:
+            A list of (x, y), once for each location
+
+        """
+        return list(self.breaches[player_index])
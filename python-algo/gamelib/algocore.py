@@ -1,7 +1,16 @@
-import json
+import os
+import sys
+import time
 
 from .game_state import GameState
-from .util import get_command, debug_write, BANNER_TEXT, send_command
+from .timing import TurnTimer, AdaptiveBudget, get_turn_timer, set_turn_timer, limits_from_config, get_startup_report
+from .background import BackgroundWorker
+from .speculation import Speculation, provisional_state
+from .context import GameContext
+from .debug_log import DebugLog, set_debug_log
+from .events import EVENT_TYPES, iter_events
+from .action_summary import ActionPhaseSummary
+from .util import get_command_bytes, debug_write, BANNER_TEXT, send_command, json_loads, json_dumps
 
 class AlgoCore(object):
     """
@@ -10,10 +19,53 @@ class AlgoCore(object):
 
     Attributes :
         * config (JSON): json object containing information about the game
+        * turn_soft_limit (float): The number of seconds we aim to finish each turn within.
+            If None when the game starts, waitTimeBotSoft from the config less time_safety_margin.
+        * turn_hard_limit (float): The number of seconds after which the watchdog submits the fallback turn.
+            If None when the game starts, waitTimeBotMax from the config less time_safety_margin.
+        * time_safety_margin (float): The fraction of the config time limits kept in reserve
+        * time_budget (:obj: AdaptiveBudget): Tracks how long turns take, and scales the work to do in on_turn
+            to stay under turn_soft_limit. Use time_budget.scale or time_budget.scaled(amount).
+        * use_watchdog (bool): If True, a background watchdog submits the fallback turn when on_turn runs past turn_hard_limit.
+            See GameState.save_fallback_turn
+        * last_turn_duration (float): The number of seconds the last call to on_turn took
+        * background (:obj: BackgroundWorker): Runs tasks submitted with run_in_background during the action phase
+        * background_results (dict): The results of the background tasks that finished before this turn started, by key
+        * background_wait (float): The number of seconds to wait at the start of a turn for unfinished background tasks
+        * use_speculation (bool): If True, on_speculative_turn is run in the background on the board predicted
+            from the last action frame, before the next turn message arrives
+        * speculation (:obj: Speculation): The speculation made for the current turn, or None
+        * summarize_action_phase (bool): If True, the events of every action phase are collected into an ActionPhaseSummary
+        * last_action_summary (:obj: ActionPhaseSummary): The summary of the action phase before this turn, or None
+        * debug_log (:obj: DebugLog): Writes debug_write output from a background thread once the game starts.
+            Set debug_log.rate_limit to change how many warnings of each kind are written per turn.
+        * value_network_file (str): The .npz file of weights loaded into value_network when the game starts, looked up
+            in the folder of algo_strategy.py. Set to None to not load one.
+        * value_network (:obj: ValueNetwork): The network used by evaluate_states, or None if no weights were found
 
     """
+    SPECULATION_KEY = "speculation"
+
     def __init__(self):
         self.config = None
+        self.turn_soft_limit = None
+        self.turn_hard_limit = None
+        self.time_safety_margin = 0.2
+        self.time_budget = None
+        self.use_watchdog = False
+        self.last_turn_duration = None
+        self.background = BackgroundWorker()
+        self.background_results = {}
+        self.background_wait = 0
+        self.use_speculation = False
+        self.speculation = None
+        self.__pending_speculation = None
+        self.summarize_action_phase = True
+        self.last_action_summary = None
+        self.__action_summary = None
+        self.debug_log = DebugLog()
+        self.value_network_file = "value_net.npz"
+        self.value_network = None
 
     def on_game_start(self, config):
         """
@@ -31,8 +83,10 @@ class AlgoCore(object):
         algo_strategy.py inherits from AlgoCore and overrides this on turn function. 
         Adjusting the on_turn function in algo_strategy is the main way to adjust your algo's logic. 
         """
-        send_command("[]")
-        send_command("[]")
+        timer = get_turn_timer()
+        if timer is None or timer.claim_submission():
+            send_command("[]")
+            send_command("[]")
     
     def on_action_frame(self, action_frame_game_state):
         """
@@ -40,9 +94,115 @@ class AlgoCore(object):
         The action phase is made up of a sequence of distinct frames. 
         Each of these frames is sent to the algo in order. 
         They can be handled in this function. 
+        The events in each frame are also passed to the event callbacks below, such as on_breach,
+        with unit types as shorthands and players as player_index 0 (yourself) and 1 (your opponent).
+        Events are only built for the callbacks you override. See gamelib.events.
         """
         pass
 
+    def on_spawn(self, event):
+        """
+        Called with a SpawnEvent for every action frame event where a unit is spawned.
+        """
+        pass
+
+    def on_move(self, event):
+        """
+        Called with a MoveEvent for every action frame event where a mobile unit moves.
+        """
+        pass
+
+    def on_attack(self, event):
+        """
+        Called with a AttackEvent for every action frame event where a unit attacks.
+        """
+        pass
+
+    def on_damage(self, event):
+        """
+        Called with a DamageEvent for every action frame event where a unit takes damage.
+        """
+        pass
+
+    def on_shield(self, event):
+        """
+        Called with a ShieldEvent for every action frame event where a support shields a unit.
+        """
+        pass
+
+    def on_breach(self, event):
+        """
+        Called with a BreachEvent for every action frame event where a unit scores on either player.
+        """
+        pass
+
+    def on_self_destruct(self, event):
+        """
+        Called with a SelfDestructEvent for every action frame event where a unit self destructs.
+        """
+        pass
+
+    def on_death(self, event):
+        """
+        Called with a DeathEvent for every action frame event where a unit is destroyed or removed.
+        """
+        pass
+
+    def on_speculative_turn(self, provisional_game_state):
+        """
+        Called in the background with the next turn's board, predicted from the last action frame, when use_speculation is True.
+        Whatever this returns is available in the next on_turn as self.speculation.plan. 
+        Call self.speculation.reconcile(game_state) in on_turn to see how the prediction differs from the real turn. 
+        Do not submit a turn from here.
+        If the next turn starts before this returns, the speculation is dropped. Searches should check
+        gamelib.background.task_cancelled() between candidates and stop once it is True, so they do not slow down on_turn.
+        """
+        return None
+
+    def evaluate_states(self, game_states):
+        """
+        Scores GameStates with value_network, in batches. Higher is better for you. 
+        Use it in on_turn to compare candidate placements tried out on copies of the turn's state, made with GameState.copy(). 
+        Returns a list with one score per state, or None if no network is loaded.
+        """
+        if self.value_network is None:
+            return None
+        return self.value_network.evaluate_states(game_states).tolist()
+
+    def load_value_network(self, file_name=None):
+        """
+        Loads value_network from a .npz file of weights, see gamelib.value_net. 
+        file_name defaults to value_network_file, and relative names are looked up in the folder of algo_strategy.py. 
+        Called when the game starts, after on_game_start. Returns the network, or None if the file does not exist
+        or NumPy is not installed.
+        """
+        file_name = file_name or self.value_network_file
+        if file_name is None:
+            return None
+        module_file = getattr(sys.modules.get(type(self).__module__), "__file__", None)
+        folder = os.path.dirname(os.path.abspath(module_file)) if module_file else os.getcwd()
+        path = os.path.join(folder, file_name)
+        if not os.path.exists(path):
+            return None
+        from .value_net import ValueNetwork
+        try:
+            self.value_network = ValueNetwork.load(path)
+        except ImportError as error:
+            debug_write("Could not load the value network: {}".format(error))
+            return None
+        return self.value_network
+
+    def run_in_background(self, key, function, *args, **kwargs):
+        """
+        Runs function(*args, **kwargs) in a background thread while the action phase plays out. 
+        The result is available in the next turn as self.background_results[key].
+        Call this at the end of on_turn, after submitting the turn, to precompute analysis for the next turn.
+        The function must not change objects that on_action_frame or the next on_turn use.
+        A task that has not finished when the next turn starts is dropped, but its thread cannot be stopped: it keeps
+        competing with on_turn and holds up later tasks, including speculation. Long tasks should check
+        gamelib.background.task_cancelled() regularly and return early once it is True.
+        """
+        self.background.submit(key, function, *args, **kwargs)
 
     def start(self):
         """ 
@@ -51,45 +211,170 @@ class AlgoCore(object):
         engine, proccess this information, and respond if needed to take it's turn. 
         The algo continues this loop until it recieves the "End" turn message from the game.
         """
+        startup = get_startup_report()
+        startup.mark("create algo")
         debug_write(BANNER_TEXT)
+        self.debug_log.start()
+        set_debug_log(self.debug_log)
+        event_callbacks = self.__event_callbacks()
+        # Action frames are only decoded to str when on_action_frame is overridden, as most algos never read them
+        wants_frames = type(self).on_action_frame is not AlgoCore.on_action_frame
+        context = None
 
         while True:
             # Note: Python blocks and hangs on stdin. Can cause issues if connections aren't setup properly and may need to
             # manually kill this Python program.
-            game_state_string = get_command()
-            if "replaySave" in game_state_string:
+            message = get_command_bytes()
+            turn_start = time.monotonic()
+            if b"replaySave" in message:
                 """
                 This means this must be the config file. So, load in the config file as a json and add it to your AlgoStrategy class.
                 """
-                parsed_config = json.loads(game_state_string)
+                startup.mark("wait for config")
+                parsed_config = json_loads(message)
+                context = GameContext.for_config(parsed_config)
                 self.on_game_start(parsed_config)
-            elif "turnInfo" in game_state_string:
-                state = json.loads(game_state_string)
+                startup.mark("on_game_start")
+                self.__configure_time_limits(parsed_config)
+                if self.value_network is None:
+                    self.load_value_network()
+                startup.mark("setup")
+                debug_write(startup.summary())
+            elif b"turnInfo" in message:
+                state = json_loads(message)
                 stateType = int(state.get("turnInfo")[0])
                 if stateType == 0:
                     """
                     This is the game turn game state message. Algo must now print to stdout 2 lines, one for build phase one for
                     deploy phase. Printing is handled by the provided functions.
                     """
-                    self.on_turn(game_state_string)
+                    self.__play_turn(message.decode(), state, context, turn_start)
                 elif stateType == 1:
                     """
-                    If stateType == 1, this game_state_string string represents a single frame of an action phase
+                    If stateType == 1, this message represents a single frame of an action phase
                     """
-                    self.on_action_frame(game_state_string)
+                    if wants_frames:
+                        self.on_action_frame(message.decode())
+                    self.__dispatch_events(state, context, event_callbacks)
+                    if self.use_speculation:
+                        self.__speculate(state, message)
                 elif stateType == 2:
                     """
                     This is the end game message. This means the game is over so break and finish the program.
                     """
                     debug_write("Got end state, game over. Stopping algo.")
+                    self.background.shutdown()
+                    self.debug_log.end_turn()
+                    self.debug_log.flush()
                     break
                 else:
                     """
                     Something is wrong? Received an incorrect or improperly formatted string.
                     """
-                    debug_write("Got unexpected string with turnInfo: {}".format(game_state_string))
+                    debug_write("Got unexpected string with turnInfo: {}".format(message.decode()))
             else:
                 """
                 Something is wrong? Received an incorrect or improperly formatted string.
                 """
-                debug_write("Got unexpected string : {}".format(game_state_string))
+                debug_write("Got unexpected string : {}".format(message.decode()))
+
+    def __event_callbacks(self):
+        """
+        Finds the event callbacks overridden by the subclass, by event type.
+        """
+        callbacks = {}
+        for event_type in EVENT_TYPES:
+            if getattr(type(self), event_type.CALLBACK) is not getattr(AlgoCore, event_type.CALLBACK):
+                callbacks[event_type.KEY] = getattr(self, event_type.CALLBACK)
+        return callbacks
+
+    def __dispatch_events(self, state, context, event_callbacks):
+        """
+        Builds the events of an action frame that the summary or a callback needs, and passes them on.
+        """
+        summary = self.__action_summary if self.summarize_action_phase else None
+        if summary is not None:
+            summary.frames += 1
+        keys = [event_type.KEY for event_type in EVENT_TYPES
+                if event_type.KEY in event_callbacks or (summary is not None and event_type.KEY in ActionPhaseSummary.KEYS)]
+        if not keys:
+            return
+        for event in iter_events(state, context, keys):
+            if summary is not None:
+                summary.add(event)
+            callback = event_callbacks.get(event.KEY)
+            if callback is not None:
+                callback(event)
+
+    def __configure_time_limits(self, config):
+        """
+        Fills in the time limits not set by the strategy from the config, and starts the time budget.
+        """
+        soft_limit, hard_limit = limits_from_config(config, self.time_safety_margin)
+        if self.turn_soft_limit is None:
+            self.turn_soft_limit = soft_limit
+        if self.turn_hard_limit is None:
+            self.turn_hard_limit = hard_limit
+        if self.time_budget is None:
+            self.time_budget = AdaptiveBudget(self.turn_soft_limit)
+
+    def __play_turn(self, game_state_string, state, context, turn_start):
+        """
+        Times on_turn, and starts the watchdog if it is enabled.
+        """
+        turn_number = state["turnInfo"][1]
+        if self.last_turn_duration is not None:
+            # The engine reports how long it waited for our previous turn, which includes reading and writing messages
+            reported_duration = state["p1Stats"][3] / 1000
+            self.time_budget.record(max(self.last_turn_duration, reported_duration))
+        timer = TurnTimer(self.turn_soft_limit, self.turn_hard_limit, turn_start)
+        set_turn_timer(timer)
+        if self.use_watchdog:
+            timer.start_watchdog(self.__submit_fallback_turn)
+        self.background_results = self.background.collect(self.background_wait)
+        self.speculation = self.__pending_speculation
+        self.__pending_speculation = None
+        if self.speculation is not None:
+            self.speculation.plan = self.background_results.pop(self.SPECULATION_KEY, None)
+
+        self.last_action_summary = self.__action_summary
+        self.__action_summary = ActionPhaseSummary(turn_number, context)
+
+        try:
+            self.on_turn(game_state_string)
+        finally:
+            # States built after on_turn, such as in on_action_frame, must not submit with this turn's timer
+            set_turn_timer(None)
+
+        self.last_turn_duration = timer.elapsed()
+        if self.last_turn_duration > self.turn_soft_limit:
+            debug_write("Turn took {:.2f}s, more than the soft limit of {}s".format(self.last_turn_duration, self.turn_soft_limit))
+        if not timer.submitted:
+            debug_write("on_turn returned without submitting the turn. Call GameState.submit_turn() at the end of on_turn.")
+        self.debug_log.end_turn()
+
+    def __speculate(self, state, message):
+        """
+        Starts planning the next turn once the action phase is over, which is when no mobile units are left.
+        """
+        turn_number, frame_number = state["turnInfo"][1:3]
+        if frame_number == 0 or (self.__pending_speculation is not None and self.__pending_speculation.state.turn_number > turn_number):
+            return
+        for player_units in [state["p1Units"], state["p2Units"]]:
+            if player_units[3] or player_units[4] or player_units[5]:
+                return
+        speculation = Speculation(provisional_state(self.config, message.decode()))
+        self.__pending_speculation = speculation
+        # The strategy plans on a copy, so its own moves are not reported as prediction errors by reconcile
+        self.run_in_background(self.SPECULATION_KEY, self.on_speculative_turn, speculation.state.copy())
+
+    def __submit_fallback_turn(self, timer):
+        """
+        Called by the watchdog thread when on_turn runs past the hard limit.
+        """
+        if not timer.claim_submission():
+            return
+        build_stack, deploy_stack = timer.fallback
+        debug_write("Turn ran past the hard limit of {}s, submitting the fallback turn".format(timer.hard_limit))
+        send_command(json_dumps(build_stack))
+        send_command(json_dumps(deploy_stack))
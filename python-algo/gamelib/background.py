@@ -0,0 +1,145 @@
+import threading
+
+from .util import debug_write
+
+_task = threading.local()
+
+
+def task_cancelled():
+    """Check if the background task running in this thread has been dropped
+
+    Python threads cannot be stopped from outside, so a task that misses the start of the next turn keeps
+    running, competing with on_turn for the interpreter and holding up later tasks. Long tasks, such as a
+    search in AlgoCore.on_speculative_turn, should call this regularly and return early once it is True.
+
+    Returns:
+        True if the task was dropped by BackgroundWorker.collect, replaced or shut down. False outside a
+        background task, and always False in worker processes.
+
+    """
+    cancelled = getattr(_task, "cancelled", None)
+    return cancelled is not None and cancelled.is_set()
+
+
+def _run_task(cancelled, function, args, kwargs):
+    _task.cancelled = cancelled
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _task.cancelled = None
+
+
+class BackgroundWorker:
+    """Runs analysis for the next turn while the action phase of this turn plays out
+
+    Tasks are submitted under a key, usually at the end of on_turn, and run in a worker thread
+    (or process) while AlgoCore keeps reading action frames. When the next turn message arrives
+    AlgoCore collects the finished results and makes them available to on_turn as
+    AlgoCore.background_results.
+
+    Tasks run in a thread by default, so they must not change objects the main thread is using.
+    Worker processes avoid sharing the interpreter with the main loop, but the task function and its
+    arguments must be picklable.
+
+    A thread cannot be stopped once its task has started. Dropped tasks are flagged instead, and should
+    check task_cancelled() and return early, as they hold up later tasks until they do.
+
+    Attributes :
+        * processes (bool): Whether tasks run in worker processes instead of a worker thread
+        * max_workers (int): The number of tasks that can run at the same time
+
+    """
+    def __init__(self, max_workers=1, processes=False):
+        """Sets up the worker. No thread or process is started until the first task is submitted.
+
+        Args:
+            max_workers: The number of tasks that can run at the same time
+            processes: If True, run tasks in worker processes instead of worker threads
+
+        """
+        self.processes = processes
+        self.max_workers = max_workers
+        self.__executor = None
+        self.__pending = {}
+
+    def submit(self, key, function, *args, **kwargs):
+        """Starts running function(*args, **kwargs) in the background
+
+        Args:
+            key: The key the result is collected under. Submitting a key again replaces the earlier task.
+            function: The function to run
+
+        """
+        if self.__executor is None:
+            # Imported here, as concurrent.futures and multiprocessing add tens of milliseconds to startup
+            from concurrent import futures
+            executor_type = futures.ProcessPoolExecutor if self.processes else futures.ThreadPoolExecutor
+            self.__executor = executor_type(max_workers=self.max_workers)
+        previous = self.__pending.pop(key, None)
+        if previous is not None:
+            self.__drop(previous)
+        if self.processes:
+            self.__pending[key] = (self.__executor.submit(function, *args, **kwargs), None)
+        else:
+            cancelled = threading.Event()
+            self.__pending[key] = (self.__executor.submit(_run_task, cancelled, function, args, kwargs), cancelled)
+
+    @staticmethod
+    def __drop(task):
+        future, cancelled = task
+        future.cancel()
+        if cancelled is not None:
+            cancelled.set()
+
+    def pending(self):
+        """
+        Returns:
+            The keys of tasks that have been submitted but not collected
+        """
+        return list(self.__pending)
+
+    def collect(self, timeout=0):
+        """Collects the results of submitted tasks
+
+        Tasks that have not finished within timeout are dropped: tasks that have not started are
+        cancelled, and tasks that are still running are flagged so task_cancelled() returns True in them
+        and their results are ignored. Tasks that raised an
+        exception are reported with debug_write and left out of the results.
+
+        Args:
+            timeout: The number of seconds to wait for unfinished tasks
+
+        Returns:
+            A dict mapping the key of each finished task to its result
+
+        """
+        pending = self.__pending
+        self.__pending = {}
+        if timeout > 0 and pending:
+            from concurrent.futures import wait
+            wait([future for future, _ in pending.values()], timeout=timeout)
+
+        results = {}
+        for key, task in pending.items():
+            future = task[0]
+            if not future.done():
+                self.__drop(task)
+                debug_write("Background task {} did not finish in time, dropping it".format(key))
+            elif not future.cancelled():
+                error = future.exception()
+                if error is not None:
+                    debug_write("Background task {} failed: {}".format(key, repr(error)))
+                else:
+                    results[key] = future.result()
+        return results
+
+    def shutdown(self):
+        """Stops the worker, cancelling tasks that have not started and flagging tasks that are running
+        """
+        for task in self.__pending.values():
+            self.__drop(task)
+        if self.__executor is not None:
+            # shutdown(cancel_futures=True) needs Python 3.9, so pending tasks are cancelled by __drop above
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+        self.__pending = {}
@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from .unit_types import UnitTypeTable
+from .resources import ResourceProjector
+from .path_outcome import PathOutcomeEvaluator
+from .features import BoardFeatures
+
+
+def _build_edges(arena_size, half_arena):
+    top_right = tuple((half_arena + num, arena_size - 1 - num) for num in range(half_arena))
+    top_left = tuple((half_arena - 1 - num, arena_size - 1 - num) for num in range(half_arena))
+    bottom_left = tuple((half_arena - 1 - num, num) for num in range(half_arena))
+    bottom_right = tuple((half_arena + num, num) for num in range(half_arena))
+    return (top_right, top_left, bottom_left, bottom_right)
+
+
+def _build_half_masks(arena_size, half_arena):
+    masks = [0, 0]
+    for y in range(arena_size):
+        row_size = y + 1 if y < half_arena else arena_size - y
+        for x in range(half_arena - row_size, half_arena + row_size):
+            masks[0 if y < half_arena else 1] |= 1 << (x * arena_size + y)
+    return tuple(masks)
+
+
+class GameContext:
+    """The constants derived from one config, shared by GameState, GameMap and GameUnit
+
+    A context never changes after it is created, and there is one per config, so states built
+    from different configs can be held at the same time and states can be built in worker threads.
+    Use GameContext.for_config(config) rather than creating contexts directly. The contexts of the last
+    CACHE_SIZE configs used are kept, so a harness that plays many configs does not hold on to all of them.
+
+    Attributes :
+        * config (JSON): The config the context was built from
+        * unit_types (:obj: UnitTypeTable): The compiled stats of every unit type
+        * resources (:obj: ResourceProjector): Projects resources over future turns
+        * path_outcomes (:obj: PathOutcomeEvaluator): Evaluates what happens to mobile units sent down a path
+        * features (:obj: BoardFeatures): Encodes states as arrays for learned evaluations
+        * UNIT_TYPE_TO_INDEX (dict): Maps a unit to a corresponding index. Read-only.
+        * WALL (str): A constant representing the wall unit
+        * SUPPORT (str): A constant representing the support unit
+        * TURRET (str): A constant representing the turret unit
+        * SCOUT (str): A constant representing the scout unit
+        * DEMOLISHER (str): A constant representing the demolisher unit
+        * INTERCEPTOR (str): A constant representing the interceptor unit
+        * REMOVE (str): A constant representing removing your own unit
+        * UPGRADE (str): A constant representing upgrading a unit
+        * STRUCTURE_TYPES (tuple): The structure units
+        * ALL_UNITS (tuple): The units that can be spawned
+        * ARENA_SIZE (int): The size of the arena
+        * HALF_ARENA (int): Half the size of the arena
+        * MP (int): A constant representing the Mobile Points resource, used in the get_resource function
+        * SP (int): A constant representing the SP resource, used in the get_resource function
+        * GET_HIT_RADIUS (float): The distance beyond a unit's range at which locations are still affected by it
+        * EDGES (tuple): The (x, y) of the locations along each edge, indexed by GameMap.TOP_RIGHT and similar constants
+        * EDGE_SETS (tuple): The locations of each edge as a frozenset of (x, y), for constant time membership tests
+        * PLAYER_EDGE_SETS (tuple): The frozenset of (x, y) of the two edges each player spawns mobile units on, indexed by player_index
+        * ARENA_MASK (int): A bitmask of the locations on the board. Location [x, y] is bit x * ARENA_SIZE + y.
+        * PLAYER_HALF_MASKS (tuple): A bitmask of the locations on each player's half of the board, indexed by player_index
+        * PLAYER_EDGE_MASKS (tuple): A bitmask of the locations on the edges each player spawns mobile units on, indexed by player_index
+        * CACHE_SIZE (int): The number of configs whose contexts are kept by for_config
+
+
+    """
+    CACHE_SIZE = 8
+    _contexts = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, config):
+        """Builds the context. Prefer GameContext.for_config(config).
+
+        Args:
+            config (JSON): Contains information about the game
+
+        """
+        unit_types = UnitTypeTable(config)
+        shorthands = unit_types.shorthands
+        edges = _build_edges(28, 14)
+        edge_sets = tuple(frozenset(edge) for edge in edges)
+        player_edge_sets = (edge_sets[2] | edge_sets[3], edge_sets[0] | edge_sets[1])
+        half_masks = _build_half_masks(28, 14)
+        path_outcomes = PathOutcomeEvaluator(unit_types, config["unitInformation"][0].get("getHitRadius", 0))
+        constants = {
+            "config": config,
+            "unit_types": unit_types,
+            "resources": ResourceProjector(config),
+            "path_outcomes": path_outcomes,
+            "features": BoardFeatures(path_outcomes, 28, half_masks[0] | half_masks[1]),
+            "UNIT_TYPE_TO_INDEX": MappingProxyType({shorthand: index for index, shorthand in enumerate(shorthands[:8])}),
+            "WALL": shorthands[0],
+            "SUPPORT": shorthands[1],
+            "TURRET": shorthands[2],
+            "SCOUT": shorthands[3],
+            "DEMOLISHER": shorthands[4],
+            "INTERCEPTOR": shorthands[5],
+            "REMOVE": shorthands[6],
+            "UPGRADE": shorthands[7],
+            "STRUCTURE_TYPES": (shorthands[0], shorthands[1], shorthands[2]),
+            "ALL_UNITS": (shorthands[3], shorthands[4], shorthands[5], shorthands[0], shorthands[1], shorthands[2]),
+            "ARENA_SIZE": 28,
+            "HALF_ARENA": 14,
+            "MP": 1,
+            "SP": 0,
+            "GET_HIT_RADIUS": config["unitInformation"][0].get("getHitRadius", 0),
+            "EDGES": edges,
+            "EDGE_SETS": edge_sets,
+            "PLAYER_EDGE_SETS": player_edge_sets,
+            "ARENA_MASK": half_masks[0] | half_masks[1],
+            "PLAYER_HALF_MASKS": half_masks,
+            "PLAYER_EDGE_MASKS": tuple(sum(1 << (x * 28 + y) for x, y in edge_set) for edge_set in player_edge_sets),
+        }
+        for name, value in constants.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameContext is read-only")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @classmethod
+    def for_config(cls, config):
+        """Gets the context for a config, building it the first time the config is seen
+
+        Args:
+            config (JSON): Contains information about the game
+
+        Returns:
+            The GameContext for config
+
+        """
+        # Contexts are keyed by id(config). A cached context holds its config, so the id cannot be reused
+        # by another config until the context is dropped from the cache.
+        key = id(config)
+        with cls._lock:
+            context = cls._contexts.get(key)
+            if context is not None and context.config is config:
+                cls._contexts.move_to_end(key)
+                return context
+            context = cls._contexts[key] = cls(config)
+            while len(cls._contexts) > cls.CACHE_SIZE:
+                cls._contexts.popitem(last=False)
+            return context
@@ -0,0 +1,146 @@
+import atexit
+import queue
+import sys
+import threading
+from collections import Counter
+
+
+_active_log = None
+
+
+def get_debug_log():
+    """Gets the log debug_write sends messages to
+
+    Returns:
+        The DebugLog set with set_debug_log, or None if messages are written to stderr directly
+
+    """
+    return _active_log
+
+
+def set_debug_log(log):
+    """Sets the log debug_write sends messages to.
+    Should usually only be called by AlgoCore.
+
+    Args:
+        log: A DebugLog, or None to write to stderr directly
+
+    """
+    global _active_log
+    _active_log = log
+
+
+class DebugLog:
+    """Writes debug output from a background thread, and limits how often each kind of message is written
+
+    Writing and flushing stderr for every message can take a noticeable part of a turn when a strategy
+    produces hundreds of warnings. Once started, a DebugLog queues messages and a writer thread writes
+    them in batches, flushing once per batch.
+
+    Messages can be given a key, such as "can_spawn". Only the first rate_limit messages with a key are
+    written each turn; end_turn then writes one summary line for every key that went over the limit,
+    such as "can_spawn: 312 warnings, 307 not shown. Not enough resources (300), Location is blocked (12)".
+    Messages without a key are always written.
+
+    Attributes :
+        * rate_limit (int): The number of messages with the same key written per turn
+        * stream: The stream messages are written to. sys.stderr at the time of writing if None.
+
+    """
+    def __init__(self, rate_limit=5, stream=None):
+        """Sets up the log. No thread is started until start is called, messages are written immediately before that.
+
+        Args:
+            rate_limit: The number of messages with the same key written per turn
+            stream: The stream messages are written to, sys.stderr if None
+
+        """
+        self.rate_limit = rate_limit
+        self.stream = stream
+        self.__queue = queue.Queue()
+        self.__thread = None
+        self.__lock = threading.Lock()
+        self.__counts = {}
+
+    def start(self):
+        """Starts the writer thread. Queued messages are flushed when the program exits.
+        """
+        if self.__thread is not None:
+            return
+        self.__thread = threading.Thread(target=self.__write_loop, name="DebugLog", daemon=True)
+        self.__thread.start()
+        atexit.register(self.flush)
+
+    def running(self):
+        """
+        Returns:
+            True if messages are written by the writer thread
+        """
+        return self.__thread is not None
+
+    def write(self, message, key=None, detail=None):
+        """Writes a message, unless its key has reached the rate limit this turn
+
+        Args:
+            message: The message
+            key: The kind of message, used for rate limiting. Never limited if None.
+            detail: A short reason counted in the summary for key, such as "Not enough resources"
+
+        """
+        if key is not None:
+            with self.__lock:
+                entry = self.__counts.setdefault(key, [0, Counter()])
+                entry[0] += 1
+                if detail:
+                    entry[1][detail] += 1
+                limited = entry[0] > self.rate_limit
+            if limited:
+                return
+        self.__output(message)
+
+    def end_turn(self):
+        """Writes a summary for every key that went over the rate limit, and resets the limits
+        """
+        with self.__lock:
+            counts = self.__counts
+            self.__counts = {}
+        for key, (count, details) in counts.items():
+            if count <= self.rate_limit:
+                continue
+            summary = "{}: {} warnings, {} not shown.".format(key, count, count - self.rate_limit)
+            if details:
+                summary += " " + ", ".join("{} ({})".format(detail, times) for detail, times in details.most_common())
+            self.__output(summary)
+
+    def flush(self):
+        """Waits until every queued message has been written
+        """
+        if self.__thread is not None and self.__thread.is_alive():
+            self.__queue.join()
+
+    def __output(self, message):
+        if self.__thread is None:
+            stream = self.stream or sys.stderr
+            stream.write(message + "\n")
+            stream.flush()
+        else:
+            self.__queue.put(message)
+
+    def __write_loop(self):
+        while True:
+            lines = [self.__queue.get()]
+            while True:
+                try:
+                    lines.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                stream = self.stream or sys.stderr
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+            except (OSError, ValueError):
+                # stderr is gone, most likely because the game process has exited
+                pass
+            finally:
+                for _ in lines:
+                    self.__queue.task_done()
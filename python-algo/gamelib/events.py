@@ -0,0 +1,263 @@
+class FrameEvent:
+    """Base class of the events in an action frame
+
+    Events are built straight from the lists in the frame's "events" object. Unit types are
+    shorthands, such as "FF", and players are translated from the frame's 1 (yourself) and 2 (your opponent)
+    to the player_index used everywhere else in gamelib, 0 and 1.
+
+    Attributes :
+        * KEY (str): The name of the event list in the frame, such as "breach"
+        * CALLBACK (str): The AlgoCore method called with events of this type, such as "on_breach"
+
+    """
+    __slots__ = ()
+    KEY = None
+    CALLBACK = None
+
+    def __repr__(self):
+        fields = ", ".join("{}={!r}".format(name, getattr(self, name)) for name in self.__slots__)
+        return "{}({})".format(type(self).__name__, fields)
+
+
+class SpawnEvent(FrameEvent):
+    """A unit was spawned
+
+    Attributes :
+        * location (list): The [x, y] the unit was spawned at
+        * unit_type (str): The type of the unit
+        * unit_id (str): The id of the unit
+        * player_index (int): The owner of the unit, 0 for yourself and 1 for your opponent
+
+    """
+    __slots__ = ("location", "unit_type", "unit_id", "player_index")
+    KEY = "spawn"
+    CALLBACK = "on_spawn"
+
+    def __init__(self, location, unit_type, unit_id, player_index):
+        self.location = location
+        self.unit_type = unit_type
+        self.unit_id = unit_id
+        self.player_index = player_index
+
+
+class MoveEvent(FrameEvent):
+    """A mobile unit moved
+
+    Attributes :
+        * from_location (list): The [x, y] the unit moved from
+        * to_location (list): The [x, y] the unit moved to
+        * unit_type (str): The type of the unit
+        * unit_id (str): The id of the unit
+        * player_index (int): The owner of the unit
+
+    """
+    __slots__ = ("from_location", "to_location", "unit_type", "unit_id", "player_index")
+    KEY = "move"
+    CALLBACK = "on_move"
+
+    def __init__(self, from_location, to_location, unit_type, unit_id, player_index):
+        self.from_location = from_location
+        self.to_location = to_location
+        self.unit_type = unit_type
+        self.unit_id = unit_id
+        self.player_index = player_index
+
+
+class AttackEvent(FrameEvent):
+    """A unit attacked another unit
+
+    Attributes :
+        * from_location (list): The [x, y] of the attacker
+        * to_location (list): The [x, y] of the target
+        * damage (float): The damage dealt
+        * unit_type (str): The type of the attacker
+        * attacker_id (str): The id of the attacker
+        * target_id (str): The id of the target
+        * player_index (int): The owner of the attacker
+
+    """
+    __slots__ = ("from_location", "to_location", "damage", "unit_type", "attacker_id", "target_id", "player_index")
+    KEY = "attack"
+    CALLBACK = "on_attack"
+
+    def __init__(self, from_location, to_location, damage, unit_type, attacker_id, target_id, player_index):
+        self.from_location = from_location
+        self.to_location = to_location
+        self.damage = damage
+        self.unit_type = unit_type
+        self.attacker_id = attacker_id
+        self.target_id = target_id
+        self.player_index = player_index
+
+
+class DamageEvent(FrameEvent):
+    """A unit took damage
+
+    Attributes :
+        * location (list): The [x, y] of the damaged unit
+        * damage (float): The damage taken
+        * unit_type (str): The type of the damaged unit
+        * unit_id (str): The id of the damaged unit
+        * player_index (int): The owner of the damaged unit
+
+    """
+    __slots__ = ("location", "damage", "unit_type", "unit_id", "player_index")
+    KEY = "damage"
+    CALLBACK = "on_damage"
+
+    def __init__(self, location, damage, unit_type, unit_id, player_index):
+        self.location = location
+        self.damage = damage
+        self.unit_type = unit_type
+        self.unit_id = unit_id
+        self.player_index = player_index
+
+
+class ShieldEvent(FrameEvent):
+    """A support shielded a mobile unit
+
+    Attributes :
+        * from_location (list): The [x, y] of the support
+        * to_location (list): The [x, y] of the shielded unit
+        * amount (float): The shield given
+        * unit_type (str): The type of the shielded unit
+        * giver_id (str): The id of the support
+        * receiver_id (str): The id of the shielded unit
+        * player_index (int): The owner of the support
+
+    """
+    __slots__ = ("from_location", "to_location", "amount", "unit_type", "giver_id", "receiver_id", "player_index")
+    KEY = "shield"
+    CALLBACK = "on_shield"
+
+    def __init__(self, from_location, to_location, amount, unit_type, giver_id, receiver_id, player_index):
+        self.from_location = from_location
+        self.to_location = to_location
+        self.amount = amount
+        self.unit_type = unit_type
+        self.giver_id = giver_id
+        self.receiver_id = receiver_id
+        self.player_index = player_index
+
+
+class BreachEvent(FrameEvent):
+    """A mobile unit reached an edge of the opponent's side and scored
+
+    Attributes :
+        * location (list): The [x, y] the unit scored at
+        * damage (float): The health the opponent lost
+        * unit_type (str): The type of the unit
+        * unit_id (str): The id of the unit
+        * player_index (int): The player who scored. An event with player_index 1 means you were scored on.
+
+    """
+    __slots__ = ("location", "damage", "unit_type", "unit_id", "player_index")
+    KEY = "breach"
+    CALLBACK = "on_breach"
+
+    def __init__(self, location, damage, unit_type, unit_id, player_index):
+        self.location = location
+        self.damage = damage
+        self.unit_type = unit_type
+        self.unit_id = unit_id
+        self.player_index = player_index
+
+
+class SelfDestructEvent(FrameEvent):
+    """A mobile unit that could not move any further self destructed
+
+    Attributes :
+        * location (list): The [x, y] of the unit
+        * targets (list): The [x, y] of every unit that was damaged
+        * damage (float): The damage dealt to each target
+        * unit_type (str): The type of the unit
+        * unit_id (str): The id of the unit
+        * player_index (int): The owner of the unit
+
+    """
+    __slots__ = ("location", "targets", "damage", "unit_type", "unit_id", "player_index")
+    KEY = "selfDestruct"
+    CALLBACK = "on_self_destruct"
+
+    def __init__(self, location, targets, damage, unit_type, unit_id, player_index):
+        self.location = location
+        self.targets = targets
+        self.damage = damage
+        self.unit_type = unit_type
+        self.unit_id = unit_id
+        self.player_index = player_index
+
+
+class DeathEvent(FrameEvent):
+    """A unit was destroyed or removed
+
+    Attributes :
+        * location (list): The [x, y] of the unit
+        * unit_type (str): The type of the unit
+        * unit_id (str): The id of the unit
+        * player_index (int): The owner of the unit
+        * intentional (bool): True if the unit was removed by its owner
+
+    """
+    __slots__ = ("location", "unit_type", "unit_id", "player_index", "intentional")
+    KEY = "death"
+    CALLBACK = "on_death"
+
+    def __init__(self, location, unit_type, unit_id, player_index, intentional):
+        self.location = location
+        self.unit_type = unit_type
+        self.unit_id = unit_id
+        self.player_index = player_index
+        self.intentional = intentional
+
+
+EVENT_TYPES = (SpawnEvent, MoveEvent, AttackEvent, DamageEvent, ShieldEvent, BreachEvent, SelfDestructEvent, DeathEvent)
+
+
+def _build_events(key, raw_events, shorthands):
+    if key == "spawn":
+        for location, unit_type, unit_id, player in raw_events:
+            yield SpawnEvent(location, shorthands[unit_type], unit_id, player - 1)
+    elif key == "move":
+        for from_location, to_location, _, unit_type, unit_id, player in raw_events:
+            yield MoveEvent(from_location, to_location, shorthands[unit_type], unit_id, player - 1)
+    elif key == "attack":
+        for from_location, to_location, damage, unit_type, attacker_id, target_id, player in raw_events:
+            yield AttackEvent(from_location, to_location, damage, shorthands[unit_type], attacker_id, target_id, player - 1)
+    elif key == "damage":
+        for location, damage, unit_type, unit_id, player in raw_events:
+            yield DamageEvent(location, damage, shorthands[unit_type], unit_id, player - 1)
+    elif key == "shield":
+        for from_location, to_location, amount, unit_type, giver_id, receiver_id, player in raw_events:
+            yield ShieldEvent(from_location, to_location, amount, shorthands[unit_type], giver_id, receiver_id, player - 1)
+    elif key == "breach":
+        for location, damage, unit_type, unit_id, player in raw_events:
+            yield BreachEvent(location, damage, shorthands[unit_type], unit_id, player - 1)
+    elif key == "selfDestruct":
+        for location, targets, damage, unit_type, unit_id, player in raw_events:
+            yield SelfDestructEvent(location, targets, damage, shorthands[unit_type], unit_id, player - 1)
+    elif key == "death":
+        for location, unit_type, unit_id, player, intentional in raw_events:
+            yield DeathEvent(location, shorthands[unit_type], unit_id, player - 1, intentional)
+
+
+def iter_events(frame, context, keys=None):
+    """Iterates over the events of an action frame
+
+    Args:
+        frame: The decoded action frame
+        context: The GameContext of the game, used to translate unit types to shorthands
+        keys: The event types to include, such as ["breach", "death"]. All of EVENT_TYPES if None.
+
+    Returns:
+        A generator of FrameEvent, grouped by type in the order of keys
+
+    """
+    events = frame.get("events", {})
+    shorthands = context.unit_types.shorthands
+    if keys is None:
+        keys = [event_type.KEY for event_type in EVENT_TYPES]
+    for key in keys:
+        raw_events = events.get(key)
+        if raw_events:
+            yield from _build_events(key, raw_events, shorthands)
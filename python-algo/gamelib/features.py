@@ -0,0 +1,199 @@
+_numpy = None
+
+
+def get_numpy():
+    """Imports NumPy the first time it is needed, so gamelib itself does not depend on it
+
+    Returns:
+        The numpy module
+
+    Raises:
+        ImportError: If NumPy is not installed
+
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("NumPy is required to encode game states as tensors. Install it with 'pip install numpy'.")
+        _numpy = numpy
+    return _numpy
+
+
+class BoardFeatures:
+    """Encodes GameStates as fixed-shape float32 arrays, for training and running learned evaluations
+
+    Each state becomes an array of shape (len(CHANNELS), ARENA_SIZE, ARENA_SIZE) indexed [channel, x, y].
+    The _0 channels describe your units and the _1 channels your opponent's:
+
+    * wall, support, turret: 1 where the player has a structure of that type
+    * upgraded: 1 where the player's structure is upgraded
+    * health: The health of the player's structure as a fraction of its max health
+    * scout, demolisher, interceptor: The number of the player's mobile units of that type
+    * threat: The damage per frame the player's structures deal to a mobile unit on the tile
+    * shield: The shield the player's supports give a mobile unit passing the tile
+
+    Structures are read with one walk of the board, GameMap.structure_units, and written with array scatters,
+    so the only Python work per structure is reading its owner, type and health. Threat and shield are spread
+    over the board with whole-array NumPy operations, one per offset in PathOutcomeEvaluator.offsets_in_range,
+    the range rule PathOutcomeEvaluator.damage_map uses. Batches share that work, so encode_batch is much
+    faster per state than encode. Each GameContext holds one encoder, as GameContext.features.
+    NumPy is imported the first time a state is encoded.
+
+    Attributes :
+        * CHANNELS (tuple): The name of each channel, in order
+
+    """
+    CHANNELS = ("wall_0", "support_0", "turret_0", "wall_1", "support_1", "turret_1",
+                "upgraded_0", "upgraded_1", "health_0", "health_1",
+                "scout_0", "demolisher_0", "interceptor_0", "scout_1", "demolisher_1", "interceptor_1",
+                "threat_0", "threat_1", "shield_0", "shield_1")
+    UPGRADED = 6
+    HEALTH = 8
+    MOBILE = 10
+    THREAT = 16
+    SHIELD = 18
+
+    def __init__(self, path_outcomes, arena_size, arena_mask):
+        """Sets up the encoder. The NumPy tables are built on first use.
+
+        Args:
+            path_outcomes: The PathOutcomeEvaluator of the config, used for its unit types and the offsets in range of a unit
+            arena_size: The size of the arena
+            arena_mask: A bitmask of the locations on the board, GameContext.ARENA_MASK
+
+        """
+        self.path_outcomes = path_outcomes
+        self.arena_size = arena_size
+        self.arena_mask = arena_mask
+        self.__in_arena = None
+        self.__max_healths = None
+
+    def encode(self, game_state):
+        """Encodes one state
+
+        Args:
+            game_state: The GameState
+
+        Returns:
+            A float32 array of shape (len(CHANNELS), ARENA_SIZE, ARENA_SIZE)
+
+        """
+        return self.encode_batch([game_state])[0]
+
+    def encode_batch(self, game_states):
+        """Encodes many states at once, such as candidate states built from copies of the current one
+
+        Args:
+            game_states: A list of GameStates
+
+        Returns:
+            A float32 array of shape (len(game_states), len(CHANNELS), ARENA_SIZE, ARENA_SIZE)
+
+        """
+        np = get_numpy()
+        size = self.arena_size
+        count = len(game_states)
+        tensor = np.zeros((count, len(self.CHANNELS), size, size), dtype=np.float32)
+        locations = []
+        units = []
+        units_per_state = []
+        mobile = ([], [], [], [])
+        for state_index, game_state in enumerate(game_states):
+            game_map = game_state.game_map
+            state_locations, state_units = game_map.structure_units()
+            locations.extend(state_locations)
+            units.extend(state_units)
+            units_per_state.append(len(state_units))
+            # Mobile units are rare on the boards being scored, so they are read one by one
+            mask = game_map.occupied_mask & ~game_map.structure_mask
+            while mask:
+                low = mask & -mask
+                x, y = divmod(low.bit_length() - 1, size)
+                mask ^= low
+                for unit in game_map[x, y]:
+                    mobile[0].append(state_index)
+                    mobile[1].append(self.MOBILE + 3 * unit.player_index + unit.type_info.type_index - 3)
+                    mobile[2].append(x)
+                    mobile[3].append(y)
+        if mobile[0]:
+            np.add.at(tensor, tuple(np.array(index) for index in mobile), 1)
+        if not units:
+            return tensor
+
+        count_units = len(units)
+        states = np.repeat(np.arange(count), units_per_state)
+        xs, ys = np.divmod(np.fromiter(locations, dtype=np.intp, count=count_units), size)
+        infos = [unit.type_info for unit in units]
+        players = np.fromiter([unit.player_index for unit in units], dtype=np.intp, count=count_units)
+        kinds = np.fromiter([2 * info.type_index + info.upgraded for info in infos], dtype=np.intp, count=count_units)
+        health = np.fromiter([unit.health for unit in units], dtype=np.float32, count=count_units)
+        tensor[states, 3 * players + kinds // 2, xs, ys] = 1
+        tensor[states, self.UPGRADED + players, xs, ys] = kinds % 2
+        tensor[states, self.HEALTH + players, xs, ys] = health / self.__max_health()[kinds]
+
+        spread = False
+        for info in self.__structure_infos():
+            of_type = kinds == 2 * info.type_index + info.upgraded
+            for player_index in [0, 1]:
+                selected = of_type & (players == player_index)
+                if (info.damage_i <= 0 and info.shieldPerUnit <= 0) or not selected.any():
+                    continue
+                spread = True
+                where = (states[selected], xs[selected], ys[selected])
+                if info.damage_i > 0:
+                    grid = np.zeros((count, size, size), dtype=np.float32)
+                    grid[where] = info.damage_i
+                    tensor[:, self.THREAT + player_index] += self.__spread(grid, info.attackRange)
+                if info.shieldPerUnit > 0 and info.shieldRange > 0:
+                    rows_forward = where[2] if player_index == 0 else size - 1 - where[2]
+                    grid = np.zeros((count, size, size), dtype=np.float32)
+                    grid[where] = info.shieldPerUnit + info.shieldBonusPerY * rows_forward
+                    tensor[:, self.SHIELD + player_index] += self.__spread(grid, info.shieldRange)
+        if spread:
+            tensor[:, self.THREAT:self.SHIELD + 2] *= self.__arena()
+        return tensor
+
+    def __structure_infos(self):
+        unit_types = self.path_outcomes.unit_types
+        return [info for base in unit_types.base if base.stationary for info in (base, base.upgraded_info)]
+
+    def __max_health(self):
+        """The max health of each unit type, indexed by 2 * type_index + upgraded"""
+        if self.__max_healths is None:
+            np = get_numpy()
+            unit_types = self.path_outcomes.unit_types
+            self.__max_healths = np.array([info.max_health for base in unit_types.base
+                                           for info in (base, base.upgraded_info)], dtype=np.float32)
+        return self.__max_healths
+
+    def __spread(self, grid, radius):
+        """Adds every tile's value to the tiles in range of it"""
+        size = self.arena_size
+        spread = get_numpy().zeros_like(grid)
+        for dx, dy in self.path_outcomes.offsets_in_range(radius):
+            spread[:, max(dx, 0):size + min(dx, 0), max(dy, 0):size + min(dy, 0)] += \
+                grid[:, max(-dx, 0):size - max(dx, 0), max(-dy, 0):size - max(dy, 0)]
+        return spread
+
+    def __arena(self):
+        if self.__in_arena is None:
+            np = get_numpy()
+            size = self.arena_size
+            bits = [(self.arena_mask >> location) & 1 for location in range(size * size)]
+            self.__in_arena = np.array(bits, dtype=np.float32).reshape(size, size)
+        return self.__in_arena
+
+
+def to_tensor_batch(game_states):
+    """Encodes many GameStates with the same config at once, see BoardFeatures.encode_batch
+
+    Args:
+        game_states: A non-empty list of GameStates
+
+    Returns:
+        A float32 array of shape (len(game_states), channels, ARENA_SIZE, ARENA_SIZE)
+
+    """
+    return game_states[0].context.features.encode_batch(game_states)
@@ -1,5 +1,8 @@
 import math
+from array import array
 from .unit import GameUnit
+from .context import GameContext
+from .regions import SummedAreaTable
 from .util import debug_write
 
 class GameMap:
@@ -9,8 +12,15 @@ class GameMap:
     game_map[x, y] will return a list of Units located at that location, 
     or an empty list if there are no units at the location
 
+    Totals over rectangles of the board, such as the health of the opponent's structures in a corner,
+    are answered in constant time by region_total from summed-area tables. The tables are built the first
+    time they are used after the board changes through add_unit, place_unit, remove_unit or game_map[x, y] = units.
+    The number of structures in each column and row is kept up to date by the same functions, see column_counts.
+    Call invalidate after changing units any other way, such as editing their health.
+
     Attributes :
         * config (JSON): Contains information about the current game rules
+        * context (:obj: GameContext): The constants derived from config, shared with GameState and GameUnit
         * enable_warnings (bool): If true, debug messages for game_map functions will print out
         * ARENA_SIZE (int): The size of the arena.
         * HALF_ARENA (int): Half of the size of the arena.
@@ -18,6 +28,9 @@ class GameMap:
         * TOP_LEFT (int): A constant that represents the top left edge
         * BOTTOM_LEFT (int): Hidden challenge! Can you guess what this constant represents???
         * BOTTOM_RIGHT (int): A constant that represents the bottom right edge
+        * EDGES (tuple): The (x, y) of the locations along each edge, indexed by the edge constants. Shared, do not modify.
+        * EDGE_SETS (tuple): The locations of each edge as a frozenset of (x, y)
+        * PLAYER_EDGE_SETS (tuple): The frozenset of (x, y) of the edges each player spawns mobile units on
 
     """
     def __init__(self, config):
@@ -28,16 +41,51 @@ class GameMap:
 
         """
         self.config = config
+        self.context = GameContext.for_config(config)
         self.enable_warnings = True
-        self.ARENA_SIZE = 28
-        self.HALF_ARENA = int(self.ARENA_SIZE / 2)
+        self.ARENA_SIZE = self.context.ARENA_SIZE
+        self.HALF_ARENA = self.context.HALF_ARENA
         self.TOP_RIGHT = 0
         self.TOP_LEFT = 1
         self.BOTTOM_LEFT = 2
         self.BOTTOM_RIGHT = 3
         self.__map = self.__empty_grid()
         self.__start = [13,0]
+        self.__region_tables = {}
+        self.__counts_stale = False
+        self.__occupied_mask = 0
+        self.__structure_mask = 0
+        self.__column_counts = self.__empty_counts()
+        self.__row_counts = self.__empty_counts()
     
+    @property
+    def EDGES(self):
+        return self.context.EDGES
+
+    @property
+    def EDGE_SETS(self):
+        return self.context.EDGE_SETS
+
+    @property
+    def PLAYER_EDGE_SETS(self):
+        return self.context.PLAYER_EDGE_SETS
+
+    def copy(self):
+        """Copies the map and its units, sharing the config and context
+
+        Returns:
+            A new GameMap that can be changed without affecting this one
+
+        """
+        new_map = GameMap.__new__(GameMap)
+        new_map.__dict__.update(self.__dict__)
+        new_map.__map = [[[unit.__copy__() for unit in units] if units else [] for units in column] for column in self.__map]
+        new_map.__start = [13, 0]
+        new_map.__region_tables = dict(self.__region_tables)
+        new_map.__column_counts = [[array("l", counts) for counts in by_type] for by_type in self.__column_counts]
+        new_map.__row_counts = [[array("l", counts) for counts in by_type] for by_type in self.__row_counts]
+        return new_map
+
     def __getitem__(self, location):
         if len(location) == 2 and self.in_arena_bounds(location):
             x,y = location
@@ -46,7 +94,12 @@ class GameMap:
 
     def __setitem__(self, location, val):
         if type(location) == tuple and len(location) == 2 and self.in_arena_bounds(location):
-            self.__map[location[0]][location[1]] = val
+            x, y = location
+            self.__count(self.__map[x][y], x, y, -1)
+            self.__map[x][y] = val
+            self.__count(val, x, y, 1)
+            self.__update_masks(x, y)
+            self.__region_tables = {}
             return
         self._invalid_coordinates(location)
 
@@ -75,8 +128,42 @@ class GameMap:
                 grid[x].append([])
         return grid
 
+    def __empty_counts(self):
+        return [[array("l", [0]) * self.ARENA_SIZE for _ in self.context.STRUCTURE_TYPES] for _ in range(2)]
+
+    def __count(self, units, x, y, delta):
+        for unit in units:
+            if unit.stationary and (unit.player_index == 0 or unit.player_index == 1):
+                type_index = unit.type_info.type_index
+                self.__column_counts[unit.player_index][type_index][x] += delta
+                self.__row_counts[unit.player_index][type_index][y] += delta
+
+    def __update_masks(self, x, y):
+        bit = 1 << (x * self.ARENA_SIZE + y)
+        units = self.__map[x][y]
+        if units:
+            self.__occupied_mask |= bit
+        else:
+            self.__occupied_mask &= ~bit
+        if any(unit.stationary for unit in units):
+            self.__structure_mask |= bit
+        else:
+            self.__structure_mask &= ~bit
+
+    def __recount(self):
+        self.__column_counts = self.__empty_counts()
+        self.__row_counts = self.__empty_counts()
+        self.__occupied_mask = 0
+        self.__structure_mask = 0
+        for x, column in enumerate(self.__map):
+            for y, units in enumerate(column):
+                if units:
+                    self.__count(units, x, y, 1)
+                    self.__update_masks(x, y)
+        self.__counts_stale = False
+
     def _invalid_coordinates(self, location):
-        self.warn("{} is out of bounds.".format(str(location)))
+        self.warn("{} is out of bounds.".format(str(location)), "arena_bounds")
 
     def in_arena_bounds(self, location):
         """Checks if the given location is inside the diamond shaped game board.
@@ -110,15 +197,14 @@ class GameMap:
             quadrant_description: A constant corresponding to one of the 4 edges. See game_map.TOP_LEFT, game_map.BOTTOM_RIGHT, and similar constants.
 
         Returns:
-            A list of locations along the requested edge
+            A new list of locations along the requested edge. Use EDGES or is_on_edge to avoid building the list.
 
         """
         if not quadrant_description in [self.TOP_LEFT, self.TOP_RIGHT, self.BOTTOM_LEFT, self.BOTTOM_RIGHT]:
             self.warn("Passed invalid quadrant_description '{}'. See the documentation for valid inputs for get_edge_locations.".format(quadrant_description))
             return
 
-        edges = self.get_edges()
-        return edges[quadrant_description]
+        return [[x, y] for x, y in self.EDGES[quadrant_description]]
 
     def get_edges(self):
         """Gets all of the edges and their edge locations
@@ -127,35 +213,45 @@ class GameMap:
             A list with four lists inside of it of locations corresponding to the four edges.
             [0] = top_right, [1] = top_left, [2] = bottom_left, [3] = bottom_right.
         """
-        top_right = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA + num
-            y = self.ARENA_SIZE - 1 - num
-            top_right.append([int(x), int(y)])
-        top_left = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA - 1 - num
-            y = self.ARENA_SIZE - 1 - num
-            top_left.append([int(x), int(y)])
-        bottom_left = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA - 1 - num
-            y = num
-            bottom_left.append([int(x), int(y)])
-        bottom_right = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA + num
-            y = num
-            bottom_right.append([int(x), int(y)])
-        return [top_right, top_left, bottom_left, bottom_right]
-    
-    def add_unit(self, unit_type, location, player_index=0):
-        """Add a single GameUnit to the map at the given location.
+        return [[[x, y] for x, y in edge] for edge in self.EDGES]
+
+    def is_on_edge(self, location, quadrant_description=None):
+        """Checks if a location is on an edge, in constant time
+
+        Args:
+            location: A map location
+            quadrant_description: One of the 4 edges, such as game_map.BOTTOM_LEFT. Any edge if None.
+
+        Returns:
+            True if the location is on the edge
+
+        """
+        location = (location[0], location[1])
+        if quadrant_description is None:
+            return location in self.PLAYER_EDGE_SETS[0] or location in self.PLAYER_EDGE_SETS[1]
+        return location in self.EDGE_SETS[quadrant_description]
+
+    def is_on_player_edge(self, location, player_index=0):
+        """Checks if a location is on one of the two edges a player spawns mobile units on, in constant time
+
+        Args:
+            location: A map location
+            player_index: The player, 0 for you 1 for the enemy
+
+        Returns:
+            True if the location is on the bottom edges for player 0, or the top edges for player 1
+
+        """
+        return (location[0], location[1]) in self.PLAYER_EDGE_SETS[player_index]
+
+    def add_unit(self, unit_type, location, player_index=0, num=1):
+        """Add a GameUnit to the map at the given location.
 
         Args:
             unit_type: The type of the new unit. Use the constants provided in algo_strategy.
             location: A list of two integers representing the [x,y] coordinate of the new unit
             player_index: The index corresponding to the player controlling the new unit, 0 for you 1 for the enemy
+            num: The number of mobile units to add. Only one structure is ever added.
 
         This function does not affect your turn and only changes the data stored in GameMap. The intended use of this function
         is to allow you to create arbitrary gamestates. Using this function on the game_map provided with game_state will 
@@ -170,8 +266,48 @@ class GameMap:
         new_unit = GameUnit(unit_type, self.config, player_index, None, location[0], location[1])
         if not new_unit.stationary:
             self.__map[x][y].append(new_unit)
+            for i in range(num - 1):
+                self.__map[x][y].append(GameUnit(unit_type, self.config, player_index, None, location[0], location[1]))
         else:
+            self.__count(self.__map[x][y], x, y, -1)
             self.__map[x][y] = [new_unit]
+            self.__count(self.__map[x][y], x, y, 1)
+            self.__region_tables = {}
+        self.__update_masks(x, y)
+
+    def place_unit(self, unit):
+        """Adds an existing GameUnit to the map at its own x and y, after any units already there.
+
+        Args:
+            unit: The GameUnit to add
+
+        Unlike add_unit, this keeps the unit's health and flags and does not replace a structure already at the location.
+        GameState uses it to build the map from the engine's state.
+        """
+        x, y = unit.x, unit.y
+        self.__map[x][y].append(unit)
+        if unit.stationary:
+            self.__count((unit,), x, y, 1)
+            self.__region_tables = {}
+        self.__update_masks(x, y)
+
+    def upgrade_unit(self, location):
+        """Upgrades the structure at a location on the map.
+
+        Args:
+            location: The location of the structure
+
+        Returns:
+            The upgraded GameUnit, or None if there is no structure at the location
+
+        This function does not affect your turn and only changes the data stored in GameMap. Use GameState.attempt_upgrade to upgrade your structures.
+        """
+        x, y = location
+        for unit in self.__map[x][y]:
+            if unit.stationary:
+                unit.upgrade()
+                self.__region_tables = {}
+                return unit
 
     def remove_unit(self, location):
         """Remove all units on the map in the given location.
@@ -186,7 +322,192 @@ class GameMap:
             self._invalid_coordinates(location)
         
         x, y = location
+        self.__count(self.__map[x][y], x, y, -1)
         self.__map[x][y] = []
+        self.__update_masks(x, y)
+        self.__region_tables = {}
+
+    def invalidate(self):
+        """Marks the board as changed, so region totals, structure counts and occupancy masks are computed again on their next use.
+
+        add_unit, place_unit, remove_unit and game_map[x, y] = units keep them up to date. Call it yourself after
+        changing units in place, for example after editing their health or appending to game_map[x, y].
+        """
+        self.__region_tables = {}
+        self.__counts_stale = True
+
+    @property
+    def occupied_mask(self):
+        """A bitmask of the locations holding any unit. Location [x, y] is bit x * ARENA_SIZE + y.
+        """
+        if self.__counts_stale:
+            self.__recount()
+        return self.__occupied_mask
+
+    @property
+    def structure_mask(self):
+        """A bitmask of the locations holding a structure. Location [x, y] is bit x * ARENA_SIZE + y.
+        """
+        if self.__counts_stale:
+            self.__recount()
+        return self.__structure_mask
+
+    def location_mask(self, locations):
+        """Builds a bitmask of locations
+
+        Args:
+            locations: A list of locations
+
+        Returns:
+            A bitmask with bit x * ARENA_SIZE + y set for every [x, y] in locations
+
+        """
+        mask = 0
+        for x, y in locations:
+            mask |= 1 << (x * self.ARENA_SIZE + y)
+        return mask
+
+    def mask_locations(self, mask):
+        """Lists the locations in a bitmask, such as one returned by GameState.legal_placements
+
+        Args:
+            mask: A bitmask where location [x, y] is bit x * ARENA_SIZE + y
+
+        Returns:
+            A list of [x, y], ordered by x and then by y
+
+        """
+        size = self.ARENA_SIZE
+        locations = []
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            locations.append([index // size, index % size])
+            mask ^= low
+        return locations
+
+    def structure_units(self):
+        """Gets every structure on the board with its location
+
+        Returns:
+            A tuple of two lists: the location of each structure as the bit index x * ARENA_SIZE + y used by
+            structure_mask, and the structures, ordered by x and then by y
+
+        """
+        locations = []
+        units = []
+        index = 0
+        for column in self.__map:
+            for tile in column:
+                if tile:
+                    for unit in tile:
+                        if unit.stationary:
+                            locations.append(index)
+                            units.append(unit)
+                            break
+                index += 1
+        return locations, units
+
+    @property
+    def column_counts(self):
+        """The number of structures in each column, as column_counts[player_index][type_index][x].
+        type_index is the index of the structure type in STRUCTURE_TYPES. Read-only, use structures_in_column to add types together.
+        """
+        if self.__counts_stale:
+            self.__recount()
+        return self.__column_counts
+
+    @property
+    def row_counts(self):
+        """The number of structures in each row, as row_counts[player_index][type_index][y].
+        type_index is the index of the structure type in STRUCTURE_TYPES. Read-only, use structures_in_row to add types together.
+        """
+        if self.__counts_stale:
+            self.__recount()
+        return self.__row_counts
+
+    def structures_in_column(self, x, player_index=0, unit_types=None):
+        """Counts a player's structures in a column, in constant time
+
+        Args:
+            x: The column
+            player_index: The owner of the structures, 0 for you 1 for the enemy
+            unit_types: The structure types to count, such as [WALL, TURRET]. All structures if None.
+
+        Returns:
+            The number of structures
+
+        """
+        return self.__count_line(self.column_counts[player_index], x, unit_types)
+
+    def structures_in_row(self, y, player_index=0, unit_types=None):
+        """Counts a player's structures in a row, in constant time
+
+        Args:
+            y: The row
+            player_index: The owner of the structures, 0 for you 1 for the enemy
+            unit_types: The structure types to count, such as [WALL, TURRET]. All structures if None.
+
+        Returns:
+            The number of structures
+
+        """
+        return self.__count_line(self.row_counts[player_index], y, unit_types)
+
+    def __count_line(self, counts, index, unit_types):
+        if unit_types is None:
+            return sum(by_type[index] for by_type in counts)
+        structure_types = self.context.STRUCTURE_TYPES
+        return sum(counts[structure_types.index(unit_type)][index] for unit_type in unit_types if unit_type in structure_types)
+
+    def region_total(self, stat, player_index, x_min, y_min, x_max, y_max):
+        """Totals a statistic of a player's structures over a rectangle of the board, in constant time
+
+        Args:
+            stat: "structures" for the number of structures, "health" for their total health, "damage" for the damage
+                per frame they deal to mobile units, or a structure type such as TURRET for the number of that type
+            player_index: The owner of the structures, 0 for you 1 for the enemy
+            x_min: The smallest x in the rectangle
+            y_min: The smallest y in the rectangle
+            x_max: The largest x in the rectangle
+            y_max: The largest y in the rectangle
+
+        Returns:
+            The total over the rectangle. The bounds are inclusive and are clipped to the board. Mobile unit types
+            total 0, as only structures are counted.
+
+        """
+        table = self.__region_tables.get((stat, player_index))
+        if table is None:
+            if stat in self.context.ALL_UNITS and stat not in self.context.STRUCTURE_TYPES:
+                return 0
+            values = self.__region_values(stat, player_index)
+            if values is None:
+                return
+            table = self.__region_tables[stat, player_index] = SummedAreaTable(values, self.ARENA_SIZE)
+        return table.total(x_min, y_min, x_max, y_max)
+
+    def __region_values(self, stat, player_index):
+        if stat == "structures":
+            value = lambda unit: 1
+        elif stat == "health":
+            value = lambda unit: unit.health
+        elif stat == "damage":
+            value = lambda unit: unit.damage_i
+        elif stat in self.context.STRUCTURE_TYPES:
+            value = lambda unit: 1 if unit.unit_type == stat else 0
+        else:
+            self.warn("Invalid region statistic '{}'. Use 'structures', 'health', 'damage' or a structure type.".format(stat))
+            return
+        values = []
+        for column in self.__map:
+            totals = [0] * self.ARENA_SIZE
+            for y, units in enumerate(column):
+                for unit in units:
+                    if unit.player_index == player_index and unit.stationary:
+                        totals[y] += value(unit)
+            values.append(totals)
+        return values
 
     def get_locations_in_range(self, location, radius):
         """Gets locations in a circular area around a location
@@ -207,7 +528,7 @@ class GameMap:
         x, y = location
         locations = []
         search_radius = math.ceil(radius)
-        getHitRadius = self.config["unitInformation"][0]['getHitRadius']
+        getHitRadius = self.context.GET_HIT_RADIUS
         for i in range(int(x - search_radius), int(x + search_radius + 1)):
             for j in range(int(y - search_radius), int(y + search_radius + 1)):
                 new_location = [i, j]
@@ -232,9 +553,10 @@ class GameMap:
 
         return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
 
-    def warn(self, message):
+    def warn(self, message, key=None, detail=None):
         """
-        Used internally by game_map to print out default messaging
+        Used internally by game_map to print out default messaging.
+        Warnings with a key are rate limited per turn, see GameState.warn.
         """
         if(self.enable_warnings):
-            debug_write(message)
+            debug_write(message, key=key, detail=detail)
@@ -1,22 +1,13 @@
 import math
-import json
 import sys
 
 from .navigation import ShortestPathFinder
-from .util import send_command, debug_write
-from .unit import GameUnit
+from .util import send_command, debug_write, json_loads, json_dumps
+from .timing import get_turn_timer
+from .unit import GameUnit, is_stationary
+from .context import GameContext
 from .game_map import GameMap
 
-def is_stationary(unit_type):
-    """
-        Args:
-            unit_type: A unit type
-        
-        Returns: 
-            Boolean, True if the unit is stationary, False otherwise.
-    """
-    return unit_type in STRUCTURE_TYPES
-
 class GameState:
     """Represents the entire gamestate for a given turn
     Provides methods related to resources and unit deployment
@@ -31,12 +22,14 @@ class GameState:
         * INTERCEPTOR (str): A constant representing the interceptor unit
         * REMOVE (str): A constant representing removing your own unit
         * UPGRADE (str): A constant representing upgrading a unit
-        * STRUCTURE_TYPES (list): A list of the structure units
+        * STRUCTURE_TYPES (tuple): The structure units
+        * ALL_UNITS (tuple): The units that can be spawned
 
         * ARENA_SIZE (int): The size of the arena
         * HALF_ARENA (int): Half the size of the arena
         * MP (int): A constant representing the Mobile Points resource, used in the get_resource function
         * SP (int): A constant representing the SP resource, used in the get_resource function
+        * context (:obj: GameContext): The constants above, shared by every GameState built from the same config
          
         * game_map (:obj: GameMap): The current GameMap. To retrieve a list of GameUnits at a location, use game_map[x, y]
         * turn_number (int): The current turn number. Starts at 0.
@@ -44,6 +37,7 @@ class GameState:
         * my_time (int): The time you took to submit your previous turn
         * enemy_health (int): Your opponents current remaining health
         * enemy_time (int): Your opponents current remaining time
+        * turn_timer (:obj: TurnTimer): The timer of the turn being played if the state was built in on_turn, None otherwise
 
     """
 
@@ -58,36 +52,25 @@ class GameState:
         self.serialized_string = serialized_string
         self.config = config
         self.enable_warnings = True
-
-        global WALL, SUPPORT, TURRET, SCOUT, DEMOLISHER, INTERCEPTOR, REMOVE, UPGRADE, STRUCTURE_TYPES, ALL_UNITS, UNIT_TYPE_TO_INDEX
-        UNIT_TYPE_TO_INDEX = {}
-        WALL = config["unitInformation"][0]["shorthand"]
-        UNIT_TYPE_TO_INDEX[WALL] = 0
-        SUPPORT = config["unitInformation"][1]["shorthand"]
-        UNIT_TYPE_TO_INDEX[SUPPORT] = 1
-        TURRET = config["unitInformation"][2]["shorthand"]
-        UNIT_TYPE_TO_INDEX[TURRET] = 2
-        SCOUT = config["unitInformation"][3]["shorthand"]
-        UNIT_TYPE_TO_INDEX[SCOUT] = 3
-        DEMOLISHER = config["unitInformation"][4]["shorthand"]
-        UNIT_TYPE_TO_INDEX[DEMOLISHER] = 4
-        INTERCEPTOR = config["unitInformation"][5]["shorthand"]
-        UNIT_TYPE_TO_INDEX[INTERCEPTOR] = 5
-        REMOVE = config["unitInformation"][6]["shorthand"]
-        UNIT_TYPE_TO_INDEX[REMOVE] = 6
-        UPGRADE = config["unitInformation"][7]["shorthand"]
-        UNIT_TYPE_TO_INDEX[UPGRADE] = 7
-
-        ALL_UNITS = [SCOUT, DEMOLISHER, INTERCEPTOR, WALL, SUPPORT, TURRET]
-        STRUCTURE_TYPES = [WALL, SUPPORT, TURRET]
-
-        self.ARENA_SIZE = 28
-        self.HALF_ARENA = int(self.ARENA_SIZE / 2)
-        self.MP = 1
-        self.SP = 0
-        global MP, SP
-        MP = self.MP
-        SP = self.SP
+        self.turn_timer = get_turn_timer()
+
+        self.context = GameContext.for_config(config)
+        self.UNIT_TYPE_TO_INDEX = self.context.UNIT_TYPE_TO_INDEX
+        self.WALL = self.context.WALL
+        self.SUPPORT = self.context.SUPPORT
+        self.TURRET = self.context.TURRET
+        self.SCOUT = self.context.SCOUT
+        self.DEMOLISHER = self.context.DEMOLISHER
+        self.INTERCEPTOR = self.context.INTERCEPTOR
+        self.REMOVE = self.context.REMOVE
+        self.UPGRADE = self.context.UPGRADE
+        self.STRUCTURE_TYPES = self.context.STRUCTURE_TYPES
+        self.ALL_UNITS = self.context.ALL_UNITS
+
+        self.ARENA_SIZE = self.context.ARENA_SIZE
+        self.HALF_ARENA = self.context.HALF_ARENA
+        self.MP = self.context.MP
+        self.SP = self.context.SP
 
         self.game_map = GameMap(self.config)
         self._shortest_path_finder = ShortestPathFinder()
@@ -98,12 +81,30 @@ class GameState:
                 {'SP': 0, 'MP': 0}]  # player 1, which is the opponent
         self.__parse_state(serialized_string)
 
+    def copy(self):
+        """Copies the state, for trying out placements without changing this one
+
+        The map, units, resources and queued spawns are copied. The config and context are shared.
+
+        Returns:
+            A new GameState
+
+        """
+        new_state = GameState.__new__(GameState)
+        new_state.__dict__.update(self.__dict__)
+        new_state.game_map = self.game_map.copy()
+        new_state._shortest_path_finder = ShortestPathFinder()
+        new_state._build_stack = list(self._build_stack)
+        new_state._deploy_stack = list(self._deploy_stack)
+        new_state._player_resources = [dict(resources) for resources in self._player_resources]
+        return new_state
+
     def __parse_state(self, state_line):
         """
         Fills in map based on the serialized game state so that self.game_map[x,y] is a list of GameUnits at that location.
         state_line is the game state as a json string.
         """
-        state = json.loads(state_line)
+        state = json_loads(state_line)
 
         turn_info = state["turnInfo"]
         self.turn_number = int(turn_info[1])
@@ -138,19 +139,18 @@ class GameState:
                 x, y = map(int, [sx, sy])
                 hp = float(shp)
                 # This depends on RM and UP always being the last types to be processed
-                if unit_type == REMOVE:
+                if unit_type == self.REMOVE:
                     # Quick fix will deploy engine fix soon
                     if self.contains_stationary_unit([x,y]):
                         self.game_map[x,y][0].pending_removal = True
-                elif unit_type == UPGRADE:
+                elif unit_type == self.UPGRADE:
                     if self.contains_stationary_unit([x,y]):
-                        self.game_map[x,y][0].upgrade()
+                        self.game_map.upgrade_unit([x,y])
                 else:
-                    unit = GameUnit(unit_type, self.config, player_number, hp, x, y)
-                    self.game_map[x,y].append(unit)
+                    self.game_map.place_unit(GameUnit(unit_type, self.config, player_number, hp, x, y))
 
     def __resource_required(self, unit_type):
-        return self.SP if is_stationary(unit_type) else self.MP
+        return self.SP if is_stationary(unit_type, self.STRUCTURE_TYPES) else self.MP
 
     def __set_resource(self, resource_type, amount, player_index=0):
         """
@@ -175,11 +175,37 @@ class GameState:
         """Submit and end your turn.
             Must be called at the end of your turn or the algo will hang.
         """
-        build_string = json.dumps(self._build_stack)
-        deploy_string = json.dumps(self._deploy_stack)
+        build_string = json_dumps(self._build_stack)
+        deploy_string = json_dumps(self._deploy_stack)
+        if self.turn_timer is not None and not self.turn_timer.claim_submission():
+            self.warn("Turn {} was already submitted, most likely by the watchdog after the time limit. Dropping this submission.".format(self.turn_number))
+            return
         send_command(build_string)
         send_command(deploy_string)
 
+    def time_remaining(self, hard=False):
+        """Gets the time left to submit this turn
+
+        Args:
+            hard: If True, get the time left before the hard limit, when the watchdog submits the fallback turn
+
+        Returns:
+            The number of seconds left before the soft limit (or hard limit), negative if it has passed.
+            None if the state was not created during a turn run by AlgoCore.
+
+        """
+        if self.turn_timer is None:
+            return None
+        return self.turn_timer.time_remaining(hard)
+
+    def save_fallback_turn(self):
+        """Saves the turn as it is now as the fallback turn.
+        If the watchdog is enabled and the hard limit is reached before submit_turn is called,
+        the last saved fallback turn is submitted instead. By default the fallback turn is empty.
+        """
+        if self.turn_timer is not None:
+            self.turn_timer.set_fallback(self._build_stack, self._deploy_stack)
+
     def get_resource(self, resource_type, player_index = 0):
         """Gets a players resources
 
@@ -234,12 +260,13 @@ class GameState:
             The number of units affordable of the given unit_type.
 
         """
-        if unit_type not in ALL_UNITS:
+        if unit_type not in self.ALL_UNITS:
             self._invalid_unit(unit_type)
             return
 
         costs = self.type_cost(unit_type)
         player_held = self.get_resources()
+        MP, SP = self.MP, self.SP
         if costs[MP] > 0 and costs[SP] > 0:
             return min(math.floor(player_held[SP] / costs[SP]), math.floor(player_held[MP] / costs[MP]))
         elif costs[MP] > 0:
@@ -271,16 +298,7 @@ class GameState:
             self.warn("Invalid current MP ({}). Current MP cannot be negative.".format(current_MP))
 
         MP = self.get_resource(self.MP, player_index) if not current_MP else current_MP
-        for increment in range(1, turns_in_future + 1):
-            current_turn = self.turn_number + increment
-            MP *= (1 - self.config["resources"]["bitDecayPerRound"])
-            MP_per_round = self.config["resources"]["bitsPerRound"]
-            MP_ramp_ups = current_turn // self.config["resources"]["turnIntervalForBitSchedule"]
-            MP_per_round_growth = self.config["resources"]["bitGrowthRate"]
-            MP_gained = MP_per_round + (MP_per_round_growth * MP_ramp_ups)
-            MP += MP_gained
-            MP = round(MP, 1)
-        return MP
+        return self.context.resources.MP_after(MP, self.turn_number, turns_in_future)
 
     def type_cost(self, unit_type, upgrade=False):
         """Gets the cost of a unit based on its type
@@ -292,16 +310,16 @@ class GameState:
             The units costs as a list [SP, MP]
 
         """
-        if unit_type == REMOVE:
+        if unit_type == self.REMOVE:
             self._invalid_unit(unit_type)
             return
         
-        unit_def = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[unit_type]]
-        cost_base = [unit_def.get('cost1', 0), unit_def.get('cost2', 0)]
+        table = self.context.unit_types
+        type_index = self.UNIT_TYPE_TO_INDEX[unit_type]
         if upgrade:
-            return [unit_def.get('upgrade', {}).get('cost1', cost_base[SP]), unit_def.get('upgrade', {}).get('cost2', cost_base[MP])]
+            return list(table.upgrade_cost[type_index])
 
-        return cost_base
+        return list(table.base[type_index].cost)
 
 
     def can_spawn(self, unit_type, location, num=1):
@@ -320,20 +338,20 @@ class GameState:
             True if we can spawn the unit(s)
 
         """
-        if unit_type not in ALL_UNITS:
+        if unit_type not in self.ALL_UNITS:
             self._invalid_unit(unit_type)
             return
         
         if not self.game_map.in_arena_bounds(location):
             if self.enable_warnings:
-                self.warn("Could not spawn {} at location {}. Location invalid.".format(unit_type, location))
+                self.warn("Could not spawn {} at location {}. Location invalid.".format(unit_type, location), "can_spawn", "Location invalid")
             return False
 
         affordable = self.number_affordable(unit_type) >= num
-        stationary = is_stationary(unit_type)
+        stationary = is_stationary(unit_type, self.STRUCTURE_TYPES)
         blocked = self.contains_stationary_unit(location) or (stationary and len(self.game_map[location[0],location[1]]) > 0)
         correct_territory = location[1] < self.HALF_ARENA
-        on_edge = location in (self.game_map.get_edge_locations(self.game_map.BOTTOM_LEFT) + self.game_map.get_edge_locations(self.game_map.BOTTOM_RIGHT))
+        on_edge = (location[0], location[1]) in self.game_map.PLAYER_EDGE_SETS[0]
 
         if self.enable_warnings:
             fail_reason = ""
@@ -346,12 +364,46 @@ class GameState:
             if not (stationary or on_edge):
                 fail_reason = fail_reason + " Information units must be deployed on the edge."
             if len(fail_reason) > 0:
-                self.warn("Could not spawn {} at location {}.{}".format(unit_type, location, fail_reason))
+                self.warn("Could not spawn {} at location {}.{}".format(unit_type, location, fail_reason), "can_spawn", fail_reason.strip().rstrip("."))
 
         return (affordable and correct_territory and not blocked and
                 (stationary or on_edge) and
                 (not stationary or num == 1))
 
+    def to_tensor(self):
+        """Encodes the board as an array for learned evaluations. Requires NumPy.
+
+        See gamelib.features.BoardFeatures for the channels. To encode many states, such as candidate
+        placements built on copies of this state, use gamelib.to_tensor_batch, which is much faster per state.
+
+        Returns:
+            A float32 array of shape (channels, ARENA_SIZE, ARENA_SIZE), indexed [channel, x, y]
+
+        """
+        return self.context.features.encode(self)
+
+    def legal_placements(self, unit_type):
+        """Finds every location we could spawn a unit at right now, without warnings
+
+        A location is legal if can_spawn(unit_type, location) would return True: it is on our half of the board,
+        it is not blocked, it is on one of our edges if the unit is mobile, and we can afford the unit.
+
+        Args:
+            unit_type: The type of the unit
+
+        Returns:
+            A bitmask where location [x, y] is bit x * ARENA_SIZE + y. Use game_map.mask_locations to list the locations.
+
+        """
+        if unit_type not in self.ALL_UNITS:
+            self._invalid_unit(unit_type)
+            return
+        if self.number_affordable(unit_type) < 1:
+            return 0
+        if is_stationary(unit_type, self.STRUCTURE_TYPES):
+            return self.context.PLAYER_HALF_MASKS[0] & ~self.game_map.occupied_mask
+        return self.context.PLAYER_EDGE_MASKS[0] & ~self.game_map.structure_mask
+
     def attempt_spawn(self, unit_type, locations, num=1):
         """Attempts to spawn new units with the type given in the given locations.
 
@@ -364,7 +416,7 @@ class GameState:
             The number of units successfully spawned
 
         """
-        if unit_type not in ALL_UNITS:
+        if unit_type not in self.ALL_UNITS:
             self._invalid_unit(unit_type)
             return
         if num < 1 or not locations:
@@ -373,16 +425,18 @@ class GameState:
       
         if type(locations[0]) == int:
             locations = [locations]
+        if not is_stationary(unit_type, self.STRUCTURE_TYPES):
+            return self.__spawn_mobile_units(unit_type, locations, num)
         spawned_units = 0
         for location in locations:
             for i in range(num):
                 if self.can_spawn(unit_type, location, 1):
                     x, y = map(int, location)
                     costs = self.type_cost(unit_type)
-                    self.__set_resource(SP, 0 - costs[SP])
-                    self.__set_resource(MP, 0 - costs[MP])
+                    self.__set_resource(self.SP, 0 - costs[self.SP])
+                    self.__set_resource(self.MP, 0 - costs[self.MP])
                     self.game_map.add_unit(unit_type, location, 0)
-                    if is_stationary(unit_type):
+                    if is_stationary(unit_type, self.STRUCTURE_TYPES):
                         self._build_stack.append((unit_type, x, y))
                     else:
                         self._deploy_stack.append((unit_type, x, y))
@@ -391,6 +445,32 @@ class GameState:
                     break
         return spawned_units
 
+    def __spawn_mobile_units(self, unit_type, locations, num):
+        """
+        Spawns num mobile units at each location, validating each location and working out
+        how many units are affordable once instead of once per unit.
+        """
+        costs = self.type_cost(unit_type)
+        spawned_units = 0
+        for location in locations:
+            if not self.can_spawn(unit_type, location, 1):
+                continue
+            count = min(num, self.number_affordable(unit_type))
+            x, y = map(int, location)
+            # Subtract one unit at a time so the resources left match spawning the units one by one
+            for resource_type, resource_key in [(self.SP, 'SP'), (self.MP, 'MP')]:
+                held = self.get_resource(resource_type)
+                for i in range(count):
+                    held -= costs[resource_type]
+                self._player_resources[0][resource_key] = held
+            self.game_map.add_unit(unit_type, location, 0, count)
+            self._deploy_stack.extend([(unit_type, x, y)] * count)
+            spawned_units += count
+            if count < num:
+                # Warns that the rest could not be afforded, as spawning them one by one would
+                self.can_spawn(unit_type, location, 1)
+        return spawned_units
+
     def attempt_remove(self, locations):
         """Attempts to remove existing friendly structures in the given locations.
 
@@ -407,10 +487,10 @@ class GameState:
         for location in locations:
             if location[1] < self.HALF_ARENA and self.contains_stationary_unit(location):
                 x, y = map(int, location)
-                self._build_stack.append((REMOVE, x, y))
+                self._build_stack.append((self.REMOVE, x, y))
                 removed_units += 1
             else:
-                self.warn("Could not remove a unit from {}. Location has no structures or is enemy territory.".format(location))
+                self.warn("Could not remove a unit from {}. Location has no structures or is enemy territory.".format(location), "attempt_remove")
         return removed_units
 
     def attempt_upgrade(self, locations):
@@ -439,17 +519,17 @@ class GameState:
                     if unit.stationary:
                         existing_unit = unit
 
-                if not existing_unit.upgraded and self.config["unitInformation"][UNIT_TYPE_TO_INDEX[existing_unit.unit_type]].get("upgrade", None) is not None:
+                if not existing_unit.upgraded and self.context.unit_types.can_upgrade[self.UNIT_TYPE_TO_INDEX[existing_unit.unit_type]]:
                     costs = self.type_cost(existing_unit.unit_type, True)
                     resources = self.get_resources()
-                    if resources[SP] >= costs[SP] and resources[MP] >= costs[MP]:
-                        self.__set_resource(SP, 0 - costs[SP])
-                        self.__set_resource(MP, 0 - costs[MP])
-                        existing_unit.upgrade()
-                        self._build_stack.append((UPGRADE, x, y))
+                    if resources[self.SP] >= costs[self.SP] and resources[self.MP] >= costs[self.MP]:
+                        self.__set_resource(self.SP, 0 - costs[self.SP])
+                        self.__set_resource(self.MP, 0 - costs[self.MP])
+                        self.game_map.upgrade_unit([x, y])
+                        self._build_stack.append((self.UPGRADE, x, y))
                         spawned_units += 1
             else:
-                self.warn("Could not upgrade a unit from {}. Location has no structures or is enemy territory.".format(location))
+                self.warn("Could not upgrade a unit from {}. Location has no structures or is enemy territory.".format(location), "attempt_upgrade")
         return spawned_units
 
     def get_target_edge(self, start_location):
@@ -495,9 +575,51 @@ class GameState:
         if target_edge is None:
             target_edge = self.get_target_edge(start_location)
 
-        end_points = self.game_map.get_edge_locations(target_edge)
+        if target_edge not in [self.game_map.TOP_LEFT, self.game_map.TOP_RIGHT, self.game_map.BOTTOM_LEFT, self.game_map.BOTTOM_RIGHT]:
+            self.warn("Passed invalid target_edge '{}' to find_path_to_edge.".format(target_edge))
+            return
+
+        end_points = self.game_map.EDGES[target_edge]
         return self._shortest_path_finder.navigate_multiple_endpoints(start_location, end_points, self)
 
+    def path_damage_map(self, player_index=0):
+        """Gets the damage the opponent's structures deal to a mobile unit on each tile, for evaluate_path_outcome
+
+        The map is not updated when the board changes, so build it again after adding or removing structures.
+
+        Args:
+            player_index: The player whose mobile units are attacked
+
+        Returns:
+            A dict mapping (x, y) to damage per frame
+
+        """
+        return self.context.path_outcomes.damage_map(self.game_map, player_index)
+
+    def evaluate_path_outcome(self, path, unit_type, num=1, player_index=0, damage_map=None):
+        """Predicts what happens to a group of mobile units sent down a path
+
+        Pass a damage_map from path_damage_map when evaluating many paths on the same board,
+        so it is not rebuilt for every path.
+
+        Args:
+            path: The path, as returned by find_path_to_edge
+            unit_type: The type of the units
+            num: The number of units
+            player_index: The owner of the units
+            damage_map: The result of path_damage_map(player_index). Built if None.
+
+        Returns:
+            A PathOutcome with the breach damage, self destruct damage and SP gained
+
+        """
+        if unit_type not in self.ALL_UNITS or is_stationary(unit_type, self.STRUCTURE_TYPES):
+            self._invalid_unit(unit_type)
+            return
+        if damage_map is None:
+            damage_map = self.path_damage_map(player_index)
+        return self.context.path_outcomes.evaluate(self.game_map, path, unit_type, num, player_index, damage_map)
+
     def contains_stationary_unit(self, location):
         """Check if a location is blocked, return structures unit if it is
 
@@ -509,7 +631,7 @@ class GameState:
             
         """
         if not self.game_map.in_arena_bounds(location):
-            self.warn('Checked for stationary unit outside of arena bounds')
+            self.warn('Checked for stationary unit outside of arena bounds', "contains_stationary_unit")
             return False
         x, y = map(int, location)
         for unit in self.game_map[x,y]:
@@ -517,12 +639,18 @@ class GameState:
                 return unit
         return False
 
-    def warn(self, message):
+    def warn(self, message, key=None, detail=None):
         """ Used internally by game_state to print warnings
+
+        Args:
+            message: The warning
+            key: The kind of warning, such as "can_spawn". Warnings with a key are rate limited per turn once AlgoCore is running.
+            detail: A short reason counted in the per-turn summary for key
+
         """
 
         if(self.enable_warnings):
-            debug_write(message)
+            debug_write(message, key=key, detail=detail)
 
     def suppress_warnings(self, suppress):
         """Suppress all warnings
@@ -565,7 +693,7 @@ class GameState:
 
         for location in possible_locations:
             for unit in self.game_map[location]:
-                if unit.player_index == attacking_unit.player_index or (attacking_unit.damage_f == 0 and is_stationary(unit.unit_type)) or (attacking_unit.damage_i == 0 and not(is_stationary(unit.unit_type))):
+                if unit.player_index == attacking_unit.player_index or (attacking_unit.damage_f == 0 and unit.stationary) or (attacking_unit.damage_i == 0 and not unit.stationary):
                     continue
 
                 new_target = False
@@ -629,7 +757,7 @@ class GameState:
         if not player_index == 0 and not player_index == 1:
             self._invalid_player_index(player_index)
         if not self.game_map.in_arena_bounds(location):
-            self.warn("Location {} is not in the arena bounds.".format(location))
+            self.warn("Location {} is not in the arena bounds.".format(location), "arena_bounds")
 
         attackers = []
         """
@@ -40,6 +40,7 @@ class ShortestPathFinder:
         self.HORIZONTAL = 1
         self.VERTICAL = 2
         self.initialized = False
+        self.end_point_set = frozenset()
 
     def initialize_map(self, game_state):
         """Initializes the map
@@ -57,7 +58,7 @@ class ShortestPathFinder:
 
         Args:
             * start_point: The starting location of the unit
-            * end_points: The end points of the unit, should be a list of edge locations
+            * end_points: The end points of the unit, should be the locations of an edge, such as game_map.EDGES[game_map.TOP_LEFT]
             * game_state: The current game state
 
         Returns:
@@ -70,6 +71,7 @@ class ShortestPathFinder:
 
         #Initialize map 
         self.initialize_map(game_state)
+        self.end_point_set = frozenset((x, y) for x, y in end_points)
         #Fill in walls
         for location in self.game_state.game_map:
             if self.game_state.contains_stationary_unit(location):
@@ -141,7 +143,7 @@ class ShortestPathFinder:
         Returns:
             A location the unit will attempt to reach
         """
-        if location in end_points:
+        if (location[0], location[1]) in self.end_point_set:
             return sys.maxsize
 
         direction = self._get_direction_from_endpoints(end_points)
@@ -165,7 +167,7 @@ class ShortestPathFinder:
         #VALDIATION
         #Add our most ideal tiles to current
         current = queue.Queue()
-        if ideal_tile in end_points:
+        if (ideal_tile[0], ideal_tile[1]) in self.end_point_set:
             for location in end_points:
                current.put(location)
                #Set current pathlength to 0
@@ -314,3 +316,76 @@ class ShortestPathFinder:
             sys.stderr.write(" ")
         sys.stderr.write(str(number))
         sys.stderr.write(" ")
+
+
+class PathBlockingIndex:
+    """Answers which paths a new structure could reroute
+
+    Placing a structure can only change a path if the structure is placed on the path
+    or next to it. Every other location can be built on without re-pathing, which lets
+    placement searches skip the pathfinder for most candidate locations.
+
+    Attributes :
+        * paths (list): The paths being indexed, as returned by GameState.find_path_to_edge
+
+    """
+    def __init__(self, paths):
+        """Indexes the locations on and adjacent to each path
+
+        Args:
+            paths: A list of paths. Entries that are None (a blocked start location) are ignored.
+
+        """
+        self.paths = paths
+        self.__touching = {}
+        for index, path in enumerate(paths):
+            if not path:
+                continue
+            for x, y in path:
+                for location in [(x, y), (x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+                    path_indices = self.__touching.setdefault(location, [])
+                    if not path_indices or path_indices[-1] != index:
+                        path_indices.append(index)
+
+    def affects_routing(self, location):
+        """Check if a structure placed at a location could change any path
+
+        Args:
+            location: The location of a hypothetical structure
+
+        Returns:
+            True if the location is on or adjacent to at least one path
+
+        """
+        return (location[0], location[1]) in self.__touching
+
+    def affected_paths(self, location):
+        """Gets the paths a structure placed at a location could change
+
+        Args:
+            location: The location of a hypothetical structure
+
+        Returns:
+            A list of indices into self.paths. These paths need to be recomputed after placing the structure.
+
+        """
+        return list(self.__touching.get((location[0], location[1]), []))
+
+    def split_candidates(self, locations):
+        """Splits candidate locations by whether they need re-pathing
+
+        Args:
+            locations: A list of candidate structure locations
+
+        Returns:
+            A tuple of two lists, (locations that could change a path, locations that cannot)
+
+        """
+        affecting = []
+        unaffected = []
+        for location in locations:
+            if self.affects_routing(location):
+                affecting.append(location)
+            else:
+                unaffected.append(location)
+        return affecting, unaffected
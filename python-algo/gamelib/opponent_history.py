@@ -0,0 +1,198 @@
+from array import array
+from collections import Counter
+
+
+class OpponentHistory:
+    """Records what a player did over the last turns, for trend queries across turns
+
+    Call record_turn at the start of every turn with the new GameState and AlgoCore.last_action_summary.
+    Each turn is one row of a set of columns held in compact arrays: the player's resources and health at
+    the start of the turn, and what they did during it (mobile units spawned, structures placed, upgraded and
+    removed). The location of every mobile spawn is kept in a second set of columns. Only the last window
+    turns are kept, so memory stays bounded however long the game runs.
+
+    What a player does during a turn is only known once the next turn starts, so the newest row holds
+    -1 in the columns that are not known yet.
+
+    Attributes :
+        * player_index (int): The player recorded, 1 (your opponent) by default
+        * window (int): The number of turns kept
+        * turns (array): The turn number of each row
+        * MP (array): The player's MP at the start of each turn
+        * SP (array): The player's SP at the start of each turn
+        * health (array): The player's health at the start of each turn
+        * mobile_spawned (array): The number of mobile units the player spawned each turn
+        * structures_placed (array): The number of structures the player placed each turn
+        * upgrades (array): The number of structures the player upgraded each turn
+        * removals (array): The number of units the player removed each turn
+        * spawn_turns (array): The turn of each mobile spawn location
+        * spawn_x (array): The x of each mobile spawn location
+        * spawn_y (array): The y of each mobile spawn location
+        * spawn_counts (array): The number of units spawned at each mobile spawn location
+
+    """
+    def __init__(self, player_index=1, window=100):
+        """Starts an empty history
+
+        Args:
+            player_index: The player to record, 1 (your opponent) by default
+            window: The number of turns to keep
+
+        """
+        self.player_index = player_index
+        self.window = window
+        self.turns = array("l")
+        self.MP = array("d")
+        self.SP = array("d")
+        self.health = array("d")
+        self.mobile_spawned = array("l")
+        self.structures_placed = array("l")
+        self.upgrades = array("l")
+        self.removals = array("l")
+        self.spawn_turns = array("l")
+        self.spawn_x = array("b")
+        self.spawn_y = array("b")
+        self.spawn_counts = array("l")
+        self.__last_structures = None
+
+    def __len__(self):
+        return len(self.turns)
+
+    def record_turn(self, game_state, action_summary=None):
+        """Records the start of a turn, and what the player did during the previous one
+
+        Args:
+            game_state: The GameState at the start of the turn
+            action_summary: The ActionPhaseSummary of the previous turn's action phase, usually AlgoCore.last_action_summary
+
+        """
+        player_index = self.player_index
+        structures = self.__structures(game_state)
+        if self.turns and self.turns[-1] == game_state.turn_number - 1:
+            last = self.__last_structures
+            self.structures_placed[-1] = sum(1 for location in structures if location not in last)
+            self.upgrades[-1] = sum(1 for location, upgraded in structures.items()
+                                    if upgraded and not last.get(location, False))
+            if action_summary is not None and action_summary.turn_number == self.turns[-1]:
+                context = game_state.context
+                self.__record_action_phase(action_summary, frozenset(context.ALL_UNITS) - frozenset(context.STRUCTURE_TYPES))
+        self.__last_structures = structures
+
+        SP, MP = game_state.get_resources(player_index)
+        self.turns.append(game_state.turn_number)
+        self.MP.append(MP)
+        self.SP.append(SP)
+        self.health.append(game_state.enemy_health if player_index == 1 else game_state.my_health)
+        for column in [self.mobile_spawned, self.structures_placed, self.upgrades, self.removals]:
+            column.append(-1)
+        if len(self.turns) > self.window:
+            self.__trim()
+
+    def __structures(self, game_state):
+        game_map = game_state.game_map
+        structures = {}
+        rows = range(game_map.HALF_ARENA, game_map.ARENA_SIZE) if self.player_index == 1 else range(game_map.HALF_ARENA)
+        for y in rows:
+            for x in range(game_map.ARENA_SIZE):
+                if game_map.in_arena_bounds([x, y]):
+                    for unit in game_map[x, y]:
+                        if unit.stationary and unit.player_index == self.player_index:
+                            structures[x, y] = unit.upgraded
+        return structures
+
+    def __record_action_phase(self, action_summary, mobile_types):
+        turn = self.turns[-1]
+        spawned = 0
+        for (x, y, unit_type), count in action_summary.spawn_locations[self.player_index].items():
+            if unit_type not in mobile_types:
+                continue
+            spawned += count
+            self.spawn_turns.append(turn)
+            self.spawn_x.append(x)
+            self.spawn_y.append(y)
+            self.spawn_counts.append(count)
+        self.mobile_spawned[-1] = spawned
+        self.removals[-1] = action_summary.removed[self.player_index]
+
+    def __trim(self):
+        extra = len(self.turns) - self.window
+        for column in [self.turns, self.MP, self.SP, self.health, self.mobile_spawned,
+                       self.structures_placed, self.upgrades, self.removals]:
+            del column[:extra]
+        oldest = self.turns[0]
+        kept = 0
+        while kept < len(self.spawn_turns) and self.spawn_turns[kept] < oldest:
+            kept += 1
+        for column in [self.spawn_turns, self.spawn_x, self.spawn_y, self.spawn_counts]:
+            del column[:kept]
+
+    def __first_row(self, last_turns):
+        if last_turns is None or not self.turns:
+            return 0
+        first_turn = self.turns[-1] - last_turns + 1
+        row = len(self.turns)
+        while row > 0 and self.turns[row - 1] >= first_turn:
+            row -= 1
+        return row
+
+    def attack_origins(self, last_turns=None):
+        """Gets where the player spawned mobile units
+
+        Args:
+            last_turns: Only count the last this many turns. All kept turns if None.
+
+        Returns:
+            A Counter mapping (x, y) to the number of mobile units spawned there
+
+        """
+        first_turn = self.turns[-1] - last_turns + 1 if last_turns is not None and self.turns else 0
+        origins = Counter()
+        for turn, x, y, count in zip(self.spawn_turns, self.spawn_x, self.spawn_y, self.spawn_counts):
+            if turn >= first_turn:
+                origins[x, y] += count
+        return origins
+
+    def attack_turns(self, last_turns=None):
+        """Gets the turns the player spawned mobile units in
+
+        Args:
+            last_turns: Only look at the last this many turns. All kept turns if None.
+
+        Returns:
+            A list of turn numbers
+
+        """
+        row = self.__first_row(last_turns)
+        return [turn for turn, spawned in zip(self.turns[row:], self.mobile_spawned[row:]) if spawned > 0]
+
+    def mean_MP_when_attacking(self, last_turns=None):
+        """Gets the player's average MP at the start of the turns they spawned mobile units in
+
+        Args:
+            last_turns: Only look at the last this many turns. All kept turns if None.
+
+        Returns:
+            The average MP, or None if the player has not attacked
+
+        """
+        row = self.__first_row(last_turns)
+        attacking = [MP for MP, spawned in zip(self.MP[row:], self.mobile_spawned[row:]) if spawned > 0]
+        if not attacking:
+            return None
+        return sum(attacking) / len(attacking)
+
+    def mean_mobile_spawned(self, last_turns=None):
+        """Gets the average number of mobile units the player spawned per turn
+
+        Args:
+            last_turns: Only look at the last this many turns. All kept turns if None.
+
+        Returns:
+            The average, or None if no turn has been completed
+
+        """
+        row = self.__first_row(last_turns)
+        known = [spawned for spawned in self.mobile_spawned[row:] if spawned >= 0]
+        if not known:
+            return None
+        return sum(known) / len(known)
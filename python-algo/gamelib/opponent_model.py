@@ -0,0 +1,224 @@
+import threading
+from collections import OrderedDict
+
+from .navigation import PathBlockingIndex
+from .unit import GameUnit
+
+
+def board_key(game_state):
+    """Describes the structures on the board
+
+    Only structures affect pathing and the damage our defences deal, so mobile units
+    and structure health are not part of the key. The structures are read with GameMap.structure_units.
+
+    Args:
+        game_state: The GameState to describe
+
+    Returns:
+        A tuple of (location, type_info, player_index) for every structure, equal for boards with the same
+        structures in the same places. location is the bit index x * ARENA_SIZE + y, and type_info is the
+        UnitTypeInfo of the structure, which differs once it is upgraded.
+
+    """
+    locations, units = game_state.game_map.structure_units()
+    return tuple(zip(locations, [unit.type_info for unit in units], [unit.player_index for unit in units]))
+
+
+def board_hash(game_state):
+    """Hashes the structures on the board
+
+    Args:
+        game_state: The GameState to hash
+
+    Returns:
+        The hash of board_key(game_state)
+
+    """
+    return hash(board_key(game_state))
+
+
+class EnemyPath:
+    """A route the opponent can send mobile units down
+
+    Attributes :
+        * start ([int, int]): The edge location the units are spawned at
+        * target_edge (int): The edge the units are trying to reach, see GameMap.TOP_LEFT and similar constants
+        * path (list): The locations the units will walk through, as returned by GameState.find_path_to_edge
+        * reaches_edge (bool): False if the units will self destruct instead of reaching the edge
+        * damage_profile (tuple): The damage per frame our structures deal to a unit standing on each location of the path
+        * total_damage (float): The sum of damage_profile. A unit spends 1/speed frames on every location it walks through.
+
+    """
+    def __init__(self, start, target_edge, path, reaches_edge, damage_profile):
+        self.start = start
+        self.target_edge = target_edge
+        self.path = path
+        self.reaches_edge = reaches_edge
+        self.damage_profile = damage_profile
+        self.total_damage = sum(damage_profile)
+
+    def __repr__(self):
+        return "EnemyPath from {} to edge {}, length: {} damage: {}".format(self.start, self.target_edge, len(self.path), self.total_damage)
+
+
+class OpponentModel:
+    """Predicts the attacks the opponent can make against the current board
+
+    Every unblocked location on the opponent's edges is treated as a spawn point.
+    The paths from these spawn points and the damage our structures deal along them are
+    computed once per board and cached by board_key(), so building a model for a board we
+    have already seen this turn is free. The cache is keyed by GameContext and board key and is shared
+    between threads, so models can be built in a background task. Candidate defensive placements are scored against
+    every enemy path as a difference against the cached damage profiles, without re-pathing.
+
+    Attributes :
+        * game_state (:obj: GameState): The state the model was built from
+        * board_key (tuple): The structures on the board, see board_key()
+        * board_hash (int): The hash of board_key
+        * paths (list): An EnemyPath for every unblocked enemy spawn location
+        * own_paths (list): The path from every unblocked location on our own edges
+        * damage_map (dict): Maps (x, y) to the damage per frame our structures deal to an enemy unit there, see GameState.path_damage_map
+        * CACHE_SIZE (int): The number of boards whose paths are kept in the cache
+
+    """
+    CACHE_SIZE = 16
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, game_state):
+        """Builds the model, reusing cached paths if this board has been seen before
+
+        Args:
+            game_state: The current GameState
+
+        """
+        self.game_state = game_state
+        self.board_key = board_key(game_state)
+        self.board_hash = hash(self.board_key)
+        key = (game_state.context, self.board_key)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is None:
+            cached = self.__compute()
+            with self._lock:
+                self._cache[key] = cached
+                while len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        self.paths, self.own_paths, self.damage_map = cached
+        self.__blocking_index = None
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget all cached boards
+        """
+        with cls._lock:
+            cls._cache.clear()
+
+    def __compute(self):
+        game_state = self.game_state
+        game_map = game_state.game_map
+        damage_map = game_state.path_damage_map(1)
+
+        paths = []
+        for edge in [game_map.TOP_LEFT, game_map.TOP_RIGHT]:
+            for x, y in game_map.EDGES[edge]:
+                start = [x, y]
+                if game_state.contains_stationary_unit(start):
+                    continue
+                target_edge = game_state.get_target_edge(start)
+                path = game_state.find_path_to_edge(start, target_edge)
+                if not path:
+                    continue
+                reaches_edge = game_map.is_on_edge(path[-1], target_edge)
+                damage_profile = tuple(damage_map.get((x, y), 0) for x, y in path)
+                paths.append(EnemyPath(start, target_edge, path, reaches_edge, damage_profile))
+
+        own_paths = []
+        for edge in [game_map.BOTTOM_LEFT, game_map.BOTTOM_RIGHT]:
+            for x, y in game_map.EDGES[edge]:
+                if not game_state.contains_stationary_unit([x, y]):
+                    own_paths.append(game_state.find_path_to_edge([x, y]))
+        return paths, own_paths, damage_map
+
+    def placement_delta(self, unit_type, location):
+        """The extra damage per enemy path that placing a structure would cause
+
+        Args:
+            unit_type: The type of structure we are considering placing
+            location: The location we are considering placing it at
+
+        Returns:
+            A list with an entry for every path in self.paths. Each entry is the damage per frame
+            added along that path, or None if the structure could reroute the path, which it can when it
+            is on the path or next to it (see needs_repath). Those paths need to be recomputed to know
+            where the enemy would go instead.
+
+        """
+        location = [location[0], location[1]]
+        unit = GameUnit(unit_type, self.game_state.config, 0, None, location[0], location[1])
+        in_range = frozenset((location[0] + dx, location[1] + dy)
+                             for dx, dy in self.game_state.context.path_outcomes.offsets_in_range(unit.attackRange))
+        rerouted = set(self.blocking_index().affected_paths(location))
+        delta = []
+        for index, enemy_path in enumerate(self.paths):
+            if index in rerouted:
+                delta.append(None)
+                continue
+            covered = 0
+            if unit.damage_i > 0:
+                for x, y in enemy_path.path:
+                    if (x, y) in in_range:
+                        covered += 1
+            delta.append(covered * unit.damage_i)
+        return delta
+
+    def score_placement(self, unit_type, location):
+        """Scores a candidate defensive placement against every enemy path
+
+        Args:
+            unit_type: The type of structure we are considering placing
+            location: The location we are considering placing it at
+
+        Returns:
+            The extra damage per frame summed over every path the placement cannot reroute
+
+        """
+        return sum(added for added in self.placement_delta(unit_type, location) if added is not None)
+
+    def blocking_index(self):
+        """Gets an index of the locations where a new structure could reroute a path
+
+        Returns:
+            A PathBlockingIndex over every enemy path followed by every one of our own paths.
+            Indices below len(self.paths) refer to enemy paths.
+
+        """
+        if self.__blocking_index is None:
+            self.__blocking_index = PathBlockingIndex([enemy_path.path for enemy_path in self.paths] + self.own_paths)
+        return self.__blocking_index
+
+    def needs_repath(self, location):
+        """Check if placing a structure at a location could change any enemy path or any of our own paths
+
+        Args:
+            location: The location of a hypothetical structure
+
+        Returns:
+            False if the cached paths are still valid after placing a structure at location
+
+        """
+        return self.blocking_index().affects_routing(location)
+
+    def weakest_paths(self, count=1):
+        """Gets the enemy paths our defences deal the least damage to
+
+        Args:
+            count: The number of paths to return
+
+        Returns:
+            A list of up to count EnemyPaths, least defended first. Paths that end in a self destruct come last.
+
+        """
+        return sorted(self.paths, key=lambda enemy_path: (not enemy_path.reaches_edge, enemy_path.total_damage))[:count]
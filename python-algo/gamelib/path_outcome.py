@@ -0,0 +1,157 @@
+import math
+
+
+class PathOutcome:
+    """What happens to a group of mobile units sent down a path
+
+    Attributes :
+        * reaches_edge (bool): Whether the path ends on an edge of the opponent's side
+        * damage_taken (float): The damage the group takes from the opponent's structures along the path
+        * survivors (int): The number of units left at the end of the path
+        * breach_damage (float): The health the opponent loses
+        * SP_gained (float): The SP the attacker gains for the breaches, from metalForBreach
+        * self_destructs (bool): Whether the survivors self destruct at the end of the path
+        * self_destruct_damage (dict): Maps the (x, y) of each opponent structure in range of the self destruct to the damage it takes
+        * structures_destroyed (list): The (x, y) of the opponent structures the self destruct destroys
+
+    """
+    __slots__ = ("reaches_edge", "damage_taken", "survivors", "breach_damage", "SP_gained",
+                 "self_destructs", "self_destruct_damage", "structures_destroyed")
+
+    def __init__(self, reaches_edge, damage_taken, survivors):
+        self.reaches_edge = reaches_edge
+        self.damage_taken = damage_taken
+        self.survivors = survivors
+        self.breach_damage = 0
+        self.SP_gained = 0
+        self.self_destructs = False
+        self.self_destruct_damage = {}
+        self.structures_destroyed = []
+
+    def __repr__(self):
+        if self.reaches_edge:
+            return "PathOutcome: {} survivors deal {} breach damage".format(self.survivors, self.breach_damage)
+        return "PathOutcome: {} survivors, self destruct damage {}".format(self.survivors, self.self_destruct_damage)
+
+
+class PathOutcomeEvaluator:
+    """Evaluates paths using tables compiled from the config once
+
+    Each GameContext holds one evaluator, as GameContext.path_outcomes. Use GameState.evaluate_path_outcome
+    and GameState.path_damage_map rather than calling it directly.
+
+    The model is simple: structures in range of a tile damage the group for every frame it spends on the tile,
+    damage kills the group's units one after another, and the units left at the end of the path either
+    score or, if they moved at least selfDestructStepsRequired tiles, self destruct. Shields and
+    mobile units of the opponent are ignored.
+
+    """
+    def __init__(self, unit_types, hit_radius):
+        """Compiles the tables
+
+        Args:
+            unit_types: The UnitTypeTable of the config
+            hit_radius: The distance beyond a unit's range at which locations are still affected by it
+
+        """
+        self.unit_types = unit_types
+        self.hit_radius = hit_radius
+        self.__offsets = {}
+
+    def offsets_in_range(self, radius):
+        """Gets the offsets of the locations affected by a unit with a given range
+
+        Args:
+            radius: The range
+
+        Returns:
+            A tuple of (dx, dy), using the same rule as GameMap.get_locations_in_range
+
+        """
+        offsets = self.__offsets.get(radius)
+        if offsets is None:
+            search_radius = math.ceil(radius)
+            reach = radius + self.hit_radius
+            offsets = tuple((dx, dy) for dx in range(-search_radius, search_radius + 1)
+                            for dy in range(-search_radius, search_radius + 1)
+                            if math.sqrt(dx * dx + dy * dy) < reach)
+            self.__offsets[radius] = offsets
+        return offsets
+
+    def damage_map(self, game_map, player_index):
+        """Gets the damage per frame the opponent's structures deal to a mobile unit of player_index on each tile
+
+        Args:
+            game_map: The GameMap
+            player_index: The player whose mobile units are attacked
+
+        This is the one range rule for structure damage in gamelib. OpponentModel and BoardFeatures use it too.
+
+        Returns:
+            A dict mapping (x, y) to damage per frame. Tiles out of range of every structure are left out.
+
+        """
+        damage = {}
+        size = game_map.ARENA_SIZE
+        arena_mask = game_map.context.ARENA_MASK
+        mask = game_map.structure_mask
+        while mask:
+            low = mask & -mask
+            x, y = divmod(low.bit_length() - 1, size)
+            mask ^= low
+            for unit in game_map[x, y]:
+                if unit.stationary and unit.player_index != player_index and unit.damage_i > 0:
+                    for dx, dy in self.offsets_in_range(unit.attackRange):
+                        tx = x + dx
+                        ty = y + dy
+                        if 0 <= tx < size and 0 <= ty < size and arena_mask >> (tx * size + ty) & 1:
+                            damage[tx, ty] = damage.get((tx, ty), 0) + unit.damage_i
+        return damage
+
+    def evaluate(self, game_map, path, unit_type, num, player_index, damage_map):
+        """Evaluates a path
+
+        Args:
+            game_map: The GameMap
+            path: The path, as returned by GameState.find_path_to_edge, starting with the spawn location
+            unit_type: The type of the mobile units
+            num: The number of units in the group
+            player_index: The owner of the units
+            damage_map: The damage_map for player_index
+
+        Returns:
+            A PathOutcome
+
+        """
+        info = self.unit_types.base[self.unit_types.index[unit_type]]
+        frames_per_tile = 1 / info.speed if info.speed else 0
+        damage_taken = 0
+        for location in path:
+            damage_taken += damage_map.get((location[0], location[1]), 0)
+        damage_taken *= frames_per_tile
+
+        health = info.max_health * num
+        survivors = 0 if damage_taken >= health else min(num, math.ceil((health - damage_taken) / info.max_health))
+        end = path[-1] if path else None
+        outcome = PathOutcome(end is not None and game_map.is_on_player_edge(end, 1 - player_index), damage_taken, survivors)
+        if survivors == 0:
+            return outcome
+
+        if outcome.reaches_edge:
+            outcome.breach_damage = survivors * info.breach_damage
+            outcome.SP_gained = survivors * info.breach_reward
+        elif len(path) - 1 >= info.self_destruct_steps:
+            outcome.self_destructs = True
+            damage = survivors * info.self_destruct_damage_f
+            x, y = end
+            for dx, dy in self.offsets_in_range(info.self_destruct_range):
+                target = [x + dx, y + dy]
+                if not game_map.in_arena_bounds(target):
+                    continue
+                for unit in game_map[target]:
+                    if unit.stationary and unit.player_index != player_index:
+                        outcome.self_destruct_damage[target[0], target[1]] = damage
+                        if damage >= unit.health:
+                            outcome.structures_destroyed.append((target[0], target[1]))
+        return outcome
+
@@ -0,0 +1,64 @@
+class SummedAreaTable:
+    """A 2D summed-area table, which totals the values in any rectangle of a grid in constant time
+
+    Building the table is linear in the size of the grid. GameMap builds one per player and statistic
+    the first time it is queried after the board changes, see GameMap.region_total.
+
+    Attributes :
+        * size (int): The width and height of the grid
+
+    """
+    __slots__ = ("size", "_sums")
+
+    def __init__(self, values, size):
+        """Builds the table
+
+        Args:
+            values: A grid of numbers indexed values[x][y]
+            size: The width and height of the grid
+
+        """
+        self.size = size
+        stride = size + 1
+        sums = [0] * (stride * stride)
+        for x in range(size):
+            column = values[x]
+            previous = x * stride
+            current = previous + stride
+            running = 0
+            for y in range(size):
+                running += column[y]
+                sums[current + y + 1] = sums[previous + y + 1] + running
+        self._sums = sums
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def total(self, x_min, y_min, x_max, y_max):
+        """Totals the values of a rectangle. The bounds are inclusive and are clipped to the grid.
+
+        Args:
+            x_min: The smallest x in the rectangle
+            y_min: The smallest y in the rectangle
+            x_max: The largest x in the rectangle
+            y_max: The largest y in the rectangle
+
+        Returns:
+            The total, 0 if the rectangle is empty
+
+        """
+        size = self.size
+        x_min = max(x_min, 0)
+        y_min = max(y_min, 0)
+        x_max = min(x_max, size - 1)
+        y_max = min(y_max, size - 1)
+        if x_min > x_max or y_min > y_max:
+            return 0
+        stride = size + 1
+        sums = self._sums
+        low = x_min * stride
+        high = (x_max + 1) * stride
+        return sums[high + y_max + 1] - sums[low + y_max + 1] - sums[high + y_min] + sums[low + y_min]
@@ -0,0 +1,159 @@
+class ResourceProjector:
+    """Projects both players' resources over future turns
+
+    The resource rules are read from the config once. Every turn MP decays by bitDecayPerRound and grows by
+    bitsPerRound, plus bitGrowthRate for every turnIntervalForBitSchedule turns played. SP grows by coresPerRound.
+    MP is rounded to one decimal every turn, as the engine does, so the projection is done turn by turn
+    rather than in closed form.
+
+    Each GameContext holds one projector, as GameContext.resources. It keeps no state, so it is safe to share between threads.
+
+    Attributes :
+        * MP_decay (float): The fraction of MP lost every turn
+        * MP_per_round (float): The MP gained every turn before any growth
+        * MP_growth (float): The extra MP gained every turn for each turn interval played
+        * MP_interval (int): The number of turns between increases of the MP gained every turn
+        * SP_per_round (float): The SP gained every turn
+
+    """
+    def __init__(self, config):
+        resources = config["resources"]
+        self.MP_decay = resources["bitDecayPerRound"]
+        self.MP_per_round = resources["bitsPerRound"]
+        self.MP_growth = resources["bitGrowthRate"]
+        self.MP_interval = resources["turnIntervalForBitSchedule"]
+        self.SP_per_round = resources["coresPerRound"]
+
+    def MP_gained(self, turn_number):
+        """Gets the MP gained at the start of a turn
+
+        Args:
+            turn_number: The turn
+
+        Returns:
+            The MP gained before decay is applied
+
+        """
+        return self.MP_per_round + self.MP_growth * (turn_number // self.MP_interval)
+
+    def project_MP(self, MP, turn_number, turns):
+        """Projects MP over future turns, assuming none is spent
+
+        Args:
+            MP: The MP now
+            turn_number: The current turn
+            turns: The number of turns to project
+
+        Returns:
+            A list of the MP at the start of each of the next turns
+
+        """
+        keep = 1 - self.MP_decay
+        projection = []
+        for turn in range(turn_number + 1, turn_number + turns + 1):
+            MP = round(MP * keep + self.MP_gained(turn), 1)
+            projection.append(MP)
+        return projection
+
+    def MP_after(self, MP, turn_number, turns):
+        """Gets the MP after a number of turns, assuming none is spent
+
+        Args:
+            MP: The MP now
+            turn_number: The current turn
+            turns: The number of turns
+
+        Returns:
+            The MP at the start of turn turn_number + turns, MP itself if turns is less than 1
+
+        """
+        projection = self.project_MP(MP, turn_number, turns)
+        return projection[-1] if projection else MP
+
+    def project(self, game_state, turns):
+        """Projects both players' resources over future turns, assuming nothing is spent
+
+        Args:
+            game_state: The GameState to project from
+            turns: The number of turns to project
+
+        Returns:
+            A list with, for each of the next turns, [[SP, MP], [SP, MP]] for player 0 and player 1
+
+        """
+        players = []
+        for player_index in [0, 1]:
+            SP, MP = game_state.get_resources(player_index)
+            MPs = self.project_MP(MP, game_state.turn_number, turns)
+            players.append([[SP + self.SP_per_round * turn, MP] for turn, MP in enumerate(MPs, 1)])
+        return [list(turn) for turn in zip(*players)]
+
+
+class AttackTimingPredictor:
+    """Predicts the turns an opponent is likely to attack with most of their MP
+
+    Players often save MP over several turns and then spend it at once. The predictor learns the MP the
+    opponent has had when attacking from an OpponentHistory, projects their MP forward with a ResourceProjector,
+    and flags the turns where the projection reaches that level.
+
+    Attributes :
+        * history (:obj: OpponentHistory): The recorded opponent
+        * last_turns (int): The number of recorded turns the threshold is learned from, all kept turns if None
+        * margin (float): The fraction of the learned MP that counts as enough to attack
+        * default_threshold (float): The MP used as the threshold before the opponent has attacked
+
+    """
+    def __init__(self, history, last_turns=None, margin=0.9, default_threshold=10):
+        self.history = history
+        self.last_turns = last_turns
+        self.margin = margin
+        self.default_threshold = default_threshold
+
+    def burst_threshold(self):
+        """
+        Returns:
+            The MP at which the opponent is expected to attack
+        """
+        mean_MP = self.history.mean_MP_when_attacking(self.last_turns)
+        if mean_MP is None:
+            return self.default_threshold
+        return mean_MP * self.margin
+
+    def predict(self, game_state, turns=5):
+        """Predicts which of the next turns the opponent attacks in
+
+        After a predicted attack the opponent is assumed to have spent all their MP.
+
+        Args:
+            game_state: The current GameState
+            turns: The number of turns to predict, starting with the current one
+
+        Returns:
+            A list of (turn_number, MP, likely) for each turn, where MP is the opponent's projected MP
+            at the start of the turn and likely is True if they are expected to attack in it
+
+        """
+        projector = game_state.context.resources
+        threshold = self.burst_threshold()
+        player_index = self.history.player_index
+        MP = game_state.get_resource(game_state.MP, player_index)
+        predictions = []
+        for turn in range(game_state.turn_number, game_state.turn_number + turns):
+            likely = MP >= threshold
+            predictions.append((turn, MP, likely))
+            MP = projector.MP_after(0 if likely else MP, turn, 1)
+        return predictions
+
+    def next_attack_turn(self, game_state, turns=10):
+        """
+        Args:
+            game_state: The current GameState
+            turns: The number of turns to look ahead
+
+        Returns:
+            The first turn the opponent is expected to attack in, or None
+        """
+        for turn, _, likely in self.predict(game_state, turns):
+            if likely:
+                return turn
+        return None
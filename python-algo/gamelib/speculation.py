@@ -0,0 +1,142 @@
+from .game_state import GameState
+
+
+def structure_set(game_state):
+    """Gets the structures on the board
+
+    Args:
+        game_state: A GameState
+
+    Returns:
+        A set of (x, y, unit_type, player_index, upgraded) tuples, one for every structure
+
+    """
+    game_map = game_state.game_map
+    structures = set()
+    for x in range(game_map.ARENA_SIZE):
+        for y in range(game_map.ARENA_SIZE):
+            if not game_map.in_arena_bounds([x, y]):
+                continue
+            for unit in game_map[x, y]:
+                if unit.stationary:
+                    structures.add((x, y, unit.unit_type, unit.player_index, unit.upgraded))
+    return structures
+
+
+def provisional_state(config, frame_string):
+    """Predicts the next turn's GameState from an action frame
+
+    The board is taken from the frame, without mobile units and without structures that are pending removal.
+    The turn number is advanced by one, and both players' resources are projected one turn forward:
+    MP decays and grows as in GameState.project_future_MP, and SP grows by coresPerRound.
+    Refunds for removed structures and resources generated by supports are not predicted.
+
+    Args:
+        config: The game config
+        frame_string: An action frame, usually the last one of the action phase
+
+    Returns:
+        A GameState for the predicted start of the next turn
+
+    """
+    state = GameState(config, frame_string)
+    state.turn_timer = None
+    game_map = state.game_map
+    for x in range(game_map.ARENA_SIZE):
+        for y in range(game_map.ARENA_SIZE):
+            if game_map.in_arena_bounds([x, y]) and game_map[x, y]:
+                game_map[x, y] = [unit for unit in game_map[x, y] if unit.stationary and not unit.pending_removal]
+
+    SP_per_round = config["resources"]["coresPerRound"]
+    resources = []
+    for player_index in [0, 1]:
+        SP, MP = state.get_resources(player_index)
+        resources.append({'SP': SP + SP_per_round, 'MP': state.project_future_MP(1, player_index, MP)})
+    state._player_resources = resources
+    state.turn_number += 1
+    return state
+
+
+class BoardDiff:
+    """The differences between a predicted GameState and the actual one
+
+    Attributes :
+        * added (list): (x, y, unit_type, player_index, upgraded) structures that are on the actual board but were not predicted
+        * removed (list): Predicted structures that are not on the actual board
+        * resource_delta (list): [[SP, MP], [SP, MP]], the actual resources minus the predicted resources, for each player
+        * turn_matches (bool): Whether the predicted turn number is the actual turn number
+
+    """
+    def __init__(self, predicted, actual):
+        """Compares two states
+
+        Args:
+            predicted: The predicted GameState
+            actual: The actual GameState
+
+        """
+        predicted_structures = structure_set(predicted)
+        actual_structures = structure_set(actual)
+        self.added = sorted(actual_structures - predicted_structures)
+        self.removed = sorted(predicted_structures - actual_structures)
+        self.resource_delta = []
+        for player_index in [0, 1]:
+            actual_resources = actual.get_resources(player_index)
+            predicted_resources = predicted.get_resources(player_index)
+            self.resource_delta.append([actual_resources[0] - predicted_resources[0], actual_resources[1] - predicted_resources[1]])
+        self.turn_matches = predicted.turn_number == actual.turn_number
+
+    def structures_match(self):
+        """
+        Returns:
+            True if the predicted structures are exactly the actual structures
+        """
+        return not self.added and not self.removed
+
+    def is_exact(self, tolerance=0.05):
+        """Check if the prediction was right
+
+        Args:
+            tolerance: The largest resource difference that still counts as a match
+
+        Returns:
+            True if the turn, the structures and every resource were predicted correctly
+
+        """
+        resources_match = all(abs(delta) <= tolerance for player_delta in self.resource_delta for delta in player_delta)
+        return self.turn_matches and self.structures_match() and resources_match
+
+    def __repr__(self):
+        return "BoardDiff added: {} removed: {} resource_delta: {}".format(self.added, self.removed, self.resource_delta)
+
+
+class Speculation:
+    """A plan for the next turn made from the end of the previous action phase
+
+    AlgoCore creates one from the last action frame when use_speculation is enabled,
+    runs AlgoCore.on_speculative_turn on a copy of its state in the background, and hands it to the next on_turn
+    as AlgoCore.speculation. Call reconcile with the real state to see how much of the plan still applies.
+
+    Attributes :
+        * state (:obj: GameState): The predicted state, see provisional_state
+        * plan: The value returned by AlgoCore.on_speculative_turn, or None if it did not finish in time
+        * diff (:obj: BoardDiff): The result of the last call to reconcile, None before that
+
+    """
+    def __init__(self, state):
+        self.state = state
+        self.plan = None
+        self.diff = None
+
+    def reconcile(self, game_state):
+        """Compares the predicted state with the real one
+
+        Args:
+            game_state: The real GameState at the start of the turn
+
+        Returns:
+            A BoardDiff from the predicted state to game_state
+
+        """
+        self.diff = BoardDiff(self.state, game_state)
+        return self.diff
@@ -1,7 +1,28 @@
 import unittest
 import json
+import copy
+import io
+import contextlib
+import threading
+import os
+import tempfile
 from .game_state import GameState
 from .unit import GameUnit
+from .context import GameContext
+from .timing import TurnTimer, AdaptiveBudget, StartupReport, set_turn_timer, limits_from_config
+from .background import BackgroundWorker, task_cancelled
+from .opponent_model import OpponentModel
+from .navigation import PathBlockingIndex
+from .speculation import Speculation, provisional_state
+from .util import BufferedLineReader, JSON_BACKENDS, set_json_backend, get_json_backend, json_loads, json_dumps
+from .debug_log import DebugLog
+from .events import iter_events, BreachEvent, DeathEvent
+from .action_summary import ActionPhaseSummary
+from .opponent_history import OpponentHistory
+from .resources import AttackTimingPredictor
+from .features import BoardFeatures, to_tensor_batch
+from .value_net import ValueNetwork
+from .algocore import AlgoCore
 
 class BasicTests(unittest.TestCase):
 
@@ -275,3 +296,596 @@ class BasicTests(unittest.TestCase):
         actual = game.project_future_MP(turns)
         self.assertAlmostEqual(actual, expected, 0, "Expected {} MP {} turns from now, got {}".format(expected, turns, actual))
 
+
+    def test_unit_type_table(self):
+        game = self.make_turn_0_map()
+        table = game.context.unit_types
+        self.assertIs(table, GameContext.for_config(game.config).unit_types, "The table should only be compiled once per config")
+        configs = [copy.deepcopy(game.config) for _ in range(GameContext.CACHE_SIZE + 1)]
+        first = GameContext.for_config(configs[0])
+        for config in configs[1:]:
+            GameContext.for_config(config)
+        self.assertLessEqual(len(GameContext._contexts), GameContext.CACHE_SIZE, "Old configs should be dropped")
+        self.assertIsNot(first, GameContext.for_config(configs[0]), "A dropped config should get a new context")
+        turret = GameUnit("DF", game.config)
+        self.assertEqual([2, 0], turret.cost, "A turret should cost 2 SP")
+        turret.upgrade()
+        self.assertEqual(3.5, turret.attackRange, "An upgraded turret should have more range")
+        self.assertEqual(15, turret.damage_i, "An upgraded turret should do more damage")
+        self.assertEqual([6, 0], turret.cost, "The cost of an upgraded turret should include the upgrade")
+        self.assertEqual([4, 0], game.type_cost("DF", True), "Upgrading a turret should cost 4 SP")
+
+    def test_compact_unit(self):
+        game = self.make_turn_0_map()
+        wall = GameUnit("FF", game.config, 1, 20, 3, 12)
+        clone = copy.deepcopy(wall)
+        self.assertIs(wall.type_info, clone.type_info, "Copies should share their type info")
+        self.assertIs(game.config, clone.config, "Copies should not copy the config")
+        self.assertEqual([3, 12, 20, 1], [clone.x, clone.y, clone.health, clone.player_index], "Copies should keep their own state")
+        clone.upgrade()
+        self.assertEqual(150, clone.max_health, "An upgraded wall should have more health")
+        self.assertEqual(75, wall.max_health, "Upgrading a copy should not change the original")
+        self.assertFalse(hasattr(wall, "__dict__"), "Units should not have a __dict__")
+
+    def test_independent_configs(self):
+        game = self.make_turn_0_map()
+        config = copy.deepcopy(game.config)
+        config["unitInformation"][0]["shorthand"] = "WL"
+        config["unitInformation"][0]["startHealth"] = 60.0
+        other = GameState(config, game.serialized_string)
+        self.assertEqual("WL", other.WALL, "The second state should use its own config")
+        self.assertEqual("FF", game.WALL, "Building a state from another config should not change the first state")
+        self.assertEqual(75, GameUnit("FF", game.config).max_health, "Units should use the stats of their own config")
+        self.assertEqual(60, GameUnit("WL", config).max_health, "Units should use the stats of their own config")
+        with self.assertRaises(AttributeError):
+            game.context.WALL = "WL"
+
+    def test_turn_timer(self):
+        timer = TurnTimer(10, 20)
+        set_turn_timer(timer)
+        try:
+            game = self.make_turn_0_map()
+            self.assertGreater(game.time_remaining(), 9, "Most of the soft limit should be left")
+            self.assertGreater(game.time_remaining(hard=True), 19, "Most of the hard limit should be left")
+            self.assertTrue(timer.claim_submission(), "The first submission should be allowed")
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                game.submit_turn()
+            self.assertEqual("", output.getvalue(), "A turn should only be submitted once")
+            states = []
+            thread = threading.Thread(target=lambda: states.append(self.make_turn_0_map()))
+            thread.start()
+            thread.join()
+            self.assertIsNone(states[0].turn_timer, "States built in other threads should not use the turn's timer")
+        finally:
+            set_turn_timer(None)
+        self.assertIsNone(self.make_turn_0_map().time_remaining(), "States outside of a turn have no timer")
+
+    def test_watchdog(self):
+        timer = TurnTimer(0, 0.01)
+        fired = threading.Event()
+        game = self.make_turn_0_map()
+        game.turn_timer = timer
+        game.attempt_spawn("DF", [13, 6])
+        game.save_fallback_turn()
+        game.attempt_spawn("DF", [14, 6])
+
+        def on_timeout(timed_out):
+            if timed_out.claim_submission():
+                fired.set()
+        timer.start_watchdog(on_timeout)
+        self.assertTrue(fired.wait(5), "The watchdog should fire after the hard limit")
+        self.assertEqual([("DF", 13, 6)], timer.fallback[0], "The fallback turn should be the saved turn")
+        self.assertLess(game.time_remaining(), 0, "The soft limit should have passed")
+        self.assertFalse(timer.claim_submission(), "The turn should already be submitted by the watchdog")
+
+    def test_background_worker(self):
+        worker = BackgroundWorker()
+        started = threading.Event()
+        release = threading.Event()
+
+        stopped = threading.Event()
+
+        def blocked():
+            started.set()
+            while not task_cancelled():
+                if release.wait(0.01):
+                    return "late"
+            stopped.set()
+
+        worker.submit("sum", sum, [1, 2, 3])
+        worker.submit("failing", int, "not a number")
+        self.assertEqual({"sum": 6}, worker.collect(timeout=5), "Only the successful task should have a result")
+        self.assertEqual([], worker.pending(), "Collecting should clear the pending tasks")
+
+        worker.submit("blocked", blocked)
+        started.wait(5)
+        self.assertEqual({}, worker.collect(), "Unfinished tasks should be dropped")
+        self.assertTrue(stopped.wait(5), "Dropped tasks should see task_cancelled() and stop")
+        self.assertFalse(task_cancelled(), "The main thread is not a background task")
+        release.set()
+        worker.shutdown()
+
+    def test_speculation(self):
+        game = self.make_turn_0_map()
+        frame = json.dumps({"turnInfo": [1, 3, 40], "p1Stats": [30.0, 10.0, 4.0, 0], "p2Stats": [28.0, 2.0, 0.0, 0],
+                            "p1Units": [[[0, 13, 75.0, "1"]], [], [[3, 12, 90.0, "2"]], [[13, 4, 15.0, "3"]], [], [], [[0, 13, 1, "4"]], []],
+                            "p2Units": [[[10, 16, 75.0, "5"]], [], [], [], [], [], [], []]})
+        predicted = provisional_state(game.config, frame)
+        self.assertEqual(4, predicted.turn_number, "The prediction should be for the next turn")
+        self.assertEqual(0, len(predicted.game_map[13, 4]), "Mobile units should be gone at the start of the next turn")
+        self.assertEqual(0, len(predicted.game_map[0, 13]), "Structures pending removal should be gone")
+        self.assertEqual([15.0, 8.0], predicted.get_resources(0), "Resources should be projected one turn forward")
+
+        turn = json.dumps({"turnInfo": [0, 4, -1], "p1Stats": [30.0, 15.0, 8.0, 0], "p2Stats": [28.0, 7.0, 5.0, 0],
+                           "p1Units": [[], [], [[3, 12, 90.0, "2"]], [], [], [], [], []],
+                           "p2Units": [[[10, 16, 75.0, "5"]], [], [], [], [], [], [], []]})
+        speculation = Speculation(predicted)
+        self.assertTrue(speculation.reconcile(GameState(game.config, turn)).is_exact(), "The prediction should match the turn")
+
+        changed = json.loads(turn)
+        changed["p2Units"][2].append([12, 15, 90.0, "6"])
+        diff = speculation.reconcile(GameState(game.config, json.dumps(changed)))
+        self.assertEqual([(12, 15, "DF", 1, False)], diff.added, "The new enemy turret should be reported")
+        self.assertFalse(diff.is_exact(), "The prediction should not match a board with a new structure")
+
+        class Planner(AlgoCore):
+            def on_speculative_turn(self, provisional_game_state):
+                provisional_game_state.attempt_spawn("DF", [5, 12])
+                return "planned"
+
+        algo = Planner()
+        algo.config = game.config
+        quiet_frame = json.loads(frame)
+        quiet_frame["p1Units"][3] = []
+        algo._AlgoCore__speculate(quiet_frame, json.dumps(quiet_frame).encode())
+        self.assertEqual("planned", algo.background.collect(5)[AlgoCore.SPECULATION_KEY])
+        planned = algo._AlgoCore__pending_speculation
+        self.assertTrue(planned.reconcile(provisional_state(game.config, json.dumps(quiet_frame))).is_exact(), "The plan's own moves should not change the prediction")
+        algo.background.shutdown()
+
+    def test_buffered_line_reader(self):
+        lines = [b'{"turnInfo": [0, 1, -1]}\n', b"\n", b"x" * 50 + b"\n", b"last"]
+        reader = BufferedLineReader(io.BytesIO(b"".join(lines)), chunk_size=7)
+        self.assertEqual(list(reader), lines)
+        self.assertEqual(reader.readline(), b"")
+        self.assertEqual(json.loads(lines[0]), {"turnInfo": [0, 1, -1]})
+
+    def test_json_backend(self):
+        previous = get_json_backend()
+        message = '{"p1Stats": [30.0, 12.5, 8.1, 800], "turnInfo": [0, 3, -1]}'
+        try:
+            for backend in JSON_BACKENDS:
+                try:
+                    set_json_backend(backend)
+                except ImportError:
+                    continue
+                self.assertEqual(json_loads(message), json.loads(message))
+                self.assertEqual(json_loads(message.encode()), json.loads(message))
+                self.assertEqual(json.loads(json_dumps([["FF", 3, 12]])), [["FF", 3, 12]])
+            with self.assertRaises(ValueError):
+                set_json_backend("yaml")
+        finally:
+            set_json_backend(previous)
+
+    def test_debug_log(self):
+        stream = io.StringIO()
+        log = DebugLog(rate_limit=2, stream=stream)
+        log.start()
+        for i in range(5):
+            log.write("Could not spawn {}".format(i), "can_spawn", "Not enough resources" if i < 4 else "Location is blocked")
+        log.write("Turn 1")
+        log.end_turn()
+        log.write("Could not spawn 5", "can_spawn")
+        log.flush()
+        self.assertEqual(stream.getvalue().splitlines(), [
+            "Could not spawn 0", "Could not spawn 1", "Turn 1",
+            "can_spawn: 5 warnings, 3 not shown. Not enough resources (4), Location is blocked (1)",
+            "Could not spawn 5"])
+
+    def test_events(self):
+        game = self.make_turn_0_map()
+        frame = {"turnInfo": [1, 3, 12], "events": {
+            "breach": [[[13, 0], 1.0, 3, "7", 2]],
+            "death": [[[3, 12], 2, "2", 1, False], [[4, 12], 0, "3", 1, True]],
+            "damage": [[[3, 12], 6.0, 2, "2", 1]],
+            "move": [[[13, 1], [13, 0], [-1, -1], 3, "7", 2]]}}
+        events = list(iter_events(frame, game.context, ["breach", "death"]))
+        self.assertEqual(3, len(events), "Only the requested event types should be built")
+        breach = events[0]
+        self.assertIsInstance(breach, BreachEvent)
+        self.assertEqual(([13, 0], "PI", 1), (breach.location, breach.unit_type, breach.player_index),
+                         "Frame player 2 should be player_index 1, and unit types should be shorthands")
+        self.assertIsInstance(events[1], DeathEvent)
+        self.assertEqual(("DF", 0, False), (events[1].unit_type, events[1].player_index, events[1].intentional))
+        keys = [event.KEY for event in iter_events(frame, game.context)]
+        self.assertEqual(["breach", "damage", "death", "death", "move"], sorted(keys), "Every event should be built by default")
+
+    def test_action_phase_summary(self):
+        game = self.make_turn_0_map()
+        summary = ActionPhaseSummary(3, game.context)
+        frames = [
+            {"events": {"spawn": [[[13, 0], 3, "7", 1], [[7, 12], 6, "10", 1], [[3, 12], 7, "11", 1]], "damage": [[[3, 12], 6.0, 2, "2", 1]]}},
+            {"events": {"damage": [[[3, 12], 4.0, 2, "2", 1], [[5, 12], 1.0, 0, "9", 1]], "breach": [[[13, 27], 1.0, 3, "7", 1]]}},
+            {"events": {"death": [[[3, 12], 2, "2", 1, False], [[7, 12], 0, "4", 1, True]], "breach": [[[13, 27], 1.0, 3, "8", 1]]}},
+        ]
+        for frame in frames:
+            summary.add_frame(iter_events(frame, game.context, ActionPhaseSummary.KEYS))
+        self.assertEqual(3, summary.frames)
+        turret = summary.units["2"]
+        self.assertEqual((10.0, True), (turret.damage, turret.destroyed), "Damage should add up per unit id, and deaths should be recorded")
+        self.assertEqual(["2"], [unit.unit_id for unit in summary.damaged_units(0, ["DF"])])
+        self.assertEqual([(13, 27)], summary.breach_locations(0))
+        self.assertEqual(2, summary.breaches[0][(13, 27)])
+        self.assertEqual([2.0, 0], summary.breach_damage)
+        self.assertEqual([1, 0], summary.removed)
+        self.assertEqual({"PI": 1}, summary.spawns[0], "Removal and upgrade orders should not count as spawns")
+        self.assertEqual({(7, 12): 1}, summary.removal_locations[0])
+        self.assertEqual({(3, 12): 1}, summary.upgrade_locations[0])
+
+    def test_opponent_history(self):
+        game = self.make_turn_0_map()
+        history = OpponentHistory(window=3)
+
+        def turn(number, enemy_MP, enemy_units):
+            return GameState(game.config, json.dumps({"turnInfo": [0, number, -1], "p1Stats": [30.0, 10.0, 5.0, 0],
+                                                      "p2Stats": [30.0 - number, 10.0, enemy_MP, 0],
+                                                      "p1Units": [[], [], [], [], [], [], [], []], "p2Units": enemy_units}))
+
+        def attack(number, spawns):
+            summary = ActionPhaseSummary(number, game.context)
+            summary.add_frame(iter_events({"events": {"spawn": spawns}}, game.context))
+            return summary
+
+        no_units = [[], [], [], [], [], [], [], []]
+        history.record_turn(turn(0, 5.0, no_units))
+        history.record_turn(turn(1, 8.0, [[[10, 16, 60.0, "1"]], [], [], [], [], [], [], []]),
+                            attack(0, [[[13, 27], 3, "2", 2], [[13, 27], 3, "3", 2], [[10, 16], 0, "1", 2], [[4, 18], 6, "9", 2]]))
+        history.record_turn(turn(2, 3.0, [[[10, 16, 60.0, "1"]], [], [], [], [], [], [[10, 16, 0, "1"]], no_units[7]]), attack(1, []))
+        self.assertEqual([2, 0, -1], list(history.mobile_spawned), "Structures and removals should not count as mobile units")
+        self.assertEqual([1, 0, -1], list(history.structures_placed))
+        self.assertEqual([0], history.attack_turns())
+        self.assertEqual(5.0, history.mean_MP_when_attacking())
+        self.assertEqual({(13, 27): 2}, history.attack_origins())
+        self.assertEqual({}, history.attack_origins(last_turns=2))
+
+        history.record_turn(turn(3, 4.0, no_units), attack(2, [[[4, 18], 4, "4", 2]]))
+        self.assertEqual([1, 2, 3], list(history.turns), "Only the last window turns should be kept")
+        self.assertEqual({(4, 18): 1}, history.attack_origins(), "Spawns from dropped turns should be dropped")
+        self.assertEqual(0.5, history.mean_mobile_spawned())
+
+    def test_resource_projection(self):
+        game = self.make_turn_0_map()
+        game.turn_number = 8
+        projection = game.context.resources.project(game, 12)
+        for turns in [1, 4, 12]:
+            self.assertEqual(game.project_future_MP(turns, 1), projection[turns - 1][1][1])
+            self.assertEqual(game.get_resource(game.SP, 0) + 5 * turns, projection[turns - 1][0][0])
+
+        history = OpponentHistory()
+        history.MP.extend([12.0, 9.0, 8.0])
+        history.turns.extend([5, 6, 7])
+        history.mobile_spawned.extend([3, 0, 4])
+        predictor = AttackTimingPredictor(history, margin=1)
+        self.assertEqual(10.0, predictor.burst_threshold())
+        game._player_resources[1]["MP"] = 4.0
+        predictions = predictor.predict(game, 4)
+        self.assertEqual([8, 9, 10, 11], [turn for turn, _, _ in predictions])
+        self.assertEqual(game.project_future_MP(1, 1), predictions[1][1], "MP should be projected with the config rules")
+        self.assertEqual(next(turn for turn, _, likely in predictions if likely), predictor.next_attack_turn(game))
+
+    def test_path_outcome(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit(game.TURRET, [13, 20], 1)
+        game.game_map.add_unit(game.WALL, [20, 18], 1)
+        damage_map = game.path_damage_map(0)
+        self.assertEqual(game.context.unit_types.base[2].damage_i, damage_map[(13, 22)], "Tiles in range of a turret should take its damage")
+
+        breach_path = [[13, 20 + step] for step in range(1, 8)] + [[14, 27]]
+        outcome = game.evaluate_path_outcome(breach_path, game.SCOUT, 3, damage_map=damage_map)
+        self.assertTrue(outcome.reaches_edge)
+        turret_tiles = sum(1 for x, y in breach_path if (x, y) in damage_map)
+        self.assertEqual(turret_tiles * 5.0, outcome.damage_taken, "Scouts spend one frame on each tile")
+        self.assertEqual(3, outcome.survivors, "Units should only die once the damage exceeds their health")
+        self.assertEqual(3.0, outcome.breach_damage)
+        self.assertEqual(3.0, outcome.SP_gained)
+        self.assertEqual(1, game.evaluate_path_outcome(breach_path, game.SCOUT, 3, damage_map={(13, 21): 31.0}).survivors)
+
+        self_destruct_path = [[20, 10 + step] for step in range(8)]
+        outcome = game.evaluate_path_outcome(self_destruct_path, game.DEMOLISHER, 2, damage_map=damage_map)
+        self.assertFalse(outcome.reaches_edge)
+        self.assertTrue(outcome.self_destructs)
+        self.assertEqual({(20, 18): 10.0}, outcome.self_destruct_damage)
+        self.assertEqual([], outcome.structures_destroyed)
+        short_path = self_destruct_path[-3:]
+        self.assertFalse(game.evaluate_path_outcome(short_path, game.DEMOLISHER, 2).self_destructs,
+                         "Units that moved fewer than selfDestructStepsRequired tiles should not self destruct")
+
+    def test_adaptive_budget(self):
+        game = self.make_turn_0_map()
+        self.assertEqual((4.0, 28.0), limits_from_config(game.config, safety_margin=0.2), "Limits should come from waitTimeBotSoft and waitTimeBotMax")
+        self.assertEqual((4.0, 30.0), limits_from_config({}), "Missing limits should fall back to the defaults")
+
+        budget = AdaptiveBudget(2.0, smoothing=0.5, max_scale=3.0)
+        self.assertEqual(10, budget.scaled(10))
+        budget.record(4.0)
+        self.assertEqual(0.5, budget.scale, "A turn twice as long as the target should halve the work")
+        self.assertEqual(5, budget.scaled(10))
+        budget.record(1.0)
+        self.assertEqual(3.0, budget.cost, "The cost per unit of scale should be averaged")
+        self.assertAlmostEqual(2 / 3, budget.scale)
+        fast = AdaptiveBudget(2.0, max_scale=3.0)
+        fast.record(0.1)
+        self.assertEqual(3.0, fast.scale, "The scale should be capped")
+
+    def test_batched_spawn(self):
+        batched = self.make_turn_0_map()
+        one_by_one = self.make_turn_0_map()
+        for game in [batched, one_by_one]:
+            game._player_resources[0]['MP'] = 10.3
+        locations = [[13, 0], [10, 5], [14, 0], [3, 10]]
+        self.assertEqual(10, batched.attempt_spawn(batched.SCOUT, locations, 7))
+        spawned = 0
+        for location in locations:
+            for i in range(7):
+                spawned += one_by_one.attempt_spawn(one_by_one.SCOUT, location, 1) or 0
+        self.assertEqual(10, spawned)
+        self.assertEqual(one_by_one._deploy_stack, batched._deploy_stack)
+        self.assertEqual(one_by_one.get_resources(), batched.get_resources())
+        self.assertEqual([7, 3], [len(batched.game_map[13, 0]), len(batched.game_map[14, 0])])
+        self.assertEqual(0, len(batched.game_map[10, 5]), "Units should not be spawned off the edges")
+
+    def test_edges(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        self.assertEqual([list(edge) for edge in game_map.EDGES[game_map.TOP_LEFT]], game_map.get_edge_locations(game_map.TOP_LEFT))
+        self.assertEqual([[14, 27], [13, 27], [13, 0], [14, 0]], [edge[0] for edge in game_map.get_edges()])
+        self.assertTrue(game_map.is_on_edge([0, 13], game_map.BOTTOM_LEFT))
+        self.assertFalse(game_map.is_on_edge([0, 13], game_map.TOP_LEFT))
+        self.assertTrue(game_map.is_on_edge((27, 14)))
+        self.assertFalse(game_map.is_on_edge([10, 5]))
+        self.assertTrue(game_map.is_on_player_edge([20, 6], 0))
+        self.assertFalse(game_map.is_on_player_edge([20, 6], 1))
+        game_map.get_edge_locations(game_map.TOP_LEFT).append([0, 0])
+        self.assertEqual(14, len(game_map.get_edge_locations(game_map.TOP_LEFT)), "Returned lists should be copies")
+        path = game.find_path_to_edge([13, 0])
+        self.assertTrue(game_map.is_on_edge(path[-1], game_map.TOP_RIGHT))
+
+    def test_region_totals(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        game_map.add_unit(game.TURRET, [3, 12], 0)
+        game_map.add_unit(game.WALL, [4, 12], 0)
+        game_map.add_unit(game.TURRET, [20, 15], 1)
+        self.assertEqual(2, game_map.region_total("structures", 0, 0, 0, 13, 13))
+        self.assertEqual(1, game_map.region_total(game.TURRET, 0, -5, -5, 50, 50), "Bounds should be clipped to the board")
+        self.assertEqual(0, game_map.region_total("structures", 0, 5, 0, 27, 27))
+        self.assertEqual(0, game_map.region_total("structures", 0, 4, 12, 3, 12), "An empty rectangle should total 0")
+        health = game_map[3, 12][0].health + game_map[4, 12][0].health
+        self.assertEqual(health, game_map.region_total("health", 0, 3, 12, 4, 12))
+        damage = game_map.region_total("damage", 1, 14, 14, 27, 27)
+        self.assertEqual(game_map[20, 15][0].damage_i, damage)
+
+        game_map.remove_unit([3, 12])
+        self.assertEqual(0, game_map.region_total(game.TURRET, 0, 0, 0, 27, 27), "Tables should be rebuilt after a removal")
+        game.attempt_spawn(game.TURRET, [3, 12])
+        game._player_resources[0]['SP'] = 100
+        game.attempt_upgrade([3, 12])
+        self.assertEqual(game_map[3, 12][0].damage_i, game_map.region_total("damage", 0, 0, 0, 27, 27))
+        self.assertEqual(0, game_map.region_total(game.SCOUT, 0, 0, 0, 27, 27), "Mobile units are not counted")
+        self.assertIsNone(game_map.region_total("not a stat", 0, 0, 0, 27, 27))
+
+    def test_structure_counts(self):
+        game = self.make_turn_0_map()
+        turn = json.dumps({"turnInfo": [0, 4, -1], "p1Stats": [30.0, 15.0, 8.0, 0], "p2Stats": [28.0, 7.0, 5.0, 0],
+                           "p1Units": [[[0, 13, 75.0, "1"], [3, 13, 75.0, "2"]], [], [[3, 12, 90.0, "3"]], [[13, 0, 15.0, "4"]], [], [], [], [[3, 12, 1, "5"]]],
+                           "p2Units": [[[10, 16, 75.0, "6"]], [], [], [], [], [], [], []]})
+        state = GameState(game.config, turn)
+        state.suppress_warnings(True)
+        game_map = state.game_map
+        self.assertEqual(2, game_map.structures_in_column(3))
+        self.assertEqual(1, game_map.structures_in_column(3, 0, [state.TURRET]))
+        self.assertEqual(2, game_map.structures_in_row(13, 0, [state.WALL]))
+        self.assertEqual(1, game_map.row_counts[1][0][16])
+        self.assertEqual(0, game_map.structures_in_column(13), "Mobile units should not be counted")
+        self.assertEqual(game_map.ARENA_SIZE, len(game_map.column_counts[0][0]), "There should be one count per column")
+        locations, units = game_map.structure_units()
+        self.assertEqual([0 * 28 + 13, 3 * 28 + 12, 3 * 28 + 13, 10 * 28 + 16], locations, "Structures should be ordered by x and then y")
+        self.assertEqual([state.WALL, state.TURRET, state.WALL, state.WALL], [unit.unit_type for unit in units])
+        self.assertTrue(game_map[3, 12][0].upgraded)
+
+        state.attempt_spawn(state.WALL, [5, 12])
+        self.assertEqual(1, game_map.structures_in_column(5))
+        game_map.remove_unit([3, 12])
+        self.assertEqual(1, game_map.structures_in_column(3))
+        game_map[0, 13] = []
+        self.assertEqual(0, game_map.column_counts[0][0][0])
+        game_map[10, 16].append(GameUnit(state.TURRET, state.config, 1, None, 10, 16))
+        game_map.invalidate()
+        self.assertEqual(2, game_map.structures_in_column(10, 1), "Counts should be recomputed after invalidate")
+
+    def test_legal_placements(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        game.attempt_spawn(game.WALL, [[13, 0], [3, 10]])
+        game.attempt_spawn(game.SCOUT, [14, 0])
+        game_map.add_unit(game.WALL, [13, 20], 1)
+        for unit_type in [game.WALL, game.TURRET, game.SCOUT, game.INTERCEPTOR]:
+            legal = game_map.mask_locations(game.legal_placements(unit_type))
+            expected = [location for location in game_map if game.can_spawn(unit_type, location)]
+            self.assertEqual(sorted(expected), legal)
+        self.assertNotIn([14, 0], game_map.mask_locations(game.legal_placements(game.WALL)), "Structures should not be placed on mobile units")
+        self.assertIn([14, 0], game_map.mask_locations(game.legal_placements(game.SCOUT)))
+        self.assertEqual(game_map.location_mask([[13, 0], [3, 10], [13, 20]]), game_map.structure_mask)
+
+        game._player_resources[0]['SP'] = 0
+        self.assertEqual(0, game.legal_placements(game.WALL), "Nothing should be legal if we cannot afford the unit")
+        game_map.remove_unit([13, 0])
+        self.assertIn([13, 0], game_map.mask_locations(game.legal_placements(game.SCOUT)))
+
+    def test_copy(self):
+        game = self.make_turn_0_map()
+        game.attempt_spawn(game.TURRET, [3, 12])
+        clone = game.copy()
+        clone.attempt_spawn(game.WALL, [4, 12])
+        clone.attempt_upgrade([3, 12])
+        clone.game_map[3, 12][0].health = 1
+        self.assertEqual(0, len(game.game_map[4, 12]))
+        self.assertFalse(game.game_map[3, 12][0].upgraded)
+        self.assertEqual(90, game.game_map[3, 12][0].health)
+        self.assertEqual(1, game.game_map.structures_in_column(3) + game.game_map.structures_in_column(4))
+        self.assertEqual(2, clone.game_map.structures_in_column(3) + clone.game_map.structures_in_column(4))
+        self.assertNotEqual(game.get_resources(), clone.get_resources())
+        self.assertEqual(1, len(game._build_stack))
+
+    def test_to_tensor(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        game = self.make_turn_0_map()
+        game.attempt_spawn(game.TURRET, [3, 12])
+        game.game_map.add_unit(game.WALL, [13, 16], 1)
+        game.game_map.add_unit(game.SCOUT, [13, 0], 0, 3)
+        tensor = game.to_tensor()
+        channels = BoardFeatures.CHANNELS
+        self.assertEqual((len(channels), 28, 28), tensor.shape)
+        self.assertEqual(numpy.float32, tensor.dtype)
+        self.assertEqual(1, tensor[channels.index("turret_0"), 3, 12])
+        self.assertEqual(1, tensor[channels.index("wall_1"), 13, 16])
+        self.assertEqual(3, tensor[channels.index("scout_0"), 13, 0])
+        self.assertEqual(1, tensor[channels.index("health_0"), 3, 12])
+        turret = game.game_map[3, 12][0]
+        threat = tensor[channels.index("threat_0")]
+        for location in game.game_map.get_locations_in_range([3, 12], turret.attackRange):
+            self.assertEqual(turret.damage_i, threat[location[0], location[1]])
+        self.assertEqual(len(game.game_map.get_locations_in_range([3, 12], turret.attackRange)) * turret.damage_i, threat.sum())
+
+        clone = game.copy()
+        clone.attempt_upgrade([3, 12])
+        batch = to_tensor_batch([game, clone])
+        self.assertEqual((2,) + tensor.shape, batch.shape)
+        self.assertTrue(numpy.array_equal(tensor, batch[0]))
+        self.assertTrue(numpy.array_equal(clone.to_tensor(), batch[1]))
+        self.assertEqual(1, batch[1, channels.index("upgraded_0"), 3, 12])
+        damage_map = clone.path_damage_map(1)
+        self.assertEqual(sum(damage_map.values()), batch[1, channels.index("threat_0")].sum(), "Threat should use the range rule of path_damage_map")
+        for (x, y), damage in damage_map.items():
+            self.assertEqual(damage, batch[1, channels.index("threat_0"), x, y])
+
+    def test_value_network(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        game = self.make_turn_0_map()
+        game.attempt_spawn(game.TURRET, [3, 12])
+        candidates = [game.copy() for _ in range(3)]
+        for candidate, x in zip(candidates, [4, 5, 6]):
+            candidate.attempt_spawn(game.WALL, [x, 12])
+        tensors = to_tensor_batch(candidates)
+
+        rng = numpy.random.default_rng(0)
+        channels = len(BoardFeatures.CHANNELS)
+        conv = (rng.normal(size=(2, channels, 3, 3)), rng.normal(size=2))
+        dense = (rng.normal(size=(2 * 28 * 28, 1)) * 0.01, numpy.ones(1))
+        network = ValueNetwork([conv, dense])
+
+        padded = numpy.pad(tensors, ((0, 0), (0, 0), (1, 1), (1, 1)))
+        hidden = numpy.zeros((3, 2, 28, 28))
+        for out_channel in range(2):
+            for x in range(28):
+                for y in range(28):
+                    window = padded[:, :, x:x + 3, y:y + 3] * conv[0][out_channel]
+                    hidden[:, out_channel, x, y] = window.sum(axis=(1, 2, 3)) + conv[1][out_channel]
+        expected = numpy.maximum(hidden, 0).reshape(3, -1) @ dense[0][:, 0] + 1
+        self.assertTrue(numpy.allclose(expected, network.evaluate(tensors), rtol=1e-4))
+        self.assertTrue(numpy.allclose(network.evaluate(tensors[1]), network.evaluate(tensors)[1:2]))
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "value_net.npz")
+            network.save(path)
+            algo = AlgoCore()
+            self.assertIsNone(algo.evaluate_states(candidates), "There should be no scores without a network")
+            self.assertIsNone(algo.load_value_network(os.path.join(folder, "missing.npz")))
+            self.assertIsNotNone(algo.load_value_network(path))
+            scores = algo.evaluate_states(candidates)
+        self.assertEqual(3, len(scores))
+        self.assertTrue(numpy.allclose(expected, scores, rtol=1e-4))
+
+    def test_startup_report(self):
+        report = StartupReport(start=0)
+        report.mark("import gamelib")
+        report.mark("on_game_start")
+        self.assertEqual([stage for stage, _ in report.stages], ["import gamelib", "on_game_start"])
+        self.assertAlmostEqual(report.total(), sum(seconds for _, seconds in report.stages))
+        self.assertTrue(report.summary().startswith("Startup took "), "The summary should give the total first")
+        self.assertIn("on_game_start", report.summary())
+
+        import gamelib
+        self.assertIs(gamelib.OpponentModel, OpponentModel, "Lazy attributes should load on first use")
+        self.assertIn("ValueNetwork", dir(gamelib))
+        self.assertNotIn("value_net", gamelib.__all__, "A star import should not load the lazy modules")
+        self.assertIs(gamelib.value_net.ValueNetwork, ValueNetwork, "Lazy modules should load on first use")
+        with self.assertRaises(AttributeError):
+            gamelib.not_an_attribute
+
+    def test_opponent_model(self):
+        game = self.make_turn_0_map()
+        OpponentModel.clear_cache()
+        model = OpponentModel(game)
+        self.assertEqual(28, len(model.paths), "Every enemy edge location should be a spawn point on an empty board")
+        self.assertEqual(0, sum(enemy_path.total_damage for enemy_path in model.paths), "An empty board should not deal damage")
+        self.assertIs(model.paths, OpponentModel(game).paths, "The paths for an unchanged board should come from the cache")
+
+        enemy_path = model.paths[0]
+        location = [enemy_path.path[5][0], enemy_path.path[5][1]]
+        self.assertIsNone(model.placement_delta("DF", location)[0], "A turret on the path should block it")
+        self.assertIsNone(model.placement_delta("DF", tuple(location))[0], "Tuple locations should be matched too")
+        beside = [location[0] + 1, location[1]] if [location[0] + 1, location[1]] not in enemy_path.path else [location[0] - 1, location[1]]
+        self.assertIsNone(model.placement_delta("DF", beside)[0], "A turret beside the path could reroute it")
+        nearby = next([x, y] for x, y in game.game_map.get_locations_in_range(location, 2)
+                      if 0 not in model.blocking_index().affected_paths([x, y]))
+        self.assertGreater(model.placement_delta("DF", nearby)[0], 0, "A turret in range of the path should damage it")
+        self.assertEqual(0, model.score_placement("FF", nearby), "Walls should not add damage")
+
+        game.game_map.add_unit("DF", nearby, 0)
+        turret_model = OpponentModel(game)
+        self.assertNotEqual(model.board_key, turret_model.board_key, "Adding a structure should change the board key")
+        self.assertIn((game.context, turret_model.board_key), OpponentModel._cache, "Paths should be cached by the full board key")
+        game.game_map[nearby[0], nearby[1]][0].upgrade()
+        self.assertNotEqual(turret_model.board_key, OpponentModel(game).board_key, "Upgrading a structure should change the board key")
+
+        errors = []
+
+        def build(x):
+            try:
+                state = self.make_turn_0_map()
+                state.game_map.add_unit("FF", [x, 13], 0)
+                OpponentModel(state)
+            except Exception as error:
+                errors.append(error)
+        threads = [threading.Thread(target=build, args=(x,)) for x in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors, "Models should be buildable from several threads")
+        self.assertIsInstance(next(reversed(OpponentModel._cache))[0], GameContext, "The cache should be keyed by context")
+
+    def test_path_blocking_index(self):
+        game = self.make_turn_0_map()
+        path = game.find_path_to_edge([13, 0])
+        index = PathBlockingIndex([path, None])
+        self.assertTrue(index.affects_routing(path[3]), "A location on the path can block it")
+        self.assertTrue(index.affects_routing([path[3][0] + 1, path[3][1]]), "A location next to the path can change it")
+        self.assertEqual([0], index.affected_paths(path[3]), "Only the first path should be affected")
+        affecting, unaffected = index.split_candidates([path[3], [0, 13]])
+        self.assertEqual([path[3]], affecting, "The location on the path needs re-pathing")
+        self.assertEqual([[0, 13]], unaffected, "A location far from the path does not need re-pathing")
+
+        OpponentModel.clear_cache()
+        model = OpponentModel(game)
+        self.assertEqual(28, len(model.own_paths), "Every one of our edge locations should be a spawn point on an empty board")
+        self.assertTrue(model.needs_repath(model.paths[0].path[2]), "Enemy paths should be indexed")
+        self.assertTrue(model.needs_repath(model.own_paths[0][2]), "Our own paths should be indexed")
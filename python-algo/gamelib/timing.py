@@ -0,0 +1,264 @@
+import contextvars
+import threading
+import time
+
+
+DEFAULT_SOFT_LIMIT = 4.0
+DEFAULT_HARD_LIMIT = 30.0
+
+# Scoped to the thread that plays the turn: background threads and states built after on_turn see no timer
+_current_timer = contextvars.ContextVar("turn_timer", default=None)
+_startup_report = None
+
+
+def limits_from_config(config, safety_margin=0.2):
+    """Gets the turn time limits from the config
+
+    The engine starts taking health after waitTimeBotSoft milliseconds and skips the turn after waitTimeBotMax.
+    Both are reduced by the safety margin, to leave time for reading and writing messages.
+
+    Args:
+        config: The game config
+        safety_margin: The fraction of each limit kept in reserve
+
+    Returns:
+        (soft_limit, hard_limit) in seconds. DEFAULT_SOFT_LIMIT and DEFAULT_HARD_LIMIT for limits missing from the config.
+
+    """
+    timing = config.get("timingAndReplay", {})
+    soft_ms = timing.get("waitTimeBotSoft")
+    hard_ms = timing.get("waitTimeBotMax")
+    soft_limit = soft_ms / 1000 * (1 - safety_margin) if soft_ms else DEFAULT_SOFT_LIMIT
+    hard_limit = hard_ms / 1000 * (1 - safety_margin) if hard_ms else DEFAULT_HARD_LIMIT
+    return soft_limit, hard_limit
+
+
+def get_turn_timer():
+    """Gets the timer of the turn currently being played
+
+    Returns:
+        The TurnTimer of the turn AlgoCore is running on_turn for, or None outside of on_turn and in other threads
+
+    """
+    return _current_timer.get()
+
+
+def get_startup_report():
+    """Gets the report of how long starting the algo took, started when gamelib is imported
+
+    Returns:
+        The StartupReport of this process
+
+    """
+    global _startup_report
+    if _startup_report is None:
+        _startup_report = StartupReport()
+    return _startup_report
+
+
+def set_turn_timer(timer):
+    """Sets the timer of the turn currently being played, for the current thread.
+    Should usually only be called by AlgoCore.
+
+    Args:
+        timer: A TurnTimer, or None
+
+    """
+    _current_timer.set(timer)
+
+
+class TurnTimer:
+    """Tracks how much of the time budget for a turn has been used
+
+    The timer starts when the turn message arrives. The soft limit is the time we aim to submit by,
+    the hard limit is the time after which the watchdog, if started, submits the fallback turn for us.
+    Only one submission is sent per turn: whichever of GameState.submit_turn and the watchdog claims it first.
+
+    Attributes :
+        * start_time (float): The time.monotonic() value when the turn message arrived
+        * soft_limit (float): The number of seconds we aim to submit the turn within
+        * hard_limit (float): The number of seconds after which the fallback turn is submitted
+        * submitted (bool): Whether the turn has been submitted
+        * fallback (tuple): The (build_stack, deploy_stack) submitted by the watchdog. Empty stacks by default.
+
+    """
+    def __init__(self, soft_limit, hard_limit, start_time=None):
+        """Starts the timer
+
+        Args:
+            soft_limit: The number of seconds we aim to submit the turn within
+            hard_limit: The number of seconds after which the fallback turn is submitted
+            start_time: The time.monotonic() value the turn started at. Now if None.
+
+        """
+        self.start_time = time.monotonic() if start_time is None else start_time
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.submitted = False
+        self.fallback = ([], [])
+        self.__lock = threading.Lock()
+        self.__watchdog = None
+
+    def elapsed(self):
+        """
+        Returns:
+            The number of seconds since the turn started
+        """
+        return time.monotonic() - self.start_time
+
+    def time_remaining(self, hard=False):
+        """Gets the time left before a deadline
+
+        Args:
+            hard: If True, use the hard limit instead of the soft limit
+
+        Returns:
+            The number of seconds left, negative if the deadline has passed
+
+        """
+        limit = self.hard_limit if hard else self.soft_limit
+        return limit - self.elapsed()
+
+    def past_soft_deadline(self):
+        """
+        Returns:
+            True if the soft limit has been used up
+        """
+        return self.elapsed() >= self.soft_limit
+
+    def set_fallback(self, build_stack, deploy_stack):
+        """Sets the turn the watchdog submits if the hard limit is reached
+
+        Args:
+            build_stack: A list of (unit_type, x, y) build commands
+            deploy_stack: A list of (unit_type, x, y) deploy commands
+
+        """
+        self.fallback = (list(build_stack), list(deploy_stack))
+
+    def claim_submission(self):
+        """Claims the right to submit this turn
+
+        Returns:
+            True the first time it is called, False afterwards
+
+        """
+        with self.__lock:
+            if self.submitted:
+                return False
+            self.submitted = True
+        if self.__watchdog is not None:
+            self.__watchdog.cancel()
+        return True
+
+    def start_watchdog(self, on_timeout):
+        """Calls on_timeout from a background thread when the hard limit is reached, unless the turn was submitted first
+
+        Args:
+            on_timeout: A function taking this timer. It must call claim_submission() before submitting.
+
+        """
+        self.__watchdog = threading.Timer(max(0, self.time_remaining(hard=True)), on_timeout, [self])
+        self.__watchdog.daemon = True
+        self.__watchdog.start()
+
+    def stop_watchdog(self):
+        """Stops the watchdog without submitting
+        """
+        if self.__watchdog is not None:
+            self.__watchdog.cancel()
+
+
+class AdaptiveBudget:
+    """Scales how much work a strategy does per turn so turns stay under a time target
+
+    The strategy multiplies the size of its search, such as a depth or the number of candidates it
+    tries, by scale. After every turn the duration is recorded, and the controller keeps a moving
+    average of the time one unit of scale costs. The next scale is the target divided by that cost,
+    so turns that ran long lower the scale and turns that finished early raise it.
+
+    Attributes :
+        * target (float): The number of seconds turns should take, usually AlgoCore.turn_soft_limit
+        * smoothing (float): The weight of the latest turn in the moving average, between 0 and 1
+        * min_scale (float): The lowest scale
+        * max_scale (float): The highest scale
+        * scale (float): The multiplier for the work done in the next turn, 1 at the start of the game
+        * cost (float): The average number of seconds one unit of scale costs, None before the first turn is recorded
+
+    """
+    def __init__(self, target, smoothing=0.3, min_scale=0.1, max_scale=4.0):
+        self.target = target
+        self.smoothing = smoothing
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.scale = 1.0
+        self.cost = None
+
+    def record(self, duration):
+        """Records how long a turn took at the current scale, and updates the scale
+
+        Args:
+            duration: The number of seconds the turn took
+
+        """
+        cost = duration / self.scale
+        self.cost = cost if self.cost is None else self.smoothing * cost + (1 - self.smoothing) * self.cost
+        scale = self.target / self.cost if self.cost > 0 else self.max_scale
+        self.scale = min(self.max_scale, max(self.min_scale, scale))
+
+    def scaled(self, amount, minimum=1):
+        """Scales an amount of work
+
+        Args:
+            amount: The amount at scale 1, such as a search depth or a number of candidates
+            minimum: The smallest amount returned
+
+        Returns:
+            The amount multiplied by scale, rounded down to an int
+
+        """
+        return max(minimum, int(amount * self.scale))
+
+
+class StartupReport:
+    """Records how long each stage of starting the algo takes, from importing gamelib to the end of on_game_start
+
+    gamelib starts the report when it is imported and AlgoCore marks the later stages. AlgoCore writes the
+    report with debug_write once the game has started, which helps keep startup short when running many
+    local matches, each in a fresh process.
+
+    Attributes :
+        * start (float): The time.monotonic() the report started at
+        * stages (list): The (name, seconds) of each stage marked, in order
+
+    """
+    def __init__(self, start=None):
+        self.start = time.monotonic() if start is None else start
+        self.stages = []
+        self.__last = self.start
+
+    def mark(self, stage):
+        """Ends a stage, which started where the previous stage ended
+
+        Args:
+            stage: The name of the stage, such as "on_game_start"
+
+        """
+        now = time.monotonic()
+        self.stages.append((stage, now - self.__last))
+        self.__last = now
+
+    def total(self):
+        """
+        Returns:
+            The number of seconds from the start of the report to the end of the last stage
+        """
+        return self.__last - self.start
+
+    def summary(self):
+        """
+        Returns:
+            A one line description of the stages, such as "Startup took 95ms: import gamelib 40ms, ..."
+        """
+        stages = ", ".join("{} {:.0f}ms".format(stage, seconds * 1000) for stage, seconds in self.stages)
+        return "Startup took {:.0f}ms: {}".format(self.total() * 1000, stages)
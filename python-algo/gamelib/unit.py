@@ -1,3 +1,6 @@
+from .context import GameContext
+
+
 def is_stationary(unit_type, structure_types):
     """
         Args:
@@ -30,51 +33,93 @@ class GameUnit:
         * shieldPerUnit (float): how much shield is given per unit
         * pending_removal (boolean): If this unit is marked for removal by its owner
         * upgraded (boolean): If this unit is upgraded
+        * type_info (:obj: UnitTypeInfo): The stats shared by every unit of this type
+
+    Only the player index, location, health and flags are stored per unit. The stats are read-only
+    properties that look up type_info, which is shared by every unit of the same type, so units are
+    small and cheap to copy.
 
     """
+    __slots__ = ("type_info", "player_index", "x", "y", "health", "pending_removal", "upgraded")
+
     def __init__(self, unit_type, config, player_index=None, health=None, x=-1, y=-1):
         """ Initialize unit variables using args passed
 
         """
-        self.unit_type = unit_type
-        self.config = config
+        table = GameContext.for_config(config).unit_types
+        self.type_info = table.base[table.index[unit_type]]
         self.player_index = player_index
         self.pending_removal = False
         self.upgraded = False
         self.x = x
         self.y = y
-        self.__serialize_type()
-        self.health = self.max_health if not health else health
-
-    def __serialize_type(self):
-        from .game_state import STRUCTURE_TYPES, UNIT_TYPE_TO_INDEX, SUPPORT
-        type_config = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[self.unit_type]]
-        self.stationary = type_config["unitCategory"] == 0
-        self.speed = type_config.get("speed", 0)
-        self.damage_f = type_config.get("attackDamageTower", 0)
-        self.damage_i = type_config.get("attackDamageWalker", 0)
-        self.attackRange = type_config.get("attackRange", 0)
-        self.shieldRange = type_config.get("shieldRange", 0)
-        self.max_health = type_config.get("startHealth", 0)
-        self.shieldPerUnit = type_config.get("shieldPerUnit", 0)
-        self.shieldBonusPerY = type_config.get("shieldBonusPerY", 0)
-        self.cost = [type_config.get("cost1", 0), type_config.get("cost2", 0)]
-
+        self.health = self.type_info.max_health if not health else health
 
     def upgrade(self):
-        from .game_state import UNIT_TYPE_TO_INDEX
-        type_config = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[self.unit_type]].get("upgrade", {})
-        self.speed = type_config.get("speed", self.speed)
-        self.damage_f = type_config.get("attackDamageTower", self.damage_f)
-        self.damage_i = type_config.get("attackDamageWalker", self.damage_i)
-        self.attackRange = type_config.get("attackRange", self.attackRange)
-        self.shieldRange = type_config.get("shieldRange", self.shieldRange)
-        self.max_health = type_config.get("startHealth", self.max_health)
-        self.shieldPerUnit = type_config.get("shieldPerUnit", self.shieldPerUnit)
-        self.shieldBonusPerY = type_config.get("shieldBonusPerY", self.shieldBonusPerY)
-        self.cost = [type_config.get("cost1", 0) + self.cost[0], type_config.get("cost2", 0) + self.cost[1]]
+        self.type_info = self.type_info.upgraded_info
         self.upgraded = True
 
+    @property
+    def unit_type(self):
+        return self.type_info.unit_type
+
+    @property
+    def config(self):
+        return self.type_info.config
+
+    @property
+    def stationary(self):
+        return self.type_info.stationary
+
+    @property
+    def speed(self):
+        return self.type_info.speed
+
+    @property
+    def damage_f(self):
+        return self.type_info.damage_f
+
+    @property
+    def damage_i(self):
+        return self.type_info.damage_i
+
+    @property
+    def attackRange(self):
+        return self.type_info.attackRange
+
+    @property
+    def shieldRange(self):
+        return self.type_info.shieldRange
+
+    @property
+    def max_health(self):
+        return self.type_info.max_health
+
+    @property
+    def shieldPerUnit(self):
+        return self.type_info.shieldPerUnit
+
+    @property
+    def shieldBonusPerY(self):
+        return self.type_info.shieldBonusPerY
+
+    @property
+    def cost(self):
+        return list(self.type_info.cost)
+
+    def __copy__(self):
+        unit = GameUnit.__new__(GameUnit)
+        unit.type_info = self.type_info
+        unit.player_index = self.player_index
+        unit.x = self.x
+        unit.y = self.y
+        unit.health = self.health
+        unit.pending_removal = self.pending_removal
+        unit.upgraded = self.upgraded
+        return unit
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
 
     def __toString(self):
         owner = "Friendly" if self.player_index == 0 else "Enemy"
@@ -0,0 +1,132 @@
+class UnitTypeInfo:
+    """The stats shared by every unit of one type, before or after upgrading
+
+    Instances are created by UnitTypeTable and never change, so every GameUnit of a type
+    refers to the same one. Copying returns the same instance.
+
+    Attributes :
+        * unit_type (string): The shorthand of the unit type
+        * type_index (int): The index of the unit type in config["unitInformation"]
+        * config (JSON): The config the stats were compiled from
+        * upgraded (bool): Whether these are the stats of an upgraded unit
+        * upgraded_info (:obj: UnitTypeInfo): The stats after upgrading. Refers to itself if upgraded is True.
+        * the stats named in UnitTypeTable.STAT_NAMES. cost is a (SP, MP) tuple.
+        * the mobile unit stats named in UnitTypeTable.PATH_STAT_NAMES, 0 for structures
+
+    """
+    __slots__ = ("unit_type", "type_index", "config", "upgraded", "upgraded_info",
+                 "stationary", "speed", "damage_f", "damage_i", "attackRange", "shieldRange",
+                 "max_health", "shieldPerUnit", "shieldBonusPerY", "cost",
+                 "self_destruct_steps", "self_destruct_range", "self_destruct_damage_f", "self_destruct_damage_i",
+                 "breach_damage", "breach_reward")
+
+    def __init__(self, unit_type, type_index, config, upgraded, stats, path_stats):
+        self.unit_type = unit_type
+        self.type_index = type_index
+        self.config = config
+        self.upgraded = upgraded
+        self.upgraded_info = self
+        (self.stationary, self.speed, self.damage_f, self.damage_i, self.attackRange, self.shieldRange,
+         self.max_health, self.shieldPerUnit, self.shieldBonusPerY, self.cost) = stats
+        (self.self_destruct_steps, self.self_destruct_range, self.self_destruct_damage_f, self.self_destruct_damage_i,
+         self.breach_damage, self.breach_reward) = path_stats
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return "UnitTypeInfo {}{}".format(self.unit_type, ", upgraded" if self.upgraded else "")
+
+
+class UnitTypeTable:
+    """Unit stats compiled from the config once, so units don't have to read the config when they are created
+
+    Every GameContext compiles one table for its config, see GameContext.unit_types.
+
+    Stats are stored in tuples indexed by the unit's type index, the position of the unit in config["unitInformation"].
+    Each entry of base and upgraded is a UnitTypeInfo holding the stats named in STAT_NAMES.
+
+    Attributes :
+        * STAT_NAMES (tuple): The GameUnit stat attributes held by each UnitTypeInfo
+        * PATH_STAT_NAMES (tuple): The UnitTypeInfo attributes used to evaluate the outcome of a path, and the config keys they are read from
+        * config (JSON): The config the table was compiled from
+        * shorthands (tuple): The shorthand of each unit type, by type index
+        * index (dict): Maps a unit type shorthand to its type index
+        * base (tuple): The UnitTypeInfo of each unit type before it is upgraded
+        * upgraded (tuple): The UnitTypeInfo of each unit type after it is upgraded. The cost includes the base cost.
+        * upgrade_cost (tuple): The [SP, MP] cost of upgrading each unit type, as returned by GameState.type_cost
+        * can_upgrade (tuple): Whether the config defines an upgrade for each unit type
+
+    """
+    STAT_NAMES = ("stationary", "speed", "damage_f", "damage_i", "attackRange", "shieldRange",
+                  "max_health", "shieldPerUnit", "shieldBonusPerY", "cost")
+    PATH_STAT_NAMES = (("self_destruct_steps", "selfDestructStepsRequired"),
+                       ("self_destruct_range", "selfDestructRange"),
+                       ("self_destruct_damage_f", "selfDestructDamageTower"),
+                       ("self_destruct_damage_i", "selfDestructDamageWalker"),
+                       ("breach_damage", "playerBreachDamage"),
+                       ("breach_reward", "metalForBreach"))
+
+    def __init__(self, config):
+        """Compiles the stats of every unit type
+
+        Args:
+            config (JSON): Contains information about the game
+
+        """
+        self.config = config
+        unit_information = config["unitInformation"]
+        self.shorthands = tuple(type_config.get("shorthand") for type_config in unit_information)
+        self.index = {shorthand: index for index, shorthand in enumerate(self.shorthands)}
+
+        base = []
+        upgraded = []
+        upgrade_cost = []
+        can_upgrade = []
+        for type_index, type_config in enumerate(unit_information):
+            stats = self.__compile_stats(type_config)
+            upgrade_config = type_config.get("upgrade", {})
+            path_stats = tuple(type_config.get(key, 0) for _, key in self.PATH_STAT_NAMES)
+            upgraded_path_stats = tuple(upgrade_config.get(key, value) for (_, key), value in zip(self.PATH_STAT_NAMES, path_stats))
+            base_info = UnitTypeInfo(self.shorthands[type_index], type_index, config, False, stats, path_stats)
+            base_info.upgraded_info = UnitTypeInfo(self.shorthands[type_index], type_index, config, True,
+                                                   self.__compile_upgrade(stats, upgrade_config), upgraded_path_stats)
+            base.append(base_info)
+            upgraded.append(base_info.upgraded_info)
+            cost = stats[-1]
+            upgrade_cost.append((upgrade_config.get("cost1", cost[0]), upgrade_config.get("cost2", cost[1])))
+            can_upgrade.append(type_config.get("upgrade", None) is not None)
+        self.base = tuple(base)
+        self.upgraded = tuple(upgraded)
+        self.upgrade_cost = tuple(upgrade_cost)
+        self.can_upgrade = tuple(can_upgrade)
+
+    @staticmethod
+    def __compile_stats(type_config):
+        return (type_config.get("unitCategory") == 0,
+                type_config.get("speed", 0),
+                type_config.get("attackDamageTower", 0),
+                type_config.get("attackDamageWalker", 0),
+                type_config.get("attackRange", 0),
+                type_config.get("shieldRange", 0),
+                type_config.get("startHealth", 0),
+                type_config.get("shieldPerUnit", 0),
+                type_config.get("shieldBonusPerY", 0),
+                (type_config.get("cost1", 0), type_config.get("cost2", 0)))
+
+    @staticmethod
+    def __compile_upgrade(stats, upgrade_config):
+        stationary, speed, damage_f, damage_i, attack_range, shield_range, max_health, shield_per_unit, shield_bonus_per_y, cost = stats
+        return (stationary,
+                upgrade_config.get("speed", speed),
+                upgrade_config.get("attackDamageTower", damage_f),
+                upgrade_config.get("attackDamageWalker", damage_i),
+                upgrade_config.get("attackRange", attack_range),
+                upgrade_config.get("shieldRange", shield_range),
+                upgrade_config.get("startHealth", max_health),
+                upgrade_config.get("shieldPerUnit", shield_per_unit),
+                upgrade_config.get("shieldBonusPerY", shield_bonus_per_y),
+                (upgrade_config.get("cost1", 0) + cost[0], upgrade_config.get("cost2", 0) + cost[1]))
@@ -1,26 +1,173 @@
 import sys
+import json
+
+from .debug_log import get_debug_log
 
 
 BANNER_TEXT = "---------------- Starting Your Algo --------------------"
 
 
-def get_command():
-    """Gets input from stdin
+class BufferedLineReader:
+    """Reads newline terminated messages from a binary stream in large chunks
+
+    Messages from the game engine can be tens of kilobytes long. Reading them in large chunks into
+    one reusable buffer, and finding line ends with bytearray.find, avoids the per-line overhead of a
+    text mode stream. Lines are returned as bytes, which json_loads accepts directly.
+
+    Attributes :
+        * stream: The binary stream being read, sys.stdin.buffer by default
+        * chunk_size (int): The largest number of bytes read from the stream at once
+
+    """
+    def __init__(self, stream=None, chunk_size=1 << 16):
+        self.stream = sys.stdin.buffer if stream is None else stream
+        self.chunk_size = chunk_size
+        self.__read = getattr(self.stream, "read1", self.stream.read)
+        self.__buffer = bytearray()
+        self.__start = 0
+
+    def readline(self):
+        """Reads the next line
+
+        Returns:
+            The line as bytes, including the trailing newline. b"" once the stream has ended.
+
+        """
+        buffer = self.__buffer
+        end = buffer.find(b"\n", self.__start)
+        while end < 0:
+            searched = len(buffer)
+            if self.__start > 0:
+                # Drop the lines already returned so the buffer does not keep growing
+                del buffer[:self.__start]
+                searched -= self.__start
+                self.__start = 0
+            chunk = self.__read(self.chunk_size)
+            if not chunk:
+                line = bytes(buffer)
+                buffer.clear()
+                return line
+            buffer += chunk
+            end = buffer.find(b"\n", searched)
+        line = bytes(buffer[self.__start:end + 1])
+        self.__start = end + 1
+        return line
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+
+JSON_BACKENDS = ("orjson", "ujson", "json")
+_json_backend = None
+_json_codec = None
+
+
+def _load_json_backend(name):
+    if name == "orjson":
+        import orjson
+        return orjson.loads, lambda obj: orjson.dumps(obj).decode()
+    if name == "ujson":
+        import ujson
+        return ujson.loads, ujson.dumps
+    if name == "json":
+        return json.loads, json.dumps
+    raise ValueError("Unknown JSON backend {}, expected one of {}".format(name, JSON_BACKENDS))
+
+
+def set_json_backend(name=None):
+    """Chooses the library used to decode engine messages and encode turns
+
+    Args:
+        name: One of JSON_BACKENDS. If None, the first of them that is installed is used.
+
+    Returns:
+        The name of the backend now in use
+
+    """
+    global _json_backend, _json_codec
+    if name is not None:
+        _json_codec = _load_json_backend(name)
+        _json_backend = name
+        return name
+    for candidate in JSON_BACKENDS:
+        try:
+            _json_codec = _load_json_backend(candidate)
+        except ImportError:
+            continue
+        _json_backend = candidate
+        return candidate
+
+def get_json_backend():
+    """
+    Returns:
+        The name of the JSON backend in use, detecting it if none was chosen yet
+    """
+    if _json_codec is None:
+        set_json_backend()
+    return _json_backend
+
+def json_loads(data):
+    """Decodes a JSON document with the current backend
+
+    Args:
+        data: The document, as str or bytes
+
+    Returns:
+        The decoded object
 
     """
+    if _json_codec is None:
+        set_json_backend()
+    return _json_codec[0](data)
+
+def json_dumps(obj):
+    """Encodes an object as JSON with the current backend
+
+    Args:
+        obj: The object to encode
+
+    Returns:
+        The JSON document as a str
+
+    """
+    if _json_codec is None:
+        set_json_backend()
+    return _json_codec[1](obj)
+
+
+_stdin_reader = None
+
+
+def get_command_bytes():
+    """Gets the next message from stdin as bytes
+
+    """
+    global _stdin_reader
+    if _stdin_reader is None:
+        _stdin_reader = BufferedLineReader()
     try:
-        ret = sys.stdin.readline()
+        ret = _stdin_reader.readline()
     except EOFError:
-        # Game parent process terminated so exit
-        debug_write("Got EOF, parent game process must have died, exiting for cleanup")
-        exit()
-    if ret == "":
+        ret = b""
+    if ret == b"":
         # Happens if parent game process dies, so exit for cleanup, 
         # Don't change or starter-algo process won't exit even though the game has closed
         debug_write("Got EOF, parent game process must have died, exiting for cleanup")
         exit()
     return ret
 
+def get_command():
+    """Gets input from stdin
+
+    """
+    return get_command_bytes().decode()
+
 def send_command(cmd):
     """Sends your turn to standard output.
     Should usually only be called by 'GameState.submit_turn()'
@@ -29,13 +176,23 @@ def send_command(cmd):
     sys.stdout.write(cmd.strip() + "\n")
     sys.stdout.flush()
 
-def debug_write(*msg):
+def debug_write(*msg, key=None, detail=None):
     """Prints a message to the games debug output
 
+    Once AlgoCore has started its DebugLog, messages are written by a background thread,
+    and messages with a key are rate limited per turn. See DebugLog.write.
+
     Args:
         msg: The message to output
+        key: The kind of message, such as "can_spawn", used for rate limiting
+        detail: A short reason counted in the per-turn summary for key
 
     """
+    message = ", ".join(map(str, msg)).strip()
+    log = get_debug_log()
+    if log is not None:
+        log.write(message, key, detail)
+        return
     #Printing to STDERR is okay and printed out by the game but doesn't effect turns.
-    sys.stderr.write(", ".join(map(str, msg)).strip() + "\n")
+    sys.stderr.write(message + "\n")
     sys.stderr.flush()
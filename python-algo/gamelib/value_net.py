@@ -0,0 +1,122 @@
+from .features import get_numpy, to_tensor_batch
+
+
+class ValueNetwork:
+    """A small convolutional or dense network that scores board tensors, run with NumPy alone
+
+    The network reads arrays from GameState.to_tensor and runs its layers in order. A ReLU follows every layer
+    except the last. Convolutions have odd kernel sizes and stride 1, and pad the board so it keeps its size.
+    The board is flattened before the first dense layer that follows a convolution.
+
+    Weights are stored in a .npz file as layer_0_weight, layer_0_bias, layer_1_weight, ... The shape of each
+    weight gives the kind of layer: (out_channels, in_channels, kernel_height, kernel_width) for a convolution
+    and (inputs, outputs) for a dense layer. Networks trained with other frameworks can be exported by
+    saving their weights in these shapes with numpy.savez.
+
+    AlgoCore loads value_net.npz from the strategy's folder when the game starts, see AlgoCore.value_network.
+
+    Attributes :
+        * layers (list): The (weight, bias) of each layer, as float32 arrays
+
+    """
+    def __init__(self, layers):
+        """Builds a network from its weights
+
+        Args:
+            layers: A list of (weight, bias) for each layer
+
+        """
+        np = get_numpy()
+        self.layers = [(np.asarray(weight, dtype=np.float32), np.asarray(bias, dtype=np.float32)) for weight, bias in layers]
+
+    @classmethod
+    def load(cls, path):
+        """Loads a network saved with save or numpy.savez
+
+        Args:
+            path: The path of the .npz file
+
+        Returns:
+            A ValueNetwork
+
+        """
+        np = get_numpy()
+        with np.load(path, allow_pickle=False) as weights:
+            layers = []
+            while "layer_{}_weight".format(len(layers)) in weights:
+                index = len(layers)
+                layers.append((weights["layer_{}_weight".format(index)], weights["layer_{}_bias".format(index)]))
+        return cls(layers)
+
+    def save(self, path):
+        """Saves the network's weights as a .npz file
+
+        Args:
+            path: The path to write to
+
+        """
+        arrays = {}
+        for index, (weight, bias) in enumerate(self.layers):
+            arrays["layer_{}_weight".format(index)] = weight
+            arrays["layer_{}_bias".format(index)] = bias
+        get_numpy().savez(path, **arrays)
+
+    def evaluate(self, tensors):
+        """Scores board tensors
+
+        Args:
+            tensors: An array of shape (batch, channels, ARENA_SIZE, ARENA_SIZE), or one tensor without the batch axis
+
+        Returns:
+            A float32 array with one score per tensor, or one row of outputs per tensor if the last layer has several
+
+        """
+        np = get_numpy()
+        x = np.asarray(tensors, dtype=np.float32)
+        if x.ndim == 3:
+            x = x[np.newaxis]
+        last = len(self.layers) - 1
+        for index, (weight, bias) in enumerate(self.layers):
+            if weight.ndim == 4:
+                x = self.__convolve(x, weight, bias)
+            else:
+                x = x.reshape(len(x), -1) @ weight + bias
+            if index != last:
+                np.maximum(x, 0, out=x)
+        if x.ndim == 2 and x.shape[1] == 1:
+            return x[:, 0]
+        return x
+
+    def evaluate_states(self, game_states, batch_size=256):
+        """Scores GameStates, encoding them in batches
+
+        Args:
+            game_states: A list of GameStates, such as candidate placements tried on copies of the current state
+            batch_size: The number of states encoded and scored at once
+
+        Returns:
+            A float32 array with one score per state
+
+        """
+        np = get_numpy()
+        scores = [self.evaluate(to_tensor_batch(game_states[start:start + batch_size]))
+                  for start in range(0, len(game_states), batch_size)]
+        return np.concatenate(scores) if scores else np.zeros(0, dtype=np.float32)
+
+    @staticmethod
+    def __convolve(x, weight, bias):
+        np = get_numpy()
+        out_channels, in_channels, kernel_height, kernel_width = weight.shape
+        batch, _, height, width = x.shape
+        pad_height, pad_width = kernel_height // 2, kernel_width // 2
+        # Apply every kernel tap to the whole batch in one product, then shift each tap's output into place
+        taps = np.tensordot(weight.transpose(2, 3, 0, 1).reshape(-1, in_channels), x, axes=([1], [1]))
+        taps = taps.reshape(kernel_height, kernel_width, out_channels, batch, height, width)
+        out = np.zeros((out_channels, batch, height + 2 * pad_height, width + 2 * pad_width), dtype=np.float32)
+        for i in range(kernel_height):
+            for j in range(kernel_width):
+                top = 2 * pad_height - i
+                left = 2 * pad_width - j
+                out[:, :, top:top + height, left:left + width] += taps[i, j]
+        out = out[:, :, pad_height:pad_height + height, pad_width:pad_width + width] + bias[:, None, None, None]
+        return out.transpose(1, 0, 2, 3)